@@ -1,5 +1,6 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import requests
 import sys
 import os
@@ -8,6 +9,7 @@ import json
 import subprocess
 import base64
 import logging
+from collections import OrderedDict
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -17,54 +19,77 @@ logger = logging.getLogger(__name__)
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import config
 from messenger.email_sender import send_gmail
+from crawler.engine_client import cancel_current_job, submit_job
+from crawler.engine_status import alive_daemon_pid, alive_engine_pid, mark_status, read_status, rotate_file, tail_lines, write_status
 
 # --- Helper: Engine Monitoring ---
-ENGINE_PID_FILE = os.path.join(os.getcwd(), "engine.pid")
-ENGINE_LOG_FILE = os.path.join(os.getcwd(), "engine.log")
+ENGINE_LOG_FILE = os.path.join(os.getcwd(), config.ENGINE_LOG_FILE)
+ENGINE_OUT_FILE = os.path.join(os.getcwd(), config.ENGINE_OUT_FILE)
+ENGINE_STATUS_FILE = os.path.join(os.getcwd(), config.ENGINE_STATUS_FILE)
 
-def get_engine_pid():
-    if os.path.exists(ENGINE_PID_FILE):
-        try:
-            with open(ENGINE_PID_FILE, "r") as f:
-                pid = int(f.read().strip())
-                # Check if process is alive (Windows)
-                res = subprocess.run(['tasklist', '/FI', f'PID eq {pid}', '/NH'], capture_output=True, text=True)
-                if str(pid) in res.stdout: return pid
-        except: pass
-    return None
+def get_engine_pid(status=None):
+    # Heartbeat-based liveness from the status file (no tasklist/ps subprocess)
+    if status is None:
+        status = read_status(ENGINE_STATUS_FILE)
+    return alive_engine_pid(status)
 
 def stop_engine():
     pid = get_engine_pid()
     if pid:
+        # A resident engine daemon only cancels its current job and stays warm
+        if cancel_current_job():
+            return True
+        # A live daemon that did not answer in time is busy, not dead: never kill it
+        if alive_daemon_pid():
+            st.warning("상주 엔진이 응답하지 않습니다. 잠시 후 다시 중지해 주세요.")
+            return False
         try:
             import signal
             os.kill(pid, signal.SIGTERM)
-            if os.path.exists(ENGINE_PID_FILE): os.remove(ENGINE_PID_FILE)
+            mark_status("stopped", ENGINE_STATUS_FILE)
             return True
         except: return False
     return False
 
 def run_engine_cmd(target, count, resume=False):
+    # Prefer the resident engine daemon (warm browser + DB client) when it is running
+    job = submit_job("resume" if resume else "region_crawl", {"target": target, "count": count})
+    if job:
+        st.toast(f"상주 엔진에 작업 #{job['id']} 등록됨")
+        invalidate_shop_store()
+        st.rerun()
+    # The daemon may still queue a request it was too busy to confirm; a second engine would crawl in parallel
+    if alive_daemon_pid():
+        st.warning("상주 엔진이 응답하지 않습니다. 작업 목록을 확인한 뒤 다시 시도해 주세요.")
+        return
     try:
         my_env = os.environ.copy()
         my_env["PYTHONIOENCODING"] = "utf-8"
         my_env["PYTHONUNBUFFERED"] = "1"
+        my_env["ENGINE_LOG_FILE"] = ENGINE_LOG_FILE
+        my_env["ENGINE_STATUS_FILE"] = ENGINE_STATUS_FILE
         
-        log_f = open(ENGINE_LOG_FILE, "a", encoding="utf-8")
+        # Engine logging goes to the rotating ENGINE_LOG_FILE; raw stdout/stderr to ENGINE_OUT_FILE
+        rotate_file(ENGINE_LOG_FILE)
+        rotate_file(ENGINE_OUT_FILE)
         label = "RESUME" if resume else "NEW RUN"
-        log_f.write(f"\n--- ENGINE {label}: {time.strftime('%Y-%m-%d %H:%M:%S')} (Target: {target}) ---\n")
-        log_f.flush()
+        with open(ENGINE_LOG_FILE, "a", encoding="utf-8") as f:
+            f.write(f"\n--- ENGINE {label}: {time.strftime('%Y-%m-%d %H:%M:%S')} (Target: {target}) ---\n")
+        out_f = open(ENGINE_OUT_FILE, "a", encoding="utf-8")
         
         script_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'step1_refined_crawler.py'))
         args = [sys.executable, script_path, str(target) if target else "전체", str(count)]
         if resume: args.append("--resume")
         
         p = subprocess.Popen(
-            args, stdout=log_f, stderr=log_f, env=my_env,
+            args, stdout=out_f, stderr=out_f, env=my_env,
             creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
         )
-        with open(ENGINE_PID_FILE, "w") as f: f.write(str(p.pid))
-        st.cache_data.clear()
+        # Initial heartbeat; the engine keeps it fresh once it is up
+        now = time.time()
+        write_status(ENGINE_STATUS_FILE, {"pid": p.pid, "state": "starting", "current": 0, "total": count,
+                                          "target": target or "", "heartbeat_at": now, "updated_at": now})
+        invalidate_shop_store()
         st.rerun()
     except Exception as e:
         st.error(f"엔진 가동 실패: {e}")
@@ -137,6 +162,13 @@ if 'templates_loaded' not in st.session_state:
     st.session_state['templates_loaded'] = True
     
 # --- 2.2 Data Logic ---
+# Canonical ShopRecord field -> dashboard column label
+DISPLAY_LABELS = {
+    "name": "상호명", "email": "이메일", "address": "주소", "phone": "번호",
+    "talk_url": "톡톡링크", "instagram_handle": "인스타", "detail_url": "플레이스링크",
+    "naver_blog_id": "블로그ID", "owner_name": "대표자"
+}
+
 def load_data():
     # st.write("DEBUG: load_data() starting...")
     f_df = pd.DataFrame()
@@ -145,6 +177,7 @@ def load_data():
     # 1. Load from Firebase
     try:
         from crawler.db_handler import DBHandler
+        from crawler.shop_record import ShopRecord
         # st.write("DEBUG: Initializing DBHandler...")
         db = DBHandler()
         if db.db_fs:
@@ -153,9 +186,8 @@ def load_data():
                 docs = db.db_fs.collection(config.FIREBASE_COLLECTION).stream()
                 data_list = []
                 for doc in docs:
-                    d = doc.to_dict()
-                    d['ID'] = doc.id
-                    data_list.append(d)
+                    # ShopRecord resolves legacy alias keys into the shared schema
+                    data_list.append(ShopRecord.from_dict(doc.to_dict()).to_row(doc_id=doc.id))
                 # st.write(f"DEBUG: Successfully loaded {len(data_list)} documents.")
                 if data_list:
                     f_df = pd.DataFrame(data_list)
@@ -171,34 +203,8 @@ def load_data():
         if "firebase_admin" in str(e):
              st.warning("Firebase 모듈을 설치 중입니다. 잠시 후 새로고침 해주세요.")
 
-    # 2. Rename and Normalize Columns
-    rename_map = {
-        "name": "상호명", "email": "이메일", "address": "주소", "phone": "번호", 
-        "talktalk": "톡톡링크", "instagram": "인스타", "source_link": "플레이스링크",
-        "blog_id": "블로그ID", "owner_name": "대표자", "talk_url": "톡톡링크", 
-        "instagram_handle": "인스타", "naver_blog_id": "블로그ID"
-    }
-    f_df = f_df.rename(columns=rename_map)
-    
-    # 2.1 Merge duplicate columns (e.g., from multiple sources like 'name' and '상호명' mapping to same label)
-    if not f_df.empty:
-        # Get list of duplicated column names
-        cols = f_df.columns
-        unique_cols = cols.unique()
-        if len(cols) != len(unique_cols):
-            new_df = pd.DataFrame(index=f_df.index)
-            for col in unique_cols:
-                # Find all columns with this name
-                col_data = f_df.loc[:, f_df.columns == col]
-                if col_data.shape[1] > 1:
-                    # Merge multiple columns: start with the first, fill with subsequent
-                    merged = col_data.iloc[:, 0]
-                    for i in range(1, col_data.shape[1]):
-                        merged = merged.fillna(col_data.iloc[:, i])
-                    new_df[col] = merged
-                else:
-                    new_df[col] = col_data
-            f_df = new_df
+    # 2. Rename canonical ShopRecord fields to display labels
+    f_df = f_df.rename(columns=DISPLAY_LABELS)
     
     # Ensure mandatory columns exist even if empty
     for col in mandatory_cols:
@@ -244,10 +250,122 @@ def load_data():
     
     return combined
 
+# --- 2.3 Shop Store & Memoized Filter Views ---
+# The loaded table lives in session state together with a data version and the
+# address-derived columns, so filter views are computed once per input set and
+# handed out as index arrays instead of DataFrame copies.
+MAX_CACHED_VIEWS = 64
+
+def build_geo_index(df_input):
+    """주소/상호명에서 필터에 필요한 파생 컬럼을 한 번만 계산합니다."""
+    addr = df_input['주소'].fillna("").astype(str) if '주소' in df_input.columns else pd.Series("", index=df_input.index)
+    name = df_input['상호명'].fillna("").astype(str) if '상호명' in df_input.columns else pd.Series("", index=df_input.index)
+    parts = addr.str.split()
+    return pd.DataFrame({
+        '주소': addr,
+        '상호명': name,
+        '시/도': parts.str[0].fillna(""),
+        '군/구': parts.str[1].fillna(""),
+    }, index=df_input.index)
+
+def get_shop_store():
+    store = st.session_state.get('shop_store')
+    if store is None:
+        store = {"df": None, "geo": None, "version": 0, "views": OrderedDict()}
+        st.session_state['shop_store'] = store
+    if store["df"] is None:
+        store["df"] = load_data()
+        store["geo"] = build_geo_index(store["df"])
+        store["version"] += 1
+        store["views"].clear()
+    return store
+
+def invalidate_shop_store():
+    """다음 렌더링에서 Firebase로부터 전체 데이터를 다시 불러오도록 합니다."""
+    store = st.session_state.get('shop_store')
+    if store is not None:
+        store["df"] = None
+
+def _memo_view(key, compute):
+    views = get_shop_store()["views"]
+    if key in views:
+        views.move_to_end(key)
+        return views[key]
+    value = compute()
+    views[key] = value
+    if len(views) > MAX_CACHED_VIEWS:
+        views.popitem(last=False)
+    return value
+
+def get_city_options():
+    store = get_shop_store()
+    return _memo_view((store["version"], "city_options"),
+                      lambda: sorted(store["geo"]['시/도'].unique()))
+
+def get_district_options(city):
+    store = get_shop_store()
+    def compute():
+        geo = store["geo"]
+        return sorted(geo.loc[geo['시/도'] == city, '군/구'].unique())
+    return _memo_view((store["version"], "district_options", city), compute)
+
+def get_district_counts(city):
+    store = get_shop_store()
+    def compute():
+        geo = store["geo"]
+        city_data = geo[geo['시/도'] == city]
+        return city_data.groupby('군/구').size().reset_index(name='count').sort_values('count', ascending=False)
+    return _memo_view((store["version"], "dist_counts", city), compute)
+
+def get_filtered_index(city, dist, query, required_col=None):
+    """(데이터 버전, 시/도, 군/구, 검색어, 필수 컬럼) 조합별 필터 결과를 인덱스 배열로 반환합니다."""
+    store = get_shop_store()
+    def compute():
+        geo = store["geo"]
+        mask = np.ones(len(geo), dtype=bool)
+        if city != "전체": mask &= (geo['시/도'] == city).to_numpy()
+        if dist != "전체": mask &= geo['주소'].str.contains(dist, na=False, regex=False).to_numpy()
+        if query: mask &= geo['상호명'].str.contains(query, case=False, na=False, regex=False).to_numpy()
+        if required_col:
+            col = store["df"][required_col]
+            mask &= (col.notna() & (col != "")).to_numpy()
+        return geo.index.to_numpy()[mask]
+    return _memo_view((store["version"], city, dist, query, required_col), compute)
+
+def patch_shop_store_deleted(doc_ids):
+    """삭제된 문서를 캐시된 테이블과 파생 인덱스에서 제자리로 제거합니다 (재조회 없음)."""
+    store = st.session_state.get('shop_store')
+    if not store or store["df"] is None or not doc_ids or 'ID' not in store["df"].columns:
+        return 0
+    df_cached = store["df"]
+    drop_labels = df_cached.index[df_cached['ID'].isin(set(doc_ids))]
+    if len(drop_labels) == 0:
+        return 0
+
+    df_cached.drop(index=drop_labels, inplace=True)
+    store["geo"].drop(index=drop_labels, inplace=True)
+
+    # Index-array views shrink in place; options and counts are rebuilt lazily
+    # from the patched address index.
+    drop_arr = drop_labels.to_numpy()
+    views = store["views"]
+    for key, value in list(views.items()):
+        if isinstance(value, np.ndarray):
+            views[key] = value[~np.isin(value, drop_arr)]
+        else:
+            del views[key]
+
+    for track in ['A', 'B', 'C']:
+        sel = st.session_state.get(f'sel_track_{track}', {})
+        for label in drop_arr:
+            sel.pop(label, None)
+    return len(drop_labels)
+
 def delete_shop(shop_id, place_link=None, shop_name=None):
     """지정된 샵과 관련된 모든 중복 데이터를 삭제합니다."""
     success = False
     deleted_count = 0
+    deleted_ids = []
     try:
         from crawler.db_handler import DBHandler
         db = DBHandler()
@@ -256,6 +374,7 @@ def delete_shop(shop_id, place_link=None, shop_name=None):
             if shop_id:
                 try:
                     db.db_fs.collection(config.FIREBASE_COLLECTION).document(shop_id).delete()
+                    deleted_ids.append(shop_id)
                     deleted_count += 1
                     success = True
                 except Exception as e:
@@ -274,6 +393,7 @@ def delete_shop(shop_id, place_link=None, shop_name=None):
                     docs = db.db_fs.collection(config.FIREBASE_COLLECTION).where(field, op, val).stream()
                     for doc in docs:
                         doc.reference.delete()
+                        deleted_ids.append(doc.id)
                         deleted_count += 1
                         success = True
                 except:
@@ -288,57 +408,62 @@ def delete_shop(shop_id, place_link=None, shop_name=None):
     
     if success:
         st.toast(f"데이터가 삭제되었습니다. (관련 문서 {deleted_count}개 제거)")
-        st.cache_data.clear()
+        patch_shop_store_deleted(deleted_ids)
         st.session_state['last_selected_shop'] = None
-        time.sleep(0.5)
+        st.session_state['prev_rows'] = []
         st.rerun()
 
 def delete_shops_batch(shops_list):
-    """선택된 여러 항목을 일괄 삭제합니다."""
+    """선택된 여러 항목을 일괄 삭제합니다 (플레이스 ID 조회 + 배치 커밋)."""
     if not shops_list:
         return
         
     total = len(shops_list)
-    progress_text = "데이터를 일괄 삭제 중입니다..."
+    progress_text = "관련 문서를 찾는 중입니다..."
     my_bar = st.progress(0, text=progress_text)
     
-    deleted_total = 0
     try:
         from crawler.db_handler import DBHandler
+        from crawler.place_key import extract_place_id
         db = DBHandler()
         if not db.db_fs:
             st.error("데이터베이스 연결 실패")
             return
 
-        for i, shop in enumerate(shops_list):
+        # 1. 선택 항목의 문서 ID + 플레이스 ID + 링크 수집
+        doc_ids, place_ids, links = [], [], []
+        for shop in shops_list:
             sid = shop.get('ID')
-            link = shop.get('플레이스링크') or shop.get('source_link')
-            name = shop.get('상호명')
-            
-            # 1. 문서 ID 삭제
-            try: db.db_fs.collection(config.FIREBASE_COLLECTION).document(sid).delete()
-            except: pass
-            
-            # 2. 링크/상호명 기반 중복 삭제
-            if link:
-                for f in ["source_link", "플레이스링크", "detail_url"]:
-                    try:
-                        docs = db.db_fs.collection(config.FIREBASE_COLLECTION).where(f, "==", link).stream()
-                        for d in docs: d.reference.delete()
-                    except: continue
-            
-            my_bar.progress((i + 1) / total, text=f"삭제 진행 중 ({i+1}/{total})")
-            
-        st.success(f"{total}개의 항목(및 관련 중복 데이터)이 모두 삭제되었습니다.")
-        st.cache_data.clear()
+            if sid: doc_ids.append(sid)
+            shop_links = [shop.get(f) for f in ('플레이스링크', 'source_link', 'detail_url') if shop.get(f)]
+            links.extend(shop_links)
+            pid = extract_place_id(shop.get('place_id')) or extract_place_id(shop_links[0] if shop_links else None)
+            if pid: place_ids.append(pid)
+
+        # 2. 실제 존재하는 관련 문서만 조회 (place_id·링크 필드 in 쿼리 + place_<id> 키 확인, 키만 읽음)
+        targets, scanned = db.find_place_documents(place_ids, links=links, doc_ids=doc_ids)
+
+        # 3. 배치 단위 병렬 커밋
+        def on_progress(done, target_total):
+            my_bar.progress(done / target_total, text=f"삭제 진행 중 ({done}/{target_total})")
+        result = db.delete_documents(targets, on_progress=on_progress)
+
+        deleted_ids = result["deleted_ids"]
+        op_count = scanned + len(deleted_ids) + result["commits"]
+        logger.info(f"Batch delete: {total} shops -> {len(deleted_ids)} docs, "
+                    f"{scanned} lookup reads, {result['commits']} commits, {result['failed']} failed")
+        if result["failed"]:
+            st.warning(f"{result['failed']}개 문서 삭제에 실패했습니다.")
+        st.toast(f"{total}개 항목 삭제 완료: 문서 {len(deleted_ids)}개, 배치 커밋 {result['commits']}회 "
+                 f"(총 작업 {op_count}건 = 조회 {scanned} + 삭제 {len(deleted_ids)} + 커밋 {result['commits']})")
+        patch_shop_store_deleted(deleted_ids)
         st.session_state['last_selected_shop'] = None
         st.session_state['prev_rows'] = []
-        time.sleep(1)
         st.rerun()
     except Exception as e:
         st.error(f"일괄 삭제 중 오류: {e}")
 
-df = load_data()
+df = get_shop_store()["df"]
 
 # --- Sidebar: Crawler Command Center (Moved to Top) ---
 
@@ -352,32 +477,10 @@ with st.sidebar:
 
     
     # Engine Status UI
-    running_pid = get_engine_pid()
-    
-    # Progress Parser (Robust)
-    def get_crawler_progress():
-        if os.path.exists(ENGINE_LOG_FILE):
-            try:
-                with open(ENGINE_LOG_FILE, "r", encoding="utf-8", errors="replace") as f:
-                    lines = f.readlines()
-                    
-                    # Find last start index
-                    start_idx = 0
-                    for i, line in enumerate(reversed(lines)):
-                        if "NEW ENGINE RUN" in line:
-                            start_idx = len(lines) - 1 - i
-                            break
-                    
-                    # Search for progress after start_idx
-                    for line in reversed(lines[start_idx:]):
-                        if "Progress:" in line:
-                            parts = line.split("Progress:")[-1].strip().split("/")
-                            if len(parts) == 2:
-                                return int(parts[0]), int(parts[1])
-            except: pass
-        return 0, 0
-
-    curr, total = get_crawler_progress()
+    # Liveness and progress from the engine's structured status file (O(1), no log scan or subprocess)
+    engine_status = read_status(ENGINE_STATUS_FILE) or {}
+    running_pid = get_engine_pid(engine_status)
+    curr, total = int(engine_status.get("current") or 0), int(engine_status.get("total") or 0)
     
     if running_pid:
         st.success(f"● 가동 중 (PID: {running_pid})")
@@ -388,6 +491,13 @@ with st.sidebar:
             st.progress(pct, text=f"수집 진행률: {curr}/{total} ({int(pct*100)}%)")
         else:
             st.info("수집 시작 준비 중...")
+        if engine_status.get("keyword"):
+            eta = engine_status.get("eta_seconds")
+            eta_text = f" · 남은 시간 약 {eta // 60}분" if eta else ""
+            st.caption(f"🔍 {engine_status['keyword']} ({engine_status.get('keyword_index', 0)}/{engine_status.get('keyword_total', 0)}) · "
+                       f"{engine_status.get('rate_per_min', 0)}개/분{eta_text}")
+        for w in engine_status.get("workers") or []:
+            st.caption(f"　└ {w['id']}: {w.get('keyword') or '-'} · {w.get('current', 0)}개 ({w.get('state', '')})")
             
         if st.button("🛑 엔진 강제 정지", use_container_width=True, key="btn_sb_stop"):
             if stop_engine():
@@ -397,7 +507,7 @@ with st.sidebar:
         # Auto-refresh for real-time progress
         time.sleep(2)
         if curr % 5 == 0: # Periodically clear data cache during run to update stats
-            st.cache_data.clear()
+            invalidate_shop_store()
         st.rerun()
             
     else:
@@ -419,11 +529,10 @@ with st.sidebar:
     # --- Debug: Live Engine Logs ---
     with st.expander("📝 실시간 엔진 로그", expanded=False):
         if os.path.exists(ENGINE_LOG_FILE):
-            try:
-                with open(ENGINE_LOG_FILE, "r", encoding="utf-8", errors="replace") as f:
-                    log_tail = f.readlines()[-15:] # Show last 15 lines
-                    st.code("".join(log_tail), language="text")
-            except:
+            log_tail = tail_lines(ENGINE_LOG_FILE, 15) # Show last 15 lines (seek from end)
+            if log_tail:
+                st.code("".join(log_tail), language="text")
+            else:
                 st.caption("로그를 읽을 수 없습니다.")
         else:
             st.caption("로그 파일이 없습니다.")
@@ -433,24 +542,18 @@ with st.sidebar:
     # --- Data Statistics Summary ---
     st.markdown("### 📊 수집 현황 요약")
     if not df.empty:
-        # Extract City and District from address
-        temp_df = df.copy()
-        temp_df['city_stat'] = temp_df['주소'].apply(lambda x: x.split()[0] if isinstance(x, str) and x.strip() else "기타")
-        temp_df['dist_stat'] = temp_df['주소'].apply(lambda x: x.split()[1] if isinstance(x, str) and len(x.split()) > 1 else "")
-        
-        # Filter by selected city
-        city_data = temp_df[temp_df['city_stat'] == s_city]
-        total_in_city = len(city_data)
+        # City and District come from the memoized address index
+        dist_counts = get_district_counts(s_city)
+        total_in_city = int(dist_counts['count'].sum())
         
         st.write(f"**{s_city} 전체:** {total_in_city}개")
         
         if total_in_city > 0:
-            dist_counts = city_data.groupby('dist_stat').size().reset_index(name='count').sort_values('count', ascending=False)
             
             # Show as a scrollable component if many districts
             with st.container(height=250):
                 for _, row in dist_counts.iterrows():
-                    d_name = row['dist_stat'] if row['dist_stat'] else "상세불명"
+                    d_name = row['군/구'] if row['군/구'] else "상세불명"
                     st.markdown(f"""
                     <div style="display: flex; justify-content: space-between; padding: 4px 0; border-bottom: 1px solid #f8fafc;">
                         <span style="font-size: 0.85rem; color: #1e293b;">{d_name}</span>
@@ -656,41 +759,25 @@ def render_page_header(title, key):
     st.markdown(f"#### {title}")
 
 # --- Helper: Render Filter Bar (v14) ---
-def render_filters_v14(df_input, key):
-    df_input = df_input.copy()
+def render_filters_v14(df_input, key, required_col=None):
+    """필터 UI를 그리고 조건에 맞는 행의 인덱스 배열을 반환합니다 (복사본 없음)."""
     if df_input.empty:
         st.info("표시할 데이터가 없습니다.")
-        return df_input
-
-    # Ensure required columns for filtering exist and handle NaN
-    for col in ['주소', '상호명']:
-        if col not in df_input.columns:
-            df_input[col] = ""
-        else:
-            df_input[col] = df_input[col].fillna("").astype(str)
+        return df_input.index.to_numpy()
 
     with st.container(border=False):
         c1, c2, c3 = st.columns([1, 1, 2.5])
         with c1:
-            df_input['시/도'] = df_input['주소'].apply(lambda x: x.split()[0] if x.strip() else "")
-            sel_city = st.selectbox("지역 (시/도)", ["전체"] + sorted(list(df_input['시/도'].unique())), key=f"{key}_city_v14")
+            sel_city = st.selectbox("지역 (시/도)", ["전체"] + get_city_options(), key=f"{key}_city_v14")
         with c2:
             d_list = ["전체"]
             if sel_city != "전체":
-                # Safely get district (second word of address)
-                dist_series = df_input[df_input['시/도'] == sel_city]['주소'].apply(
-                    lambda x: x.split()[1] if len(x.split()) > 1 else ""
-                )
-                d_list = ["전체"] + sorted(list(dist_series.unique()))
+                d_list = ["전체"] + get_district_options(sel_city)
             sel_dist = st.selectbox("지역 (군/구)", d_list, key=f"{key}_dist_v14")
         with c3:
             s_q = st.text_input("업체명 검색", key=f"{key}_q_v14", placeholder="업체명을 입력하세요...")
-            
-    filtered = df_input.copy()
-    if sel_city != "전체": filtered = filtered[filtered['시/도'] == sel_city]
-    if sel_dist != "전체": filtered = filtered[filtered['주소'].str.contains(sel_dist, na=False)]
-    if s_q: filtered = filtered[filtered['상호명'].str.contains(s_q, case=False, na=False)]
-    return filtered
+
+    return get_filtered_index(sel_city, sel_dist, s_q, required_col)
 
 # --- Helper: Personalize Message ---
 def format_tpl(text, shop_name):
@@ -730,8 +817,7 @@ def render_track(track_id, label, icon, column_filter, config_expander_name, df)
             if st.button(f"💾 {label} 계정 정보 저장", key=f"save_creds_{track_id}", use_container_width=True):
                 save_templates()
 
-        p_df = render_filters_v14(df, f"track{track_id}")
-        t_df = p_df[p_df[column_filter].notna() & (p_df[column_filter] != "")].copy()
+        t_df = df.loc[render_filters_v14(df, f"track{track_id}", required_col=column_filter)]
         
         if not t_df.empty:
             # Templates
@@ -857,7 +943,7 @@ page = st.session_state['active_page']
 
 if page == 'Shop Search':
     st.markdown("#### ⬖ 검색 및 분석")
-    f_df = render_filters_v14(df, "search_final")
+    f_df = df.loc[render_filters_v14(df, "search_final")]
     
     m_col, d_col = st.columns([1.6, 1]) if st.session_state['last_selected_shop'] is not None else (st.container(), None)
 
@@ -900,39 +986,48 @@ if page == 'Shop Search':
                         updated_ids = []
 
                         with st.spinner(f"{len(shops_to_process)}개 업체 데이터 재분석 중... (크롤링 + 경쟁샵 분석)"):
-                            script_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'research_single_shop.py'))
+                            # Resident engine daemon: one enrichment job (research + competitor refresh) on the warm browser
+                            shop_ids = [str(shop_info['ID']) for shop_info in shops_to_process]
+                            job = submit_job("enrichment", {"shop_ids": shop_ids}, wait=True)
+                            if job:
+                                success_overall = job.get("state") == "done" and not (job.get("result") or {}).get("failed")
+                            elif alive_daemon_pid():
+                                success_overall = False
+                                st.warning("상주 엔진이 응답하지 않습니다. 잠시 후 다시 시도해 주세요.")
+                            else:
+                                script_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'research_single_shop.py'))
                             
-                            for shop_info in shops_to_process:
-                                shop_id = shop_info['ID']
-                                updated_ids.append(str(shop_id))
-                                try:
-                                    my_env = os.environ.copy()
-                                    if "firebase" in st.secrets:
-                                        my_env["FIREBASE_SERVICE_ACCOUNT_JSON"] = json.dumps(dict(st.secrets["firebase"]))
+                                for shop_info in shops_to_process:
+                                    shop_id = shop_info['ID']
+                                    updated_ids.append(str(shop_id))
+                                    try:
+                                        my_env = os.environ.copy()
+                                        if "firebase" in st.secrets:
+                                            my_env["FIREBASE_SERVICE_ACCOUNT_JSON"] = json.dumps(dict(st.secrets["firebase"]))
                                     
-                                    subprocess.run(
-                                        [sys.executable, script_path, str(shop_id)], 
-                                        check=True, capture_output=True, text=True, env=my_env,
-                                        creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
-                                    )
+                                        subprocess.run(
+                                            [sys.executable, script_path, str(shop_id)], 
+                                            check=True, capture_output=True, text=True, env=my_env,
+                                            creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+                                        )
+                                    except Exception as e:
+                                        logger.error(f"Error re-searching {shop_id}: {e}")
+                                        success_overall = False
+                            
+                                try:
+                                    from extract_competitors import run_competitor_extraction
+                                    run_competitor_extraction(target_ids=updated_ids)
                                 except Exception as e:
-                                    logger.error(f"Error re-searching {shop_id}: {e}")
+                                    logger.error(f"Error re-analyzing competitors: {e}")
                                     success_overall = False
-                            
-                            try:
-                                from extract_competitors import run_competitor_extraction
-                                run_competitor_extraction(target_ids=updated_ids)
-                            except Exception as e:
-                                logger.error(f"Error re-analyzing competitors: {e}")
-                                success_overall = False
 
                         if success_overall:
                             st.success(f"{len(shops_to_process)}개 업체 재분석 완료!")
-                            st.cache_data.clear()
+                            invalidate_shop_store()
                             st.rerun()
                         else:
                             st.warning("일부 업체 분석 중 오류가 발생했습니다.")
-                            st.cache_data.clear()
+                            invalidate_shop_store()
                             st.rerun()
                     st.markdown('</div>', unsafe_allow_html=True)
 
@@ -8,6 +8,7 @@ from typing import List, Dict, Any
 from apify_client import ApifyClient
 from config import APIFY_TOKEN
 from crawler.db_handler import DBHandler
+from crawler.shop_record import ShopRecord
 from datetime import datetime
 
 # Setup logging
@@ -75,12 +76,12 @@ def run_apify_crawler(keywords: List[str] = None, max_items_per_query: int = 50)
                 # Save to DB
                 if shop_data:
                     # Enrich with minimal valid checks
-                    if shop_data.get("name") and (shop_data.get("address") or shop_data.get("phone")):
+                    if shop_data.name and (shop_data.address or shop_data.phone):
                          if db.insert_shop_fs(shop_data):
-                             logger.info(f"✅ Saved: {shop_data['name']}")
+                             logger.info(f"✅ Saved: {shop_data.name}")
                              count += 1
                     else:
-                        logger.debug(f"⚠️ Skipped invalid item: {shop_data.get('name')}")
+                        logger.debug(f"⚠️ Skipped invalid item: {shop_data.name}")
 
             logger.info(f"📦 Retrieved and processed {count} items for {keyword}")
             total_saved += count
@@ -91,9 +92,9 @@ def run_apify_crawler(keywords: List[str] = None, max_items_per_query: int = 50)
     logger.info(f"🎉 Crawling completed. Total items saved: {total_saved}")
     return total_saved
 
-def process_apify_item(item: Dict[str, Any], keyword: str) -> Dict[str, Any]:
+def process_apify_item(item: Dict[str, Any], keyword: str) -> ShopRecord:
     """
-    Map Apify result field names to our project's schema.
+    Map Apify result field names to our project's ShopRecord schema.
     """
     # Schema Mapping for 'compass/naver-map-scraper' (common keys)
     # Adjust keys based on actual output if needed.
@@ -119,22 +120,21 @@ def process_apify_item(item: Dict[str, Any], keyword: str) -> Dict[str, Any]:
     # Heuristic for social links if available in item top-level or sub-objects
     # (Implementation depends on specific actor output, this is a generic robust attempt)
     
-    return {
-        "name": name,
-        "address": address,
-        "phone": phone,
-        "detail_url": detail_url,
-        "description": item.get("description", ""),
-        "latitude": float(lat) if lat else 0.0,
-        "longitude": float(lng) if lng else 0.0,
-        "keyword": keyword,
-        "source": "apify",
+    return ShopRecord(
+        name=name,
+        address=address,
+        phone=phone,
+        detail_url=detail_url,
+        description=item.get("description", ""),
+        latitude=lat,
+        longitude=lng,
+        keyword=keyword,
+        source="apify",
         # Fields that might be missing in simple crawl
-        "instagram_handle": instagram, 
-        "naver_blog_id": blog,
-        "email": "", # Usually not available in map lists
-        "crawled_at": datetime.now().isoformat()
-    }
+        instagram_handle=instagram,
+        naver_blog_id=blog,
+        crawled_at=datetime.now().isoformat()
+    )
 
 if __name__ == "__main__":
     # Test run with Seoul skin shops
@@ -0,0 +1,85 @@
+import glob
+import logging
+import os
+import re
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from crawler.contact_extractor import extract_contacts
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+FIXTURE_PATTERNS = ["failed_extract_*.html", "debug_*.html"]  # Saved place / search pages
+RUNS = 5
+
+EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+LOOSE_EMAIL_RE = re.compile(r'[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+')
+
+def legacy_blog(html):
+    """Previous Extractor path: full parse + get_text, first regex match only."""
+    text = BeautifulSoup(html, 'html.parser').get_text(" ", strip=True)
+    match = EMAIL_RE.search(text)
+    return {"email": match.group(0)} if match else {}
+
+def legacy_detail(html):
+    """Previous extract_detail_info content scans: one regex pass per field."""
+    found = {}
+    emails = [e for e in LOOSE_EMAIL_RE.findall(html)
+              if not any(ext in e.lower() for ext in ['.png', '.jpg', '.jpeg', '.gif', '.webp'])]
+    if emails:
+        found["email"] = emails[0]
+    owner = re.search(r'대표자\s*[:]\s*([가-힣]+)', html)
+    if owner:
+        found["owner"] = owner.group(1)
+    for kind, pattern in (("instagram", r'href="(https://www\.instagram\.com/[^"]+)"'),
+                          ("blog", r'href="(https://blog\.naver\.com/[^"]+)"'),
+                          ("talk", r'href="(https://talk\.naver\.com/[^"]+)"')):
+        match = re.search(pattern, html)
+        if match:
+            found[kind] = match.group(1)
+    return found
+
+def best_ms(func, html):
+    best = None
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        result = func(html)
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def run_benchmark():
+    files = sorted({path for pattern in FIXTURE_PATTERNS for path in glob.glob(pattern)})
+    totals = {"legacy_blog": 0.0, "legacy_detail": 0.0, "contacts": 0.0}
+    total_bytes = 0
+    for path in files:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            html = f.read()
+        if not html:
+            logger.info(f"⏭️ {path}: empty fixture, skipped")
+            continue
+        total_bytes += len(html.encode("utf-8"))
+        blog_ms, _ = best_ms(legacy_blog, html)
+        detail_ms, _ = best_ms(legacy_detail, html)
+        new_ms, contacts = best_ms(extract_contacts, html)
+        totals["legacy_blog"] += blog_ms
+        totals["legacy_detail"] += detail_ms
+        totals["contacts"] += new_ms
+        summary = {kind: len(values) for kind, values in contacts.candidates.items()}
+        logger.info(f"⏱️ {os.path.basename(path):<28} {len(html) / 1024:7.0f} KB | blog {blog_ms:7.1f} ms | "
+                    f"detail {detail_ms:6.1f} ms | single pass {new_ms:6.1f} ms | candidates {summary}")
+
+    if not total_bytes:
+        logger.error("❌ No non-empty fixtures found")
+        return 1
+    mb = total_bytes / 1024 / 1024
+    for name, ms in totals.items():
+        logger.info(f"📊 {name:<14} {ms:8.1f} ms total ({mb / (ms / 1000):.1f} MB/s)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(run_benchmark())
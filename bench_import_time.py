@@ -0,0 +1,78 @@
+import json
+import logging
+import os
+import subprocess
+import sys
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Crawler entry point, engine daemon and the main maintenance scripts
+TRACKED_MODULES = [
+    "config",
+    "crawler.db_handler",
+    "step1_refined_crawler",
+    "engine_daemon",
+    "extract_competitors",
+    "research_single_shop",
+    "migrate_place_keys",
+    "normalize_shop_schema",
+]
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_time_baseline.json")
+RUNS = 3
+REGRESSION_TOLERANCE = 1.25  # Flag modules >25% slower than the baseline
+
+def measure_import_ms(module):
+    """Cumulative import time of `module` in a fresh interpreter (best of RUNS), via -X importtime."""
+    best = None
+    for _ in range(RUNS):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True, text=True, cwd=os.path.dirname(BASELINE_FILE)
+        )
+        if result.returncode != 0:
+            logger.error(f"❌ import {module} failed: {result.stderr.strip().splitlines()[-1:]}")
+            return None
+        for line in result.stderr.splitlines():
+            # "import time: self [us] | cumulative | imported package"
+            parts = line.split("|")
+            if len(parts) == 3 and parts[2].strip() == module:
+                cumulative_ms = int(parts[1]) / 1000
+                best = cumulative_ms if best is None else min(best, cumulative_ms)
+    return best
+
+def run_benchmark(save=False):
+    baseline = {}
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = []
+    for module in TRACKED_MODULES:
+        ms = measure_import_ms(module)
+        if ms is None:
+            continue
+        results[module] = round(ms, 1)
+        base = baseline.get(module)
+        if base:
+            delta = f"(baseline {base:.1f} ms, {ms / base - 1:+.0%})"
+            if ms > base * REGRESSION_TOLERANCE:
+                regressions.append(module)
+        else:
+            delta = "(no baseline)"
+        logger.info(f"⏱️ {module:<24} {ms:8.1f} ms {delta}")
+
+    if save:
+        with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        logger.info(f"💾 Baseline saved to {BASELINE_FILE}")
+    if regressions:
+        logger.warning(f"⚠️ Import-time regressions: {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(run_benchmark(save="--save" in sys.argv))
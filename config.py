@@ -1,4 +1,5 @@
 import os
+import sys
 try:
     from dotenv import load_dotenv
     # Load environment variables (Local development)
@@ -21,40 +22,111 @@ FIREBASE_KEY_PATH = os.path.join(os.path.dirname(__file__), "firebase_key.json")
 FIREBASE_COLLECTION = "crawled_shops"
 FIREBASE_SESSION_COLLECTION = "browser_sessions"
 
-# Load Firebase Service Account Info
-FIREBASE_SERVICE_ACCOUNT = None
+# Firebase Service Account Info (FIREBASE_SERVICE_ACCOUNT) is resolved lazily on
+# first access, so crawler/CLI processes don't pay for importing streamlit.
+def _streamlit_secrets_available():
+    """Only consult st.secrets inside a Streamlit app or when a secrets.toml exists."""
+    if "streamlit" in sys.modules:
+        return True
+    candidates = [os.path.join(os.getcwd(), ".streamlit", "secrets.toml"),
+                  os.path.join(os.path.expanduser("~"), ".streamlit", "secrets.toml")]
+    return any(os.path.exists(path) for path in candidates)
 
-# 1. Try to load from Streamlit Secrets (Recommended for Cloud)
-try:
-    import streamlit as st
-    if "firebase" in st.secrets:
-        # Convert st.secrets proxy to a real dict
-        FIREBASE_SERVICE_ACCOUNT = dict(st.secrets["firebase"])
-except:
-    pass
+def _load_firebase_service_account():
+    # 1. Try to load from Streamlit Secrets (Recommended for Cloud)
+    if _streamlit_secrets_available():
+        try:
+            import streamlit as st
+            if "firebase" in st.secrets:
+                # Convert st.secrets proxy to a real dict
+                return dict(st.secrets["firebase"])
+        except:
+            pass
 
-# 2. Try to load from Environment Variable (Single JSON String)
-if not FIREBASE_SERVICE_ACCOUNT:
+    # 2. Try to load from Environment Variable (Single JSON String)
     env_key = os.getenv("FIREBASE_SERVICE_ACCOUNT_JSON")
     if env_key:
         try:
             import json
-            FIREBASE_SERVICE_ACCOUNT = json.loads(env_key)
+            return json.loads(env_key)
         except:
             pass
 
-# 3. Fallback to local file path (Local Development)
-if not FIREBASE_SERVICE_ACCOUNT:
-    FIREBASE_SERVICE_ACCOUNT = FIREBASE_KEY_PATH
+    # 3. Fallback to local file path (Local Development)
+    return FIREBASE_KEY_PATH
+
+def __getattr__(name):
+    if name == "FIREBASE_SERVICE_ACCOUNT":
+        value = _load_firebase_service_account()
+        globals()[name] = value  # Cache: later lookups skip __getattr__
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Output Settings
 OUTPUT_CSV = "확장_피부샵_원장_데이터.csv"
+CSV_FLUSH_ROWS = 20              # Buffered rows before an append to OUTPUT_CSV
+CSV_FLUSH_SECONDS = 30           # ...or this long since the last flush
+PARQUET_EXPORT_ENABLED = False   # Also roll exported rows into Parquet parts (needs pyarrow)
+PARQUET_EXPORT_DIR = "exports/blog_leads"  # Partitioned as run_date=YYYY-MM-DD/part-*.parquet
+PARQUET_PART_ROWS = 5000         # Rows per Parquet part...
+PARQUET_PART_SECONDS = 3600      # ...or this long since the last part (and on close)
 
 # Crawling Settings
-MIN_DELAY = 20
-MAX_DELAY = 70
+MIN_DELAY = 20   # Fastest allowed pace (agreed request budget: 60/MIN_DELAY requests per minute)
+MAX_DELAY = 70   # Slowest pace the rate controller backs off to
 REQUEST_TIMEOUT = 30
 MAX_RETRIES = 3
+# Retries (crawler/retry_policy.py): full-jitter exponential backoff, Retry-After honoured
+RETRYABLE_STATUSES = (408, 425, 429, 500, 502, 503, 504)
+RETRY_BACKOFF_BASE = 15      # Seconds; retry n waits up to BASE * 2**n (never less than MIN_DELAY)
+RETRY_BACKOFF_MAX = 600
+RETRY_AFTER_MAX = 1800       # Longer Retry-After => give up and open the host's circuit for that long
+BREAKER_FAILURE_THRESHOLD = 5  # Retryable failures in a row before a host's circuit opens
+BREAKER_COOLDOWN = 900       # Seconds a host fails fast before one trial request is let through
+ASYNC_MAX_CONNECTIONS = 10   # Pooled connections shared by all hosts (crawler/safe_crawler.py AsyncSafeCrawler)
+
+# Blog crawler response cache (crawler/http_cache.py)
+HTTP_CACHE_ENABLED = True
+HTTP_CACHE_DIR = ".http_cache"
+HTTP_CACHE_SEARCH_HOSTS = ("search.naver.com", "search.daum.net")
+HTTP_CACHE_TTLS = {
+    "search": 3 * 3600,   # Search pages: each 6-hour scheduler cycle revalidates them
+    "post": 7 * 86400,    # Blog posts rarely change; revalidated weekly
+}
+HTTP_CACHE_MAX_AGE = 30 * 86400  # Entries not refreshed for this long are pruned
+
+# Naver blog search harvesting (crawler/searcher.py)
+NAVER_SEARCH_TARGET = 5          # New (not yet known) posts to collect per keyword
+NAVER_SEARCH_PAGE_SIZE = 30      # Results per page; "start" advances by this much
+NAVER_SEARCH_MAX_PAGES = 10
+TISTORY_SEARCH_ENABLED = True    # Search Tistory (via Daum) alongside Naver in Searcher.search_all
+TISTORY_SEARCH_LIMIT = 5         # Tistory posts per keyword
+NAVER_RESULT_CONTAINER_XPATH = "//*[@id='main_pack']"  # Result area; nav/ads outside it are ignored
+
+# Incremental blog crawl scheduling (scheduler.py, crawler/crawl_state.py)
+SCHEDULER_INTERVAL_HOURS = 6               # Cycle interval; also a keyword's base re-search interval
+SCHEDULER_MAX_KEYWORD_INTERVAL_HOURS = 48  # Unchanged keywords back off (x2 per cycle) up to this
+SCHEDULER_URL_REFRESH_HOURS = 24           # Re-read the known-URL set from Firestore this often
+SCHEDULER_STATE_FILE = "scheduler_state.json"
+SCHEDULER_CYCLE_HISTORY = 50               # Cycle stats kept in the state file
+
+# Blogs visited without a lead (crawler/negative_store.py): skipped until the TTL for their reason expires
+NEGATIVE_DB_FILE = "blog_negative.db"
+NEGATIVE_RESULT_TTLS = {
+    "no_email": 30 * 86400,     # Read the page, no email: re-check monthly
+    "iframe_only": 7 * 86400,   # Content hidden behind a frame: retry sooner
+    "fetch_failed": 86400,      # Transient failures: retry next day
+}
+IFRAME_ONLY_MAX_TEXT = 200      # Pages with a frame and less visible text than this are "iframe_only"
+
+# Adaptive pacing (crawler/rate_controller.py): AIMD between MAX_DELAY and MIN_DELAY
+RATE_INCREASE_PER_MIN = 0.1       # Additive increase per healthy response (requests/min)
+RATE_DECREASE_FACTOR = 0.5        # Multiplicative decrease on 429 / block page / slow response
+RATE_SLOW_RESPONSE_SECONDS = 15   # Responses slower than this count as a back-off signal
+RATE_JITTER = 0.25                # +/- fraction of randomness around the current delay
+RATE_BLOCK_COOLDOWN = 300         # Seconds to pause per consecutive block before retrying
+RATE_MAX_CONSECUTIVE_BLOCKS = 3   # Stop the crawl after this many blocks in a row
+BLOCK_MARKERS = ["서비스 이용이 제한되었습니다", "과도한 접근 요청"]
 
 # User Agents for Rotation
 USER_AGENTS = [
@@ -96,6 +168,61 @@ RAW_DATA_FILE = "raw_shops_with_coords.csv"
 ENRICHED_DATA_FILE = "enriched_target_list.csv"
 FINAL_TARGET_FILE = "final_target_selection.csv"
 
+# Engine Monitoring (files live in the working directory of the dashboard/engine)
+ENGINE_STATUS_FILE = "engine_status.json"  # Atomically replaced JSON progress snapshot
+ENGINE_LOG_FILE = "engine.log"             # Rotating engine log shown in the dashboard
+ENGINE_OUT_FILE = "engine.out"             # Raw stdout/stderr of the engine process
+ENGINE_LOG_MAX_BYTES = 5 * 1024 * 1024
+ENGINE_LOG_BACKUPS = 3
+ENGINE_HEARTBEAT_INTERVAL = 5   # Seconds between engine heartbeats
+ENGINE_HEARTBEAT_TIMEOUT = 30   # Heartbeat older than this => engine considered dead
+
+# Resident engine daemon (engine_daemon.py): local JSON-lines socket + priority job queue
+ENGINE_DAEMON_HOST = "127.0.0.1"
+ENGINE_DAEMON_PORT = 8765
+ENGINE_DAEMON_STATUS_FILE = "engine_daemon.json"  # Daemon-only heartbeat (pid, heartbeat_at)
+ENGINE_JOB_PRIORITIES = {  # Lower runs first
+    "enrichment": 0,
+    "competitor_refresh": 1,
+    "region_crawl": 2,
+    "resume": 2,
+    "blog_crawl": 3,
+}
+
+# Sharded crawl (step1_refined_crawler.py --shard-workers N): shared SQLite keyword frontier
+FRONTIER_DB_FILE = "crawl_frontier.db"
+FRONTIER_LEASE_SECONDS = 3600   # A claimed dong is handed to another worker if not finished in time
+SHARD_STATUS_INTERVAL = 5       # Seconds between aggregated status updates by the launcher
+
+# Yield-aware keyword ordering (crawler/keyword_stats.py, stored in FRONTIER_DB_FILE)
+SKIP_KNOWN_PLACES = True        # Don't revisit detail pages of place IDs already in the store
+KEYWORD_YIELD_ALPHA = 0.5       # EWMA weight of the latest run's yield (new IDs / listed)
+KEYWORD_SATURATED_YIELD = 0.05  # Below this smoothed yield a keyword counts as saturated...
+KEYWORD_RECHECK_DAYS = 30       # ...and is skipped until its last crawl is older than this
+
+# Early list cutoff: stop scrolling once freshly loaded results are mostly known shops
+LIST_MAX_SCROLLS = 40
+LIST_CUTOFF_WINDOW = 20         # Evaluate the marginal-new ratio over this many newly loaded results
+LIST_CUTOFF_NEW_RATIO = 0.1     # Stop when fewer than this share of them are new (0 disables)
+
+# Map-grid crawl mode (step1_refined_crawler.py --grid, crawler/map_grid.py)
+MAP_LIST_BASE_URL = "https://m.place.naver.com"
+MAP_LIST_RESULT_CAP = 50          # Results one bounds query returns at most; cells at the cap are subdivided
+MAP_GRID_MAX_DEPTH = 8            # Quadtree depth limit (~0.4 km cells for a 100 km box)
+MAP_GRID_PADDING_DEG = 0.01       # Margin around the bounding box of known shops
+MAP_GRID_FALLBACK_RADIUS_DEG = 0.2  # Half-size of the box around a region centroid when no shops are known
+MAP_GRID_MIN_POINTS = 20          # Known shops needed to trust their bounding box
+MAP_LIST_MIN_DELAY = 3            # Pacing bounds for list queries (seconds)
+MAP_LIST_MAX_DELAY = 15
+MAP_GRID_CELL_RETRIES = 3         # Re-queues of a failed cell (block page, HTTP error) before giving up
+MAP_GRID_RETRY_BACKOFF = 60       # Seconds before the first re-query; doubles per attempt
+REGION_CENTROIDS = {  # (longitude, latitude)
+    "서울": (126.9780, 37.5665), "인천": (126.7052, 37.4563), "경기": (127.0286, 37.2636),
+    "부산": (129.0756, 35.1796), "대구": (128.6014, 35.8714), "대전": (127.3845, 36.3504),
+    "광주": (126.8526, 35.1595), "울산": (129.3114, 35.5384), "세종": (127.2890, 36.4800),
+    "제주": (126.5312, 33.4996),
+}
+
 # Crawler Config
 SCROLL_COUNT = 10  # Number of times to scroll down the list (Adjust as needed)
 HEADLESS_MODE = False # Set to False for debugging visibility
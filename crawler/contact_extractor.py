@@ -0,0 +1,116 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+# One pass over the raw HTML: every alternative starts with a literal outside its
+# (single) named group, so the regex engine can skip ahead to candidate first characters
+# instead of trying each branch at every position, and match.lastgroup says which kind
+# of contact was found. Emails are anchored on "@" and their local part is read
+# backwards in Python. URL paths also match their JSON-escaped form
+# (instagram.com\/handle) used in __APOLLO_STATE__.
+CONTACT_PATTERN = re.compile(
+    r"mailto:(?P<mailto>[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,})"
+    r"|tel:(?P<tel>\+?[0-9][0-9-]{7,14})"
+    r"|@(?P<email>[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,})"
+    r"|0(?P<phone>(?:2|[3-6][1-5]|10|1[16-9]|50[0-9]|70|80)[-. )][0-9]{3,4}[-. ][0-9]{4})(?![0-9])"
+    r"|instagram\.com\\?/(?P<instagram>[A-Za-z0-9._]{1,30})"
+    r"|blog\.naver\.com\\?/(?:PostView\.(?:naver|nhn)\?blogId=)?(?P<blog>[A-Za-z0-9_-]{3,30})"
+    r"|talk\.naver\.com\\?/(?P<talk>(?:ct\\?/)?[A-Za-z0-9_-]{4,})"
+    r"|대표(?:자명?)?\s*[:：]\s*(?P<owner>[가-힣]{2,5})"
+)
+EMAIL_LOCAL_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789._%+-")
+MAX_EMAIL_LOCAL = 64
+
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".gif", ".webp", ".svg", ".ico")
+PLACEHOLDER_EMAIL_DOMAINS = {"example.com", "domain.com", "email.com", "sentry.io", "wixpress.com"}
+KNOWN_MAIL_PROVIDERS = {"naver.com", "gmail.com", "daum.net", "hanmail.net", "kakao.com", "nate.com", "hotmail.com"}
+INSTAGRAM_NON_PROFILES = {"p", "reel", "reels", "stories", "explore", "accounts", "direct", "tv"}
+NAVER_BLOG_NON_IDS = {"PostView", "PostList", "MyBlog", "BlogHome", "prologue"}
+
+# Base confidence per source; repeated sightings add REPEAT_BONUS each
+BASE_CONFIDENCE = {
+    "mailto": 1.0, "email": 0.6, "derived_email": 0.3,
+    "tel": 1.0, "phone": 0.7,
+    "instagram": 0.8, "blog": 0.8, "talk": 0.9, "owner": 0.8,
+}
+REPEAT_BONUS = 0.05
+MAX_INFERRED_CONFIDENCE = 0.95  # Only explicit mailto:/tel: links reach 1.0
+MIN_EMAIL_CONFIDENCE = 0.5  # Addresses seen on the page; "<blog id>@naver.com" guesses score lower
+
+class Contacts:
+    """Candidates per kind (email, phone, instagram, blog, talk, owner) with confidence scores."""
+    def __init__(self):
+        self.candidates: Dict[str, Dict[str, float]] = {}
+
+    def add(self, kind: str, value: str, source: str):
+        base = BASE_CONFIDENCE[source]
+        found = self.candidates.setdefault(kind, {})
+        if value in found:
+            if found[value] < MAX_INFERRED_CONFIDENCE:
+                found[value] = round(min(MAX_INFERRED_CONFIDENCE, found[value] + REPEAT_BONUS), 2)
+            found[value] = max(found[value], base)
+        else:
+            found[value] = base
+
+    def all(self, kind: str) -> List[Tuple[str, float]]:
+        """Candidates of a kind, most confident first (ties keep page order)."""
+        return sorted(self.candidates.get(kind, {}).items(), key=lambda item: -item[1])
+
+    def best(self, kind: str, min_confidence: float = 0.0) -> Optional[str]:
+        ranked = self.all(kind)
+        if ranked and ranked[0][1] >= min_confidence:
+            return ranked[0][0]
+        return None
+
+    def __repr__(self):
+        return f"Contacts({self.candidates})"
+
+def _valid_email(email: str) -> bool:
+    domain = email.rsplit("@", 1)[1].lower()
+    # "icon-plus@2x.png" style asset names look like emails
+    return not domain.endswith(IMAGE_SUFFIXES) and domain not in PLACEHOLDER_EMAIL_DOMAINS
+
+def _email_local_part(html: str, at: int) -> str:
+    start = at
+    while start > 0 and at - start < MAX_EMAIL_LOCAL and html[start - 1] in EMAIL_LOCAL_CHARS:
+        start -= 1
+    return html[start:at].lstrip(".")
+
+def extract_contacts(html: str) -> Contacts:
+    """Scan raw HTML once and collect every contact candidate."""
+    contacts = Contacts()
+    for match in CONTACT_PATTERN.finditer(html):
+        kind, value = match.lastgroup, match.group(match.lastgroup)
+        before = html[match.start() - 1] if match.start() else ""
+        if kind in ("mailto", "email"):
+            if kind == "email":
+                local = _email_local_part(html, match.start())
+                if not local:
+                    continue
+                value = f"{local}@{value}"
+            email = value.lower()
+            if _valid_email(email):
+                contacts.add("email", email, kind)
+                if email.rsplit("@", 1)[1] in KNOWN_MAIL_PROVIDERS:
+                    contacts.add("email", email, "email")  # Counts as a second sighting
+        elif kind in ("tel", "phone"):
+            if kind == "phone" and before.isdigit():
+                continue  # Tail of a longer number
+            digits = re.sub(r"[^0-9]", "", value if kind == "tel" else "0" + value)
+            if 9 <= len(digits) <= 12:
+                contacts.add("phone", digits, kind)
+        elif before.isalnum():
+            continue  # Inside another host name, e.g. ntalk.naver.com
+        elif kind == "instagram":
+            handle = value.rstrip(".")
+            if handle.lower() not in INSTAGRAM_NON_PROFILES:
+                contacts.add("instagram", f"https://www.instagram.com/{handle}", kind)
+        elif kind == "blog":
+            if value not in NAVER_BLOG_NON_IDS:
+                contacts.add("blog", f"https://blog.naver.com/{value}", kind)
+                # Naver blog IDs are Naver account IDs: a weak email guess
+                contacts.add("email", f"{value.lower()}@naver.com", "derived_email")
+        elif kind == "talk":
+            contacts.add("talk", "https://talk.naver.com/" + value.replace("\\/", "/"), kind)
+        elif kind == "owner":
+            contacts.add("owner", value, kind)
+    return contacts
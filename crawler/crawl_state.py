@@ -0,0 +1,93 @@
+import json
+import logging
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+try:
+    from .. import config
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import config
+
+logger = logging.getLogger(__name__)
+
+class CrawlState:
+    """
+    What the blog crawler remembers between scheduled cycles: the last result set
+    and next-due time of every keyword (persisted to SCHEDULER_STATE_FILE) and the
+    known-URL set (in memory only; re-read from Firestore every
+    SCHEDULER_URL_REFRESH_HOURS). A keyword whose results did not change is
+    searched half as often, up to SCHEDULER_MAX_KEYWORD_INTERVAL_HOURS.
+    """
+    def __init__(self, path: Optional[str] = None, data: Optional[Dict] = None):
+        self.path = path or os.path.join(os.getcwd(), config.SCHEDULER_STATE_FILE)
+        data = data or {}
+        self.keywords: Dict[str, Dict] = data.get("keywords", {})  # keyword -> {results, interval, next_due, ...}
+        self.cycles: List[Dict] = data.get("cycles", [])
+        self.known_urls: Optional[Set[str]] = None
+        self.known_loaded_at = 0.0
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "CrawlState":
+        path = path or os.path.join(os.getcwd(), config.SCHEDULER_STATE_FILE)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls(path, json.load(f))
+        except FileNotFoundError:
+            return cls(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Unreadable crawl state {path}, starting fresh: {e}")
+            return cls(path)
+
+    def save(self):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"keywords": self.keywords, "cycles": self.cycles}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    # --- Known URLs ---
+    def needs_url_refresh(self) -> bool:
+        return (self.known_urls is None
+                or time.time() - self.known_loaded_at > config.SCHEDULER_URL_REFRESH_HOURS * 3600)
+
+    def set_known_urls(self, urls: Iterable[str]):
+        self.known_urls = set(urls)
+        self.known_loaded_at = time.time()
+
+    # --- Keywords ---
+    def due_keywords(self, keywords: List[str]) -> List[str]:
+        now = time.time()
+        return [kw for kw in keywords if self.keywords.get(kw, {}).get("next_due", 0) <= now]
+
+    def record_results(self, keyword: str, urls: Set[str], cycle_started: float) -> bool:
+        """
+        Store this cycle's result set; returns True if it brought posts not seen last time.
+        Due times count from the cycle start so the next cycle, started one interval
+        later, finds the keyword due regardless of how long this cycle ran.
+        """
+        base = config.SCHEDULER_INTERVAL_HOURS * 3600
+        entry = self.keywords.get(keyword)
+        changed = entry is None or not urls <= set(entry["results"])
+        if changed or not urls:  # An empty result (e.g. a failed search) says nothing about staleness
+            interval = base
+        else:
+            interval = min(entry["interval"] * 2, config.SCHEDULER_MAX_KEYWORD_INTERVAL_HOURS * 3600)
+        now = time.time()
+        self.keywords[keyword] = {
+            "results": sorted(urls),
+            "interval": interval,
+            "next_due": cycle_started + interval,
+            "checked_at": now,
+            "changed_at": now if changed else (entry or {}).get("changed_at", now),
+        }
+        return changed
+
+    # --- Cycles ---
+    def record_cycle(self, stats: Dict):
+        self.cycles = (self.cycles + [stats])[-config.SCHEDULER_CYCLE_HISTORY:]
+
+    @property
+    def last_cycle(self) -> Optional[Dict]:
+        return self.cycles[-1] if self.cycles else None
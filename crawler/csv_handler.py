@@ -1,7 +1,12 @@
+import atexit
 import csv
+import io
 import os
 import logging
-from typing import Dict
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Tuple
 
 try:
     from .. import config
@@ -13,33 +18,165 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+HEADER = ["블로그 URL", "블로그 제목", "이메일"]
+PARQUET_COLUMNS = ["blog_url", "title", "email", "collected_at"]
+
 class CSVHandler:
-    def __init__(self, filename: str = config.OUTPUT_CSV):
+    """
+    Buffered lead export. Rows are kept in memory and appended in one write when
+    CSV_FLUSH_ROWS rows are pending, when the oldest pending row is CSV_FLUSH_SECONDS
+    old (checked by a background timer), or on close / interpreter exit. Each flush
+    writes whole lines only, and a torn last line from a crash is cut off on the next
+    start. Writes happen on a background thread, outside the lock append_data takes,
+    so a flush never stalls the producer. With PARQUET_EXPORT_ENABLED rows that reached the CSV are also rolled into
+    Parquet parts under PARQUET_EXPORT_DIR/run_date=YYYY-MM-DD/, one part per
+    PARQUET_PART_ROWS rows or PARQUET_PART_SECONDS (the CSV stays the durable copy).
+    """
+    def __init__(self, filename: str = config.OUTPUT_CSV, parquet: bool = None):
         self.filename = filename
+        self.parquet = config.PARQUET_EXPORT_ENABLED if parquet is None else parquet
+        self.run_date = datetime.now().strftime("%Y-%m-%d")
+        self.buffer: List[Tuple[List[str], str]] = []  # (CSV row, collected_at)
+        self.parquet_rows: List[List[str]] = []        # CSV row + collected_at, already in the CSV
+        self.last_flush = time.monotonic()
+        self.last_part = time.monotonic()
+        self.parts = 0
+        self.lock = threading.Lock()        # Guards buffer / last_flush; held only briefly
+        self.write_lock = threading.Lock()  # Serializes flushes so batches land in order
+        self.stop = threading.Event()
+        self.wake = threading.Event()
         self.initialize_csv()
-        
+        self.timer = threading.Thread(target=self._tick, name="csv-flush", daemon=True)
+        self.timer.start()
+        atexit.register(self.close)
+
     def initialize_csv(self):
-        """Create CSV file with headers if it doesn't exist."""
+        """Create CSV file with headers if it doesn't exist; drop a partial last line if it does."""
         if not os.path.exists(self.filename):
             try:
                 with open(self.filename, 'w', newline='', encoding='utf-8-sig') as f:
                     writer = csv.writer(f)
                     # Header: Blog URL, Blog Title, Email
-                    writer.writerow(["블로그 URL", "블로그 제목", "이메일"])
+                    writer.writerow(HEADER)
                 logger.info(f"Created new CSV file: {self.filename}")
             except Exception as e:
                 logger.error(f"Failed to create CSV file: {e}")
+        else:
+            self.repair_tail()
+
+    def repair_tail(self):
+        """Truncate anything after the last newline (a row torn by a crash mid-write)."""
+        try:
+            with open(self.filename, 'rb+') as f:
+                f.seek(0, os.SEEK_END)
+                size = f.tell()
+                if size == 0:
+                    return
+                chunk = min(size, 64 * 1024)
+                f.seek(size - chunk)
+                tail = f.read(chunk)
+                if tail.endswith(b"\n"):
+                    return
+                cut = tail.rfind(b"\n")
+                keep = size - chunk + cut + 1 if cut != -1 else 0
+                f.truncate(keep)
+                logger.warning(f"✂️ Removed a partial row ({size - keep} bytes) from {self.filename}")
+        except OSError as e:
+            logger.error(f"Failed to check CSV tail: {e}")
 
     def append_data(self, data: Dict[str, str]):
-        """Append a single row of data to the CSV."""
+        """Buffer one row of data; flushed in batches."""
+        # One physical line per row, so a torn write can only ever affect the last line
+        row = [str(data.get(key, "")).replace("\r", " ").replace("\n", " ") for key in ("blog_url", "title", "email")]
+        with self.lock:
+            if not self.buffer:
+                self.last_flush = time.monotonic()  # Age of the oldest pending row
+            self.buffer.append((row, datetime.now().isoformat(timespec="seconds")))
+            due = len(self.buffer) >= config.CSV_FLUSH_ROWS
+        logger.info(f"Buffered for CSV: {data.get('blog_url')}")
+        if due:
+            self.wake.set()  # The flush thread writes; the caller goes on producing
+
+    def _tick(self):
+        # Flush full batches on wake-up, and rows (or Parquet parts) that are due even if no further row arrives
+        interval = max(1.0, config.CSV_FLUSH_SECONDS / 4)
+        while not self.stop.is_set():
+            self.wake.wait(interval)
+            self.wake.clear()
+            if self.stop.is_set():
+                break
+            now = time.monotonic()
+            with self.lock:
+                due = (len(self.buffer) >= config.CSV_FLUSH_ROWS
+                       or (self.buffer and now - self.last_flush >= config.CSV_FLUSH_SECONDS))
+            # parquet_rows / last_part are only touched by flush(), under write_lock
+            if due or (self.parquet_rows and now - self.last_part >= config.PARQUET_PART_SECONDS):
+                self.flush()
+
+    def flush(self, final: bool = False):
+        with self.write_lock:
+            with self.lock:
+                pending, self.buffer = self.buffer, []
+                self.last_flush = time.monotonic()
+            if pending:
+                if self._write_csv([row for row, _ in pending]):
+                    # Parquet only gets rows the CSV has, so a retried batch is never exported twice
+                    if self.parquet:
+                        self.parquet_rows.extend(row + [at] for row, at in pending)
+                else:
+                    with self.lock:
+                        self.buffer[:0] = pending  # Keep them (ahead of newer rows) for the next flush
+            if self.parquet_rows and (final or len(self.parquet_rows) >= config.PARQUET_PART_ROWS
+                                      or time.monotonic() - self.last_part >= config.PARQUET_PART_SECONDS):
+                rows, self.parquet_rows = self.parquet_rows, []
+                self.last_part = time.monotonic()
+                if not self._write_parquet(rows):
+                    self.parquet_rows[:0] = rows  # Retried with the next part
+
+    def _write_csv(self, rows: List[List[str]]) -> bool:
+        out = io.StringIO()
+        csv.writer(out).writerows(rows)
+        data = out.getvalue().encode("utf-8")
         try:
-            with open(self.filename, 'a', newline='', encoding='utf-8-sig') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    data.get("blog_url", ""),
-                    data.get("title", ""),
-                    data.get("email", "")
-                ])
-            logger.info(f"Appended to CSV: {data.get('blog_url')}")
+            # Single append + fsync: the batch lands as whole lines or (on a crash) a torn tail
+            with open(self.filename, 'ab') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            logger.info(f"Appended {len(rows)} rows to CSV")
+            return True
         except Exception as e:
             logger.error(f"Failed to write to CSV: {e}")
+            return False
+
+    def _write_parquet(self, rows: List[List[str]]) -> bool:
+        """False if the part could not be written and the rows should be retried."""
+        try:
+            import pandas as pd
+            directory = os.path.join(config.PARQUET_EXPORT_DIR, f"run_date={self.run_date}")
+            os.makedirs(directory, exist_ok=True)
+            self.parts += 1
+            path = os.path.join(directory, f"part-{datetime.now():%H%M%S}-{os.getpid()}-{self.parts:04d}.parquet")
+            tmp = f"{path}.tmp"
+            pd.DataFrame(rows, columns=PARQUET_COLUMNS).to_parquet(tmp, index=False)
+            os.replace(tmp, path)  # Readers never see a half-written part
+            return True
+        except ImportError as e:
+            logger.warning(f"⚠️ Parquet export disabled (needs pyarrow): {e}")
+            self.parquet = False
+            return True  # Nothing to retry: the export is off
+        except Exception as e:
+            logger.error(f"Failed to write Parquet part: {e}")
+            return False
+
+    def close(self):
+        self.stop.set()
+        self.wake.set()
+        self.flush(final=True)
+        atexit.unregister(self.close)
+
+    def __enter__(self) -> "CSVHandler":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
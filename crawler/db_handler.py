@@ -1,10 +1,7 @@
 import logging
 import os
-import requests
-from supabase import create_client, Client
-import firebase_admin
-from firebase_admin import credentials, firestore
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 try:
     from .. import config
@@ -14,16 +11,47 @@ except ImportError:
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     import config
 
+try:
+    from .place_key import PLACE_LINK_FIELDS, canonical_doc_id, place_id_of, place_link_variants
+    from .shop_record import ShopRecord
+except ImportError:
+    from place_key import PLACE_LINK_FIELDS, canonical_doc_id, place_id_of, place_link_variants
+    from shop_record import ShopRecord
+
 logger = logging.getLogger(__name__)
 
+# Firestore allows at most 500 writes per batch; stay below it.
+DELETE_BATCH_SIZE = 400
+DELETE_WORKERS = 4
+# Firestore caps the values of an `in` filter at 30
+PLACE_QUERY_CHUNK = 30
+
+# Fields that may hold a document's source URL, in order of preference
+URL_FIELDS = ["detail_url", "source_link", "blog_url", "플레이스링크"]
+URL_SCAN_SAMPLE_DOCS = 5
+
+def _approx_size(value) -> int:
+    """Approximate Firestore storage size of a value (strings: UTF-8 bytes + 1, numbers: 8, maps: names + values)."""
+    if isinstance(value, dict):
+        return sum(len(str(k).encode("utf-8")) + 1 + _approx_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(_approx_size(v) for v in value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8")) + 1
+    if value is None or isinstance(value, bool):
+        return 1
+    return 8
+
 class DBHandler:
     def __init__(self):
         self.db_fs = None # Firestore Client
         self.init_firebase()
         
     def init_firebase(self):
-        """Initialize Firebase Admin SDK."""
+        """Initialize Firebase Admin SDK (imported here so importing this module stays cheap)."""
         try:
+            import firebase_admin
+            from firebase_admin import credentials, firestore
             if not firebase_admin._apps:
                 # config.FIREBASE_SERVICE_ACCOUNT can be a dict (from secrets) or a string (file path)
                 cred_info = config.FIREBASE_SERVICE_ACCOUNT
@@ -44,56 +72,194 @@ class DBHandler:
             logger.error(f"Firebase initialization failed: {e}")
             self.db_fs = None
             
-    def insert_shop(self, data: Dict) -> bool:
-        """Insert or update shop in Firebase Firestore."""
+    def insert_shop(self, data: Union[ShopRecord, Dict], doc_id: Optional[str] = None) -> bool:
+        """Insert or update shop in Firebase Firestore, keyed by canonical place ID."""
         if not self.db_fs:
             return False
         try:
-            # Unified key for shops
-            key = data.get("detail_url") or data.get("source_link") or data.get("blog_url") or data.get("플레이스링크")
-            if not key: return False
-            doc_id = key.replace("/", "_").replace(":", "_")
+            record = data if isinstance(data, ShopRecord) else ShopRecord.from_dict(data)
+            payload = record.to_dict()
+            doc_id = doc_id or canonical_doc_id(payload)
+            if not doc_id: return False
             
-            self.db_fs.collection(config.FIREBASE_COLLECTION).document(doc_id).set(data, merge=True)
-            logger.info(f"Successfully saved shop to Firebase: {data.get('name') or data.get('상호명')}")
+            self.db_fs.collection(config.FIREBASE_COLLECTION).document(doc_id).set(payload, merge=True)
+            logger.info(f"Successfully saved shop to Firebase: {record.name}")
             return True
         except Exception as e:
             logger.error(f"Error saving shop to Firebase: {e}")
             return False
 
-    def insert_shop_fs(self, data: Dict) -> bool:
+    def insert_shop_fs(self, data: Union[ShopRecord, Dict], doc_id: Optional[str] = None) -> bool:
         """Alias for backward compatibility."""
-        return self.insert_shop(data)
+        return self.insert_shop(data, doc_id=doc_id)
 
-    def insert_lead(self, data: Dict) -> bool:
+    def insert_lead(self, data: Union[ShopRecord, Dict]) -> bool:
         """Alias for lead insertion."""
         return self.insert_shop(data)
 
-    def insert_lead_fs(self, data: Dict) -> bool:
+    def insert_lead_fs(self, data: Union[ShopRecord, Dict]) -> bool:
         """Alias for lead insertion."""
         return self.insert_shop(data)
 
     def fetch_existing_urls(self) -> List[str]:
-        """Fetch existing shop URLs from Firebase."""
+        """
+        Fetch existing shop URLs from Firebase with a projected scan that only
+        transfers the URL fields; the volume of the skipped fields is estimated
+        from a few full documents and logged.
+        """
         if not self.db_fs:
                 return []
+        from google.cloud.firestore_v1.field_path import FieldPath
+        collection = self.db_fs.collection(config.FIREBASE_COLLECTION)
+        urls = []
+        scanned = received = 0
         try:
-            docs = self.db_fs.collection(config.FIREBASE_COLLECTION).stream()
-            urls = []
+            docs = collection.select([FieldPath(f).to_api_repr() for f in URL_FIELDS]).stream()
             for doc in docs:
-                d = doc.to_dict()
-                url = d.get("detail_url") or d.get("source_link") or d.get("blog_url") or d.get("플레이스링크")
+                scanned += 1
+                d = doc.to_dict() or {}
+                received += _approx_size(d)
+                url = next((d[f] for f in URL_FIELDS if d.get(f)), None)
                 if url: urls.append(url)
-            return urls
         except Exception as e:
             logger.error(f"Error fetching URLs: {e}")
             return []
+        self._log_url_scan(collection, scanned, received)
+        return urls
+
+    def _log_url_scan(self, collection, scanned: int, received: int):
+        """Report the projected scan against an estimate of the full-document scan it replaces."""
+        try:
+            sample = [_approx_size(doc.to_dict() or {}) for doc in collection.limit(URL_SCAN_SAMPLE_DOCS).stream()]
+        except Exception as e:
+            logger.warning(f"Could not sample documents for the URL scan report: {e}")
+            sample = []
+        if not scanned or not sample:
+            logger.info(f"🔑 URL index: {scanned} documents scanned, ~{received / 1024:.1f} KB of URL fields received")
+            return
+        full = sum(sample) / len(sample) * scanned
+        logger.info(
+            f"🔑 URL index: {scanned} documents scanned, ~{received / 1024:.1f} KB of URL fields received; "
+            f"~{max(full - received, 0) / 1024:.1f} KB of other fields not transferred "
+            f"(estimated from {len(sample)} full documents)"
+        )
+
+    def fetch_shop_coordinates(self) -> List[Tuple[str, float, float]]:
+        """(address, longitude, latitude) of every shop with coordinates, via a projected scan."""
+        if not self.db_fs:
+            return []
+        coords = []
+        try:
+            docs = self.db_fs.collection(config.FIREBASE_COLLECTION).select(["address", "latitude", "longitude"]).stream()
+            for doc in docs:
+                d = doc.to_dict() or {}
+                if d.get("latitude") and d.get("longitude"):
+                    coords.append((d.get("address") or "", float(d["longitude"]), float(d["latitude"])))
+        except Exception as e:
+            logger.error(f"Error fetching coordinates: {e}")
+        return coords
+
+    def build_place_index(self) -> Tuple[Dict[str, List[str]], int]:
+        """
+        Map canonical place ID -> document IDs with a single scan that only
+        transfers the link fields. Returns (index, scanned document count).
+        """
+        if not self.db_fs:
+            return {}, 0
+        from google.cloud.firestore_v1.field_path import FieldPath
+        fields = ["place_id"] + PLACE_LINK_FIELDS
+        field_paths = [FieldPath(f).to_api_repr() for f in fields]
+        index: Dict[str, List[str]] = {}
+        scanned = 0
+        try:
+            docs = self.db_fs.collection(config.FIREBASE_COLLECTION).select(field_paths).stream()
+            for doc in docs:
+                scanned += 1
+                pid = place_id_of(doc.to_dict() or {})
+                if pid:
+                    index.setdefault(pid, []).append(doc.id)
+        except Exception as e:
+            logger.error(f"Error building place index: {e}")
+        return index, scanned
+
+    def find_place_documents(self, place_ids: Iterable[str], links: Iterable[str] = (),
+                             doc_ids: Iterable[str] = ()) -> Tuple[List[str], int]:
+        """
+        Existing documents of the given places, with keys-only reads only:
+        chunked `in` queries on place_id and on every link field (documents not yet
+        migrated by migrate_place_keys.py only carry a link), then a get_all of the
+        canonical 'place_<id>' keys and `doc_ids` the queries did not return.
+        Returns (doc IDs, documents read).
+        """
+        pids = [p for p in dict.fromkeys(place_ids) if p]
+        link_values = list(dict.fromkeys(
+            [l for l in links if l] + [v for pid in pids for v in place_link_variants(pid)]
+        ))
+        candidates = list(dict.fromkeys([d for d in doc_ids if d] + [f"place_{pid}" for pid in pids]))
+        if not self.db_fs or not candidates:
+            return [], 0
+        from google.cloud.firestore_v1.field_path import FieldPath
+        collection = self.db_fs.collection(config.FIREBASE_COLLECTION)
+        found: Dict[str, None] = {}
+        reads = 0
+        lookups = [("place_id", pids)] + [(field, link_values) for field in PLACE_LINK_FIELDS]
+        # Lookup errors propagate: a partial resolution would silently leave duplicates behind
+        for field, values in lookups:
+            path = FieldPath(field).to_api_repr()
+            for i in range(0, len(values), PLACE_QUERY_CHUNK):
+                for doc in collection.where(path, "in", values[i:i + PLACE_QUERY_CHUNK]).select([path]).stream():
+                    reads += 1
+                    found[doc.id] = None
+        # Missing documents must not be counted (or patched out of the dashboard) as deleted
+        unseen = [collection.document(d) for d in candidates if d not in found]
+        for i in range(0, len(unseen), DELETE_BATCH_SIZE):
+            for snap in self.db_fs.get_all(unseen[i:i + DELETE_BATCH_SIZE], field_paths=["place_id"]):
+                reads += 1
+                if snap.exists:
+                    found[snap.id] = None
+        return list(found), reads
+
+    def delete_documents(self, doc_ids: Iterable[str], batch_size: int = DELETE_BATCH_SIZE,
+                         max_workers: int = DELETE_WORKERS,
+                         on_progress: Optional[Callable[[int, int], None]] = None) -> Dict:
+        """
+        Delete documents in batched writes committed concurrently.
+        on_progress(done, total) is called from the calling thread after each commit.
+        """
+        ids = [d for d in dict.fromkeys(doc_ids) if d]
+        result = {"deleted_ids": [], "commits": 0, "failed": 0}
+        if not self.db_fs or not ids:
+            return result
+
+        collection = self.db_fs.collection(config.FIREBASE_COLLECTION)
+        chunks = [ids[i:i + batch_size] for i in range(0, len(ids), batch_size)]
+
+        def commit(chunk):
+            batch = self.db_fs.batch()
+            for doc_id in chunk:
+                batch.delete(collection.document(doc_id))
+            batch.commit()
+            return chunk
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(commit, chunk): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                try:
+                    result["deleted_ids"].extend(future.result())
+                    result["commits"] += 1
+                except Exception as e:
+                    result["failed"] += len(futures[future])
+                    logger.error(f"Batch delete failed ({len(futures[future])} docs): {e}")
+                if on_progress:
+                    on_progress(len(result["deleted_ids"]) + result["failed"], len(ids))
+        return result
 
     def save_session(self, platform: str, session_data: str) -> bool:
         """Save browser session data to Firebase."""
         if not self.db_fs:
             return False
         try:
+            from firebase_admin import firestore
             data = {
                 "platform": platform,
                 "session_json": session_data,
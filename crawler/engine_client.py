@@ -0,0 +1,64 @@
+import json
+import logging
+import os
+import socket
+from typing import Dict, Optional
+
+try:
+    from .. import config
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import config
+
+logger = logging.getLogger(__name__)
+
+CONNECT_TIMEOUT = 0.5
+
+def _request(payload: Dict, timeout: Optional[float] = CONNECT_TIMEOUT) -> Optional[Dict]:
+    """
+    Send one JSON-lines request to the engine daemon and return its reply.
+    Returns None when the daemon is unreachable or did not answer in time.
+    Callers fall back to a subprocess only if engine_status.alive_daemon_pid()
+    also reports no daemon: a busy daemon may still act on the request.
+    """
+    try:
+        with socket.create_connection((config.ENGINE_DAEMON_HOST, config.ENGINE_DAEMON_PORT), timeout=CONNECT_TIMEOUT) as sock:
+            sock.settimeout(timeout)
+            sock.sendall((json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8"))
+            with sock.makefile("r", encoding="utf-8") as f:
+                line = f.readline()
+    except OSError:
+        return None
+    try:
+        return json.loads(line)
+    except ValueError:
+        logger.warning(f"Invalid reply from engine daemon: {line!r}")
+        return None
+
+def daemon_available() -> bool:
+    reply = _request({"op": "ping"})
+    return bool(reply and reply.get("ok"))
+
+def submit_job(job_type: str, params: Optional[Dict] = None, priority: Optional[int] = None,
+               wait: bool = False, timeout: Optional[float] = None) -> Optional[Dict]:
+    """
+    Queue a job on the engine daemon. With wait=True the call blocks until the job
+    finished (or `timeout` seconds passed). Returns the job dict, or None if the
+    daemon is unreachable or rejected the job.
+    """
+    payload = {"op": "submit", "type": job_type, "params": params or {}, "priority": priority, "wait": wait}
+    reply = _request(payload, timeout=timeout if wait else CONNECT_TIMEOUT * 4)
+    if not reply:
+        return None
+    if not reply.get("ok"):
+        logger.warning(f"Engine daemon rejected {job_type} job: {reply.get('error')}")
+        return None
+    return reply.get("job")
+
+def daemon_status() -> Optional[Dict]:
+    return _request({"op": "status"})
+
+def cancel_current_job() -> bool:
+    reply = _request({"op": "cancel"})
+    return bool(reply and reply.get("ok"))
@@ -0,0 +1,204 @@
+import json
+import logging
+import os
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from typing import Dict, List, Optional
+
+try:
+    from .. import config
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import config
+
+logger = logging.getLogger(__name__)
+
+# States in which the engine process is expected to keep its heartbeat fresh
+ACTIVE_STATES = ("starting", "running", "finalizing")
+
+# Serializes status writers inside the engine process (progress updates vs. heartbeat thread)
+_status_lock = threading.Lock()
+
+def default_status_path() -> str:
+    return os.environ.get("ENGINE_STATUS_FILE") or os.path.join(os.getcwd(), config.ENGINE_STATUS_FILE)
+
+def daemon_status_path() -> str:
+    return os.path.join(os.getcwd(), config.ENGINE_DAEMON_STATUS_FILE)
+
+def write_status(path: str, data: Dict):
+    """Atomically replace the status file so readers never see a partial write."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def read_status(path: str) -> Optional[Dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def tail_lines(path: str, n: int = 15, block_size: int = 4096) -> List[str]:
+    """Return the last n lines of a file by reading backwards from the end."""
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            data = b""
+            while pos > 0 and data.count(b"\n") <= n:
+                step = min(block_size, pos)
+                pos -= step
+                f.seek(pos)
+                data = f.read(step) + data
+    except OSError:
+        return []
+    lines = data.decode("utf-8", errors="replace").splitlines(keepends=True)
+    return lines[-n:]
+
+def rotate_file(path: str, max_bytes: int = config.ENGINE_LOG_MAX_BYTES, backups: int = config.ENGINE_LOG_BACKUPS):
+    """Shift path -> path.1 -> path.2 ... when it has grown past max_bytes."""
+    try:
+        if os.path.getsize(path) < max_bytes:
+            return
+    except OSError:
+        return
+    for i in range(backups - 1, 0, -1):
+        src, dst = f"{path}.{i}", f"{path}.{i + 1}"
+        if os.path.exists(src):
+            os.replace(src, dst)
+    os.replace(path, f"{path}.1")
+
+def configure_engine_logging(log_path: str, fmt: str = '%(asctime)s - %(levelname)s - %(message)s'):
+    """Route engine logging to a size-bounded rotating file instead of stderr."""
+    handler = RotatingFileHandler(log_path, maxBytes=config.ENGINE_LOG_MAX_BYTES,
+                                  backupCount=config.ENGINE_LOG_BACKUPS, encoding="utf-8")
+    handler.setFormatter(logging.Formatter(fmt))
+    root = logging.getLogger()
+    for h in list(root.handlers):
+        root.removeHandler(h)
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+
+def update_status(path: Optional[str] = None, **fields):
+    """Read-modify-write the status file, keeping fields written by other updaters."""
+    path = path or default_status_path()
+    with _status_lock:
+        data = read_status(path) or {"pid": os.getpid()}
+        data.update(fields)
+        data["updated_at"] = time.time()
+        try:
+            write_status(path, data)
+        except OSError as e:
+            logger.warning(f"Could not write engine status: {e}")
+
+def mark_status(state: str, path: Optional[str] = None, **fields):
+    """Update the state of the last published status (e.g. 'crashed' from a top-level handler)."""
+    update_status(path, state=state, **fields)
+
+def start_heartbeat(path: Optional[str] = None, interval: float = config.ENGINE_HEARTBEAT_INTERVAL,
+                    **fields) -> threading.Event:
+    """
+    Refresh pid/heartbeat_at (and `fields`) in the status file every `interval` seconds
+    from a daemon thread, so liveness survives long steps that publish no progress.
+    Set the returned event to stop the thread.
+    """
+    stop = threading.Event()
+
+    def _beat():
+        while not stop.is_set():
+            update_status(path, pid=os.getpid(), heartbeat_at=time.time(), **fields)
+            stop.wait(interval)
+
+    threading.Thread(target=_beat, name="engine-heartbeat", daemon=True).start()
+    return stop
+
+def alive_engine_pid(status: Optional[Dict], timeout: float = config.ENGINE_HEARTBEAT_TIMEOUT) -> Optional[int]:
+    """
+    Return the engine PID if the status describes a live engine: an active state
+    with a fresh heartbeat. On POSIX the PID is additionally probed with signal 0
+    (no process is spawned); on Windows the heartbeat alone decides.
+    """
+    if not status or status.get("state") not in ACTIVE_STATES:
+        return None
+    beat = status.get("heartbeat_at") or status.get("updated_at") or 0
+    if time.time() - beat > timeout:
+        return None
+    pid = status.get("pid")
+    if pid and os.name != "nt":
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return None
+        except PermissionError:
+            pass
+    return pid
+
+def alive_daemon_pid(path: Optional[str] = None, timeout: float = config.ENGINE_HEARTBEAT_TIMEOUT) -> Optional[int]:
+    """
+    PID of a running engine daemon according to its own heartbeat file, whether or
+    not it answers the socket right now (it may be busy inside a job).
+    """
+    status = read_status(path or daemon_status_path())
+    if not status or status.get("state") == "stopped":
+        return None
+    return alive_engine_pid(dict(status, state="running"), timeout)
+
+class EngineStatus:
+    """
+    Small JSON status channel published by the crawl engine
+    (progress, rate, current keyword, ETA) and read by the dashboard in O(1).
+    """
+    def __init__(self, path: Optional[str] = None, total: int = 0, **fields):
+        self.path = path or default_status_path()
+        self.started_at = time.time()
+        self.data = {
+            "pid": os.getpid(),
+            "state": "running",
+            "current": 0,
+            "total": total,
+            "keyword": "",
+            "keyword_index": 0,
+            "keyword_total": 0,
+            "rate_per_min": 0.0,
+            "eta_seconds": None,
+            "started_at": self.started_at,
+            "updated_at": self.started_at,
+        }
+        self.data.update(fields)
+        self._write()
+
+    def publish(self, **fields):
+        self.data.update(fields)
+        now = time.time()
+        elapsed = max(now - self.started_at, 1e-6)
+        current = self.data.get("current", 0)
+        self.data["rate_per_min"] = round(current / elapsed * 60, 2)
+
+        # The run stops at whichever runs out first: the target count or the keywords.
+        etas = []
+        total = self.data.get("total", 0)
+        if current and total:
+            etas.append((total - current) / (current / elapsed))
+        kw_done, kw_total = self.data.get("keyword_index", 0), self.data.get("keyword_total", 0)
+        if kw_done and kw_total:
+            etas.append((kw_total - kw_done) / (kw_done / elapsed))
+        self.data["eta_seconds"] = int(min(etas)) if etas else None
+        self.data["updated_at"] = now
+        self._write()
+
+    def finish(self, state: str = "finished", **fields):
+        self.data.update(fields)
+        self.data.update(state=state, eta_seconds=0, updated_at=time.time())
+        self._write()
+
+    def _write(self):
+        # Every write doubles as a heartbeat
+        with _status_lock:
+            self.data["heartbeat_at"] = time.time()
+            try:
+                write_status(self.path, self.data)
+            except OSError as e:
+                logger.warning(f"Could not write engine status: {e}")
@@ -1,53 +1,85 @@
-import re
 from bs4 import BeautifulSoup
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 import logging
 
 try:
-    from .safe_crawler import SafeCrawler
+    from .. import config
 except ImportError:
-    from safe_crawler import SafeCrawler
+    import sys
+    import os
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import config
+
+try:
+    from .safe_crawler import AsyncSafeCrawler
+except ImportError:
+    from safe_crawler import AsyncSafeCrawler
+
+try:
+    from .negative_store import FETCH_FAILED, IFRAME_ONLY, NO_EMAIL
+except ImportError:
+    from negative_store import FETCH_FAILED, IFRAME_ONLY, NO_EMAIL
+
+try:
+    from .url_canon import canonical_url
+except ImportError:
+    from url_canon import canonical_url
+
+try:
+    from .contact_extractor import MIN_EMAIL_CONFIDENCE, extract_contacts
+except ImportError:
+    from contact_extractor import MIN_EMAIL_CONFIDENCE, extract_contacts
 
 logger = logging.getLogger(__name__)
 
 class Extractor:
-    def __init__(self, crawler: SafeCrawler):
+    def __init__(self, crawler: AsyncSafeCrawler):
         self.crawler = crawler
-        # Simple email regex
-        self.email_regex = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
 
     def extract_email(self, text: str) -> Optional[str]:
-        """Find the first email address in text."""
-        match = self.email_regex.search(text)
-        if match:
-            return match.group(0)
-        return None
+        """Most likely email address written in the text or HTML (guesses from blog IDs excluded)."""
+        return extract_contacts(text).best("email", min_confidence=MIN_EMAIL_CONFIDENCE)
 
-    def extract_blog_data(self, url: str) -> Optional[Dict[str, str]]:
+    def fetch_url(self, url: str) -> str:
+        """The URL actually requested for a blog post."""
+        if "blog.naver.com" in url and "m.blog.naver.com" not in url:
+            # Strategy: Fetch the main page, look for 'mainFrame' or retrieve ID/logNo.
+            # A simpler way for text extraction is requesting the mobile version: m.blog.naver.com/...
+            return url.replace("blog.naver.com", "m.blog.naver.com")
+        return url
+
+    def no_email_reason(self, soup: BeautifulSoup) -> str:
+        """A page that is little more than a frame shell was never really read."""
+        if soup.find(["iframe", "frame"]) and len(soup.get_text(" ", strip=True)) < config.IFRAME_ONLY_MAX_TEXT:
+            return IFRAME_ONLY
+        return NO_EMAIL
+
+    async def extract_blog_data(self, url: str) -> Optional[Dict[str, str]]:
         """
         Visit the blog URL and extract title and email.
         Handles Naver's iframe structure.
         """
+        data, _ = await self.extract_blog_result(url)
+        return data
+
+    async def extract_blog_result(self, url: str) -> Tuple[Optional[Dict[str, str]], Optional[str]]:
+        """(data, None) for a lead, or (None, reason code) when the blog produced none."""
         logger.info(f"Extracting data from: {url}")
         
         # Special handling for Naver blogs due to iframes
         if "blog.naver.com" in url:
-            return self._extract_naver_blog(url)
+            return await self._extract_naver_blog(url)
         else:
-            return self._extract_generic_blog(url)
+            return await self._extract_generic_blog(url)
 
-    def _extract_naver_blog(self, url: str) -> Optional[Dict[str, str]]:
+    async def _extract_naver_blog(self, url: str) -> Tuple[Optional[Dict[str, str]], Optional[str]]:
         # Naver blogs often use frames. The real content is in the iframe src.
         # But for 'blog.naver.com/ID/PostID', we can usually get the ID/PostID
         # and construct the mobile version URL or main frame URL.
         
-        # Strategy: Fetch the main page, look for 'mainFrame' or retrieve ID/logNo.
-        # A simpler way for text extraction is requesting the mobile version: m.blog.naver.com/...
-        mobile_url = url.replace("blog.naver.com", "m.blog.naver.com")
-        
-        response = self.crawler.get_with_retry(mobile_url)
+        response = await self.crawler.get_with_retry(self.fetch_url(url))
         if not response:
-            return None
+            return None, FETCH_FAILED
             
         soup = BeautifulSoup(response.text, 'html.parser')
         
@@ -56,40 +88,37 @@ class Extractor:
         title_tag = soup.select_one("div.se-module-text p") or soup.select_one("h3.tit_h3") or soup.select_one("title")
         title = title_tag.get_text(strip=True) if title_tag else "No Title"
         
-        # Email: Scan the whole text
-        # Profile area is also good to check
-        text_content = soup.get_text(" ", strip=True)
-        email = self.extract_email(text_content)
+        # Email: one scan over the raw HTML (profile area included)
+        email = self.extract_email(response.text)
         
         if email:
             return {
-                "blog_url": url,
+                "blog_url": canonical_url(url),
                 "title": title,
                 "email": email
-            }
+            }, None
         else:
             logger.info(f"No email found in {url}")
-            return None
+            return None, self.no_email_reason(soup)
 
-    def _extract_generic_blog(self, url: str) -> Optional[Dict[str, str]]:
-        response = self.crawler.get_with_retry(url)
+    async def _extract_generic_blog(self, url: str) -> Tuple[Optional[Dict[str, str]], Optional[str]]:
+        response = await self.crawler.get_with_retry(url)
         if not response:
-            return None
+            return None, FETCH_FAILED
             
         soup = BeautifulSoup(response.text, 'html.parser')
         
         title_tag = soup.select_one("title")
         title = title_tag.get_text(strip=True) if title_tag else "No Title"
         
-        text_content = soup.get_text(" ", strip=True)
-        email = self.extract_email(text_content)
+        email = self.extract_email(response.text)
         
         if email:
             return {
-                "blog_url": url,
+                "blog_url": canonical_url(url),
                 "title": title,
                 "email": email
-            }
+            }, None
         
         logger.info(f"No email found in {url}")
-        return None
+        return None, self.no_email_reason(soup)
@@ -0,0 +1,147 @@
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+try:
+    from .. import config
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import config
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (
+    run_id      TEXT NOT NULL,
+    keyword     TEXT NOT NULL,
+    seq         INTEGER NOT NULL,
+    state       TEXT NOT NULL DEFAULT 'pending',  -- pending | claimed | done | failed
+    worker      TEXT,
+    lease_until REAL,
+    saved       INTEGER NOT NULL DEFAULT 0,
+    error       TEXT,
+    updated_at  REAL,
+    PRIMARY KEY (run_id, keyword)
+)
+"""
+
+def worker_status_path(worker_id: str) -> str:
+    base, ext = os.path.splitext(os.path.join(os.getcwd(), config.ENGINE_STATUS_FILE))
+    return f"{base}.{worker_id}{ext}"
+
+def worker_checkpoint_path(worker_id: str) -> str:
+    return os.path.join(os.getcwd(), f"crawler_checkpoint.{worker_id}.json")
+
+class Frontier:
+    """
+    Shared keyword frontier for sharded crawls, stored in SQLite so several worker
+    processes can claim dong keywords without handing out the same one twice.
+    A claim is a lease: if a worker dies, its keyword becomes claimable again once
+    the lease expires (or immediately on a --resume launch via requeue_claimed).
+    """
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(os.getcwd(), config.FRONTIER_DB_FILE)
+        with self._connect() as conn:
+            conn.execute(SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Autocommit mode; multi-statement updates use explicit BEGIN IMMEDIATE ... COMMIT
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            yield conn
+        finally:
+            conn.close()
+
+    def seed(self, run_id: str, keywords: List[str], reset: bool = False) -> int:
+        """Add keywords for a run (existing ones keep their state). Returns the number added."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if reset:
+                conn.execute("DELETE FROM frontier WHERE run_id = ?", (run_id,))
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO frontier (run_id, keyword, seq, updated_at) VALUES (?, ?, ?, ?)",
+                [(run_id, kw, i, now) for i, kw in enumerate(keywords)]
+            )
+            added = conn.total_changes - before
+            conn.execute("COMMIT")
+        return added
+
+    def claim(self, run_id: str, worker_id: str, lease_seconds: float = config.FRONTIER_LEASE_SECONDS) -> Optional[str]:
+        """Atomically take the next pending (or lease-expired) keyword."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")  # Write lock: no two workers see the same row as pending
+            row = conn.execute(
+                "SELECT keyword FROM frontier WHERE run_id = ? "
+                "AND (state = 'pending' OR (state = 'claimed' AND lease_until < ?)) "
+                "ORDER BY seq LIMIT 1", (run_id, now)
+            ).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE frontier SET state = 'claimed', worker = ?, lease_until = ?, updated_at = ? "
+                    "WHERE run_id = ? AND keyword = ?",
+                    (worker_id, now + lease_seconds, now, run_id, row[0])
+                )
+            conn.execute("COMMIT")
+        return row[0] if row else None
+
+    def claims(self, run_id: str, worker_id: str) -> Iterator[str]:
+        """Yield keywords until the frontier for run_id is drained."""
+        while True:
+            keyword = self.claim(run_id, worker_id)
+            if keyword is None:
+                return
+            yield keyword
+
+    def _finish(self, run_id: str, keyword: str, state: str, saved: int = 0, error: Optional[str] = None):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE frontier SET state = ?, saved = ?, error = ?, lease_until = NULL, updated_at = ? "
+                "WHERE run_id = ? AND keyword = ?",
+                (state, saved, error, time.time(), run_id, keyword)
+            )
+
+    def complete(self, run_id: str, keyword: str, saved: int = 0):
+        self._finish(run_id, keyword, "done", saved=saved)
+
+    def fail(self, run_id: str, keyword: str, error: str):
+        self._finish(run_id, keyword, "failed", error=error)
+
+    def release(self, run_id: str, keyword: str):
+        """Give a claimed keyword back (e.g. stopped early or blocked)."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE frontier SET state = 'pending', worker = NULL, lease_until = NULL, updated_at = ? "
+                "WHERE run_id = ? AND keyword = ? AND state = 'claimed'",
+                (time.time(), run_id, keyword)
+            )
+
+    def requeue_claimed(self, run_id: str) -> int:
+        """Return keywords claimed by a previous (dead) set of workers to the pending pool."""
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE frontier SET state = 'pending', worker = NULL, lease_until = NULL "
+                "WHERE run_id = ? AND state = 'claimed'", (run_id,)
+            )
+            return cur.rowcount
+
+    def progress(self, run_id: str) -> Dict[str, int]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT state, COUNT(*), COALESCE(SUM(saved), 0) FROM frontier WHERE run_id = ? GROUP BY state",
+                (run_id,)
+            ).fetchall()
+        counts = {"pending": 0, "claimed": 0, "done": 0, "failed": 0, "saved": 0}
+        for state, n, saved in rows:
+            counts[state] = n
+            counts["saved"] += saved
+        counts["total"] = sum(counts[s] for s in ("pending", "claimed", "done", "failed"))
+        return counts
@@ -0,0 +1,162 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+try:
+    from .. import config
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import config
+
+logger = logging.getLogger(__name__)
+
+def cache_key(url: str, params: Optional[Dict] = None) -> str:
+    """Stable key for a GET: lowercased scheme/host, no fragment, query and params merged and sorted."""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True) + [(k, str(v)) for k, v in (params or {}).items()]
+    normalized = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/",
+                             urlencode(sorted(query)), ""))
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+def url_class(url: str) -> str:
+    return "search" if urlsplit(url).hostname in config.HTTP_CACHE_SEARCH_HOSTS else "post"
+
+class CachedResponse:
+    """Stand-in for a response served from the cache (the fields the crawlers' callers read)."""
+    status_code = 200
+    from_cache = True
+
+    def __init__(self, entry: Dict):
+        self.url = entry["url"]
+        self.text = entry["text"]
+        self.headers = entry.get("headers", {})
+        self.content = self.text.encode("utf-8")
+
+class CacheEntry:
+    def __init__(self, key: str, data: Dict):
+        self.key = key
+        self.data = data
+
+    @property
+    def fresh(self) -> bool:
+        ttl = config.HTTP_CACHE_TTLS.get(url_class(self.data["url"]), 0)
+        return time.time() - self.data["fetched_at"] < ttl
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating a stale entry."""
+        headers = {}
+        if self.data["headers"].get("etag"):
+            headers["If-None-Match"] = self.data["headers"]["etag"]
+        if self.data["headers"].get("last-modified"):
+            headers["If-Modified-Since"] = self.data["headers"]["last-modified"]
+        return headers
+
+    def response(self) -> CachedResponse:
+        return CachedResponse(self.data)
+
+class HttpCache:
+    """
+    On-disk GET cache for the blog crawler: gzip-compressed entries keyed by the
+    normalized URL and params. Fresh entries (per-URL-class TTL) are served without
+    a request; stale ones are revalidated with ETag / Last-Modified so an unchanged
+    page costs a 304 instead of a full download.
+    """
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.path.join(os.getcwd(), config.HTTP_CACHE_DIR)
+        os.makedirs(self.directory, exist_ok=True)
+        # lookups = hits (fresh) + misses (no usable entry) + stale; stale entries end up
+        # revalidated (304) or re-downloaded
+        self.stats = {"lookups": 0, "hits": 0, "stale": 0, "revalidated": 0, "misses": 0, "stored": 0,
+                      "bytes_saved": 0, "bytes_downloaded": 0}
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json.gz")
+
+    def lookup(self, url: str, params: Optional[Dict] = None) -> Optional[CacheEntry]:
+        key = cache_key(url, params)
+        self.stats["lookups"] += 1
+        try:
+            with gzip.open(self._path(key), "rt", encoding="utf-8") as f:
+                entry = CacheEntry(key, json.load(f))
+        except FileNotFoundError:
+            self.stats["misses"] += 1
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Unreadable cache entry for {url}: {e}")
+            self.stats["misses"] += 1
+            return None
+        if entry.fresh:
+            self.stats["hits"] += 1
+            self.stats["bytes_saved"] += len(entry.data["text"].encode("utf-8"))
+        else:
+            self.stats["stale"] += 1
+        return entry
+
+    def _write(self, key: str, data: Dict):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def store(self, url: str, params: Optional[Dict], response) -> None:
+        """Cache a 200 response (requests or httpx)."""
+        self.stats["bytes_downloaded"] += len(response.content)
+        data = {
+            "url": url,
+            "text": response.text,
+            "headers": {name: response.headers[name] for name in ("etag", "last-modified") if name in response.headers},
+            "fetched_at": time.time(),
+        }
+        try:
+            self._write(cache_key(url, params), data)
+            self.stats["stored"] += 1
+        except OSError as e:
+            logger.warning(f"⚠️ Could not cache {url}: {e}")
+
+    def revalidated(self, entry: CacheEntry, response) -> CachedResponse:
+        """The server answered 304: keep the body, restart its TTL, pick up new validators."""
+        self.stats["revalidated"] += 1
+        self.stats["bytes_saved"] += len(entry.data["text"].encode("utf-8"))
+        for name in ("etag", "last-modified"):
+            if name in response.headers:
+                entry.data["headers"][name] = response.headers[name]
+        entry.data["fetched_at"] = time.time()
+        try:
+            self._write(entry.key, entry.data)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not refresh cache entry for {entry.data['url']}: {e}")
+        return entry.response()
+
+    def prune(self, max_age: float = None) -> int:
+        """Delete entries not fetched or revalidated within max_age seconds."""
+        max_age = config.HTTP_CACHE_MAX_AGE if max_age is None else max_age
+        cutoff = time.time() - max_age
+        removed = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+        return removed
+
+    def summary(self) -> str:
+        s = self.stats
+        lookups = s["lookups"]
+        # Everything that was neither a fresh hit nor a 304 needed a full download (or failed)
+        missed = lookups - s["hits"] - s["revalidated"]
+        hit_rate = s["hits"] / lookups * 100 if lookups else 0.0
+        revalidated_rate = s["revalidated"] / lookups * 100 if lookups else 0.0
+        return (f"{lookups} lookups: hit rate {hit_rate:.0f}% ({s['hits']} fresh), "
+                f"revalidated {revalidated_rate:.0f}% ({s['revalidated']} x 304), {missed} misses "
+                f"({s['misses']} uncached, {s['stale'] - s['revalidated']} stale not revalidated), "
+                f"{s['stored']} stored | "
+                f"{s['bytes_saved'] / 1024:.0f} KB saved, {s['bytes_downloaded'] / 1024:.0f} KB downloaded")
@@ -0,0 +1,126 @@
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    from .. import config
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import config
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS keyword_stats (
+    keyword     TEXT PRIMARY KEY,
+    runs        INTEGER NOT NULL DEFAULT 0,
+    listed      INTEGER NOT NULL DEFAULT 0,  -- last run
+    new         INTEGER NOT NULL DEFAULT 0,  -- last run: listed place IDs not seen before
+    overlap     INTEGER NOT NULL DEFAULT 0,  -- last run: listed place IDs already seen
+    saved       INTEGER NOT NULL DEFAULT 0,  -- last run
+    spillover   INTEGER NOT NULL DEFAULT 0,  -- last run: saved shops outside the keyword's city
+    seconds     REAL NOT NULL DEFAULT 0,     -- last run
+    yield_ewma  REAL,                        -- smoothed new / listed
+    crawled_at  REAL
+)
+"""
+
+def keyword_group(keyword: str) -> str:
+    """'서울 강남구 역삼동 피부관리샵' -> '서울 강남구' (neighbouring dongs share a prior)."""
+    return " ".join(keyword.split()[:2])
+
+class KeywordStats:
+    """
+    Per-keyword yield history (new place IDs / listed) kept next to the crawl frontier.
+    Used to crawl high-yield keywords first and to skip keywords whose results were
+    recently saturated with already-known shops.
+    """
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(os.getcwd(), config.FRONTIER_DB_FILE)
+        with self._connect() as conn:
+            conn.execute(SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def record(self, keyword: str, listed: int, new: int, overlap: int, saved: int = 0,
+               spillover: int = 0, seconds: float = 0.0):
+        current = new / listed if listed else 0.0
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT yield_ewma FROM keyword_stats WHERE keyword = ?", (keyword,)).fetchone()
+            alpha = config.KEYWORD_YIELD_ALPHA
+            smoothed = current if not row or row[0] is None else alpha * current + (1 - alpha) * row[0]
+            conn.execute(
+                "INSERT INTO keyword_stats (keyword, runs, listed, new, overlap, saved, spillover, seconds, yield_ewma, crawled_at) "
+                "VALUES (?, 1, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(keyword) DO UPDATE SET runs = runs + 1, listed = excluded.listed, new = excluded.new, "
+                "overlap = excluded.overlap, saved = excluded.saved, spillover = excluded.spillover, "
+                "seconds = excluded.seconds, yield_ewma = excluded.yield_ewma, crawled_at = excluded.crawled_at",
+                (keyword, listed, new, overlap, saved, spillover, seconds, smoothed, time.time())
+            )
+            conn.execute("COMMIT")
+
+    def load(self) -> Dict[str, Dict]:
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            return {row["keyword"]: dict(row) for row in conn.execute("SELECT * FROM keyword_stats")}
+
+    def prioritize(self, keywords: List[str]) -> Tuple[List[str], List[str]]:
+        """
+        Order keywords by predicted yield (highest first) and drop saturated ones.
+        Unseen keywords are predicted from their district's average yield, or
+        crawled first when the district is unexplored too.
+        Returns (ordered keywords, skipped keywords).
+        """
+        stats = self.load()
+        if not stats:
+            return list(keywords), []
+
+        group_yields: Dict[str, List[float]] = {}
+        for kw, row in stats.items():
+            if row["yield_ewma"] is not None:
+                group_yields.setdefault(keyword_group(kw), []).append(row["yield_ewma"])
+
+        now = time.time()
+        recheck_after = config.KEYWORD_RECHECK_DAYS * 86400
+        scored, skipped = [], []
+        for i, kw in enumerate(keywords):
+            row = stats.get(kw)
+            if row and row["yield_ewma"] is not None:
+                predicted = row["yield_ewma"]
+                recent = now - (row["crawled_at"] or 0) < recheck_after
+                if recent and predicted < config.KEYWORD_SATURATED_YIELD:
+                    skipped.append(kw)
+                    continue
+            else:
+                group = group_yields.get(keyword_group(kw))
+                predicted = sum(group) / len(group) if group else 1.0
+            scored.append((-predicted, i, kw))
+        scored.sort()
+        return [kw for _, _, kw in scored], skipped
+
+    def summary(self, keywords: List[str]) -> Dict[str, float]:
+        """Totals over the given keywords' last runs (new shops per hour of crawl time)."""
+        stats = self.load()
+        rows = [stats[kw] for kw in keywords if kw in stats]
+        seconds = sum(r["seconds"] for r in rows)
+        saved = sum(r["saved"] for r in rows)
+        listed = sum(r["listed"] for r in rows)
+        return {
+            "keywords": len(rows),
+            "listed": listed,
+            "new": sum(r["new"] for r in rows),
+            "overlap_ratio": round(sum(r["overlap"] for r in rows) / listed, 3) if listed else 0.0,
+            "spillover": sum(r["spillover"] for r in rows),
+            "saved_per_hour": round(saved / seconds * 3600, 1) if seconds else 0.0,
+        }
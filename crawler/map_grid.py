@@ -0,0 +1,209 @@
+import json
+import logging
+import re
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import requests
+
+try:
+    from .. import config
+except ImportError:
+    import sys
+    import os
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import config
+
+try:
+    from .rate_controller import RateController
+except ImportError:
+    from rate_controller import RateController
+
+logger = logging.getLogger(__name__)
+
+class BlockedError(RuntimeError):
+    """The list endpoint answered with a block page (even if the status was 200)."""
+
+class Cell(NamedTuple):
+    """Map rectangle in WGS84 degrees (x = longitude, y = latitude)."""
+    min_x: float
+    min_y: float
+    max_x: float
+    max_y: float
+    depth: int = 0
+
+    def split(self) -> List["Cell"]:
+        mid_x = (self.min_x + self.max_x) / 2
+        mid_y = (self.min_y + self.max_y) / 2
+        d = self.depth + 1
+        return [
+            Cell(self.min_x, self.min_y, mid_x, mid_y, d),
+            Cell(mid_x, self.min_y, self.max_x, mid_y, d),
+            Cell(self.min_x, mid_y, mid_x, self.max_y, d),
+            Cell(mid_x, mid_y, self.max_x, self.max_y, d),
+        ]
+
+    def contains(self, x: float, y: float) -> bool:
+        # Half-open on the max edges so a point on a shared border belongs to one cell only
+        return self.min_x <= x < self.max_x and self.min_y <= y < self.max_y
+
+    @property
+    def bounds_param(self) -> str:
+        return f"{self.min_x:.6f};{self.min_y:.6f};{self.max_x:.6f};{self.max_y:.6f}"
+
+    @classmethod
+    def from_bounds_param(cls, value: str) -> "Cell":
+        min_x, min_y, max_x, max_y = (float(v) for v in value.split(";"))
+        return cls(min_x, min_y, max_x, max_y)
+
+def region_bbox(target_area: str, coords: Iterable[Tuple[str, float, float]] = ()) -> Cell:
+    """
+    Bounding box of a region: the padded extent of known shops whose address is in
+    the region, or a box around the region centroid when too few are known.
+    """
+    points = [(x, y) for address, x, y in coords if address.startswith(target_area)]
+    if len(points) >= config.MAP_GRID_MIN_POINTS:
+        pad = config.MAP_GRID_PADDING_DEG
+        xs, ys = [p[0] for p in points], [p[1] for p in points]
+        return Cell(min(xs) - pad, min(ys) - pad, max(xs) + pad, max(ys) + pad)
+    if target_area not in config.REGION_CENTROIDS:
+        raise ValueError(f"No known shops or centroid for region: {target_area}")
+    cx, cy = config.REGION_CENTROIDS[target_area]
+    r = config.MAP_GRID_FALLBACK_RADIUS_DEG
+    return Cell(cx - r, cy - r, cx + r, cy + r)
+
+def parse_apollo_places(html: str) -> List[Dict]:
+    """Place entries (id, name, x, y, ...) from the __APOLLO_STATE__ of a list page."""
+    start = html.find("window.__APOLLO_STATE__")
+    if start == -1:
+        return []
+    start = html.find("{", start)
+    end = html.find("</script>", start)
+    raw = html[start:end].strip().rstrip(";")
+    try:
+        state = json.loads(raw)
+    except ValueError:
+        return []
+    places = []
+    for key, value in state.items():
+        if not isinstance(value, dict) or "id" not in value or "x" not in value or "y" not in value:
+            continue
+        if not re.fullmatch(r"\d+", str(value["id"])):
+            continue
+        try:
+            x, y = float(value["x"]), float(value["y"])
+        except (TypeError, ValueError):
+            continue
+        places.append({
+            "place_id": str(value["id"]),
+            "name": value.get("name") or "",
+            "phone": value.get("phone") or value.get("virtualPhone") or "",
+            "address": value.get("roadAddress") or value.get("address") or "",
+            "longitude": x,
+            "latitude": y,
+        })
+    return places
+
+class MapListClient:
+    """Fetches the map-bounds list endpoint for one cell (plain HTTP, no browser)."""
+    def __init__(self, base_url: str = None, query: str = None, rate: Optional[RateController] = None,
+                 session: Optional[requests.Session] = None):
+        self.base_url = (base_url or config.MAP_LIST_BASE_URL).rstrip("/")
+        self.query = query or config.BASE_KEYWORD
+        self.rate = rate
+        self.session = session or requests.Session()
+        self.session.headers.update({
+            "User-Agent": config.USER_AGENTS[0],
+            "Accept-Language": "ko-KR,ko;q=0.9",
+            "Referer": f"{self.base_url}/",
+        })
+
+    def fetch(self, cell: Cell) -> List[Dict]:
+        """
+        Every place the endpoint returned for the cell, unfiltered: it may pad results
+        with nearby places outside the bounds, and those still count toward its cap.
+        """
+        if self.rate:
+            self.rate.wait()
+        params = {
+            "query": self.query,
+            "x": f"{(cell.min_x + cell.max_x) / 2:.6f}",
+            "y": f"{(cell.min_y + cell.max_y) / 2:.6f}",
+            "bounds": cell.bounds_param,
+        }
+        resp = self.session.get(f"{self.base_url}/place/list", params=params, timeout=config.REQUEST_TIMEOUT)
+        if self.rate:
+            signal = self.rate.observe(status=resp.status_code, latency=resp.elapsed.total_seconds(), content=resp.text)
+            if signal == "blocked":
+                # A block page parses to no places; it must not pass for an empty cell
+                raise BlockedError(f"block page (HTTP {resp.status_code})")
+        resp.raise_for_status()
+        return parse_apollo_places(resp.text)
+
+def quadtree_search(root: Cell, fetch: Callable[[Cell], List[Dict]], cap: int = None,
+                    max_depth: int = None, should_stop: Optional[Callable[[], bool]] = None,
+                    sleep: Callable[[float], None] = time.sleep) -> Tuple[Dict[str, Dict], Dict]:
+    """
+    Cover `root` with bounds queries. A cell whose raw result count reaches the
+    per-query cap may be truncated, so it is split into four and each quadrant queried
+    again; sparse cells are final. Failed cells are re-queued with exponential backoff
+    (up to MAP_GRID_CELL_RETRIES times). Listing stops early once `should_stop()` is
+    true, e.g. when the rate controller is exhausted. Returns (place_id -> place, stats).
+    """
+    cap = cap or config.MAP_LIST_RESULT_CAP
+    max_depth = config.MAP_GRID_MAX_DEPTH if max_depth is None else max_depth
+    places: Dict[str, Dict] = {}
+    stats = {"queries": 0, "subdivided": 0, "leaves": 0, "truncated_leaves": 0,
+             "listings": 0, "max_depth": 0, "failed": 0, "retries": 0, "unfinished": 0, "stopped": False}
+    queue = deque([(root, 0, 0.0)])  # (cell, failed attempts, not before)
+    while queue:
+        if should_stop and should_stop():
+            stats["stopped"] = True
+            stats["unfinished"] = len(queue)
+            logger.error(f"🛑 Grid listing stopped with {len(queue)} cells left")
+            break
+        cell, attempts, not_before = queue.popleft()
+        now = time.monotonic()
+        if not_before > now:
+            # Backing off: query ready cells meanwhile, sleep only when none is ready
+            queue.append((cell, attempts, not_before))
+            earliest = min(nb for _, _, nb in queue)
+            if earliest > now:
+                sleep(earliest - now)
+            continue
+        try:
+            raw = fetch(cell)
+        except Exception as e:
+            if attempts < config.MAP_GRID_CELL_RETRIES:
+                delay = config.MAP_GRID_RETRY_BACKOFF * 2 ** attempts
+                stats["retries"] += 1
+                queue.append((cell, attempts + 1, time.monotonic() + delay))
+                logger.warning(f"⚠️ Grid query failed for {cell.bounds_param}: {e} (retry in {delay:.0f}s)")
+            else:
+                stats["failed"] += 1
+                logger.error(f"❌ Grid query gave up for {cell.bounds_param} after {attempts + 1} attempts: {e}")
+            continue
+        stats["queries"] += 1
+        results = [p for p in raw if cell.contains(p["longitude"], p["latitude"])]
+        stats["listings"] += len(results)
+        stats["max_depth"] = max(stats["max_depth"], cell.depth)
+        for place in results:
+            places.setdefault(place["place_id"], place)
+
+        # Out-of-bounds padding still fills the response, so the cap applies to the raw count
+        if len(raw) >= cap:
+            if cell.depth < max_depth:
+                stats["subdivided"] += 1
+                queue.extend((child, 0, 0.0) for child in cell.split())
+                continue
+            stats["truncated_leaves"] += 1
+            logger.warning(f"⚠️ Cell at max depth still hits the cap ({len(raw)}): {cell.bounds_param}")
+        stats["leaves"] += 1
+
+    stats["unique"] = len(places)
+    stats["redundant_ratio"] = round(1 - len(places) / stats["listings"], 3) if stats["listings"] else 0.0
+    return places, stats
+
+def grid_list_rate() -> RateController:
+    return RateController(min_delay=config.MAP_LIST_MIN_DELAY, max_delay=config.MAP_LIST_MAX_DELAY, name="map-list")
@@ -0,0 +1,93 @@
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, Optional
+
+try:
+    from .. import config
+except ImportError:
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import config
+
+logger = logging.getLogger(__name__)
+
+# Reason codes
+NO_EMAIL = "no_email"          # Page fetched, no email address in it
+FETCH_FAILED = "fetch_failed"  # All attempts failed (or the host's circuit was open)
+IFRAME_ONLY = "iframe_only"    # Only a frame shell came back; the content was never seen
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS negative_results (
+    url         TEXT PRIMARY KEY,
+    reason      TEXT NOT NULL,
+    visits      INTEGER NOT NULL DEFAULT 0,
+    seconds     REAL NOT NULL DEFAULT 0,  -- last visit: wall time spent (pacing included)
+    checked_at  REAL NOT NULL,
+    expires_at  REAL NOT NULL
+)
+"""
+
+class NegativeStore:
+    """
+    Blogs visited without producing a lead, so scheduled runs skip them until their
+    re-check TTL (per reason code, NEGATIVE_RESULT_TTLS) expires.
+    """
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(os.getcwd(), config.NEGATIVE_DB_FILE)
+        with self._connect() as conn:
+            conn.execute(SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def record(self, url: str, reason: str, seconds: float = 0.0):
+        now = time.time()
+        ttl = config.NEGATIVE_RESULT_TTLS.get(reason, config.NEGATIVE_RESULT_TTLS[FETCH_FAILED])
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO negative_results (url, reason, visits, seconds, checked_at, expires_at) "
+                "VALUES (?, ?, 1, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET reason = excluded.reason, visits = visits + 1, "
+                "seconds = excluded.seconds, checked_at = excluded.checked_at, expires_at = excluded.expires_at",
+                (url, reason, seconds, now, now + ttl)
+            )
+
+    def clear(self, url: str):
+        """The URL produced a lead after all."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM negative_results WHERE url = ?", (url,))
+
+    def active(self, urls: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+        """Unexpired entries (among `urls`, or all): url -> {reason, seconds, expires_at}."""
+        found = {}
+        now = time.time()
+        query = "SELECT url, reason, seconds, expires_at FROM negative_results WHERE expires_at > ?"
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            if urls is None:
+                return {row["url"]: dict(row) for row in conn.execute(query, (now,))}
+            urls = list(urls)
+            # Stay well under SQLite's bound-parameter limit
+            for i in range(0, len(urls), 500):
+                chunk = urls[i:i + 500]
+                rows = conn.execute(f"{query} AND url IN ({','.join('?' * len(chunk))})", (now, *chunk))
+                found.update({row["url"]: dict(row) for row in rows})
+        return found
+
+    def prune(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM negative_results WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    def counts(self) -> Dict[str, int]:
+        with self._connect() as conn:
+            return dict(conn.execute(
+                "SELECT reason, COUNT(*) FROM negative_results WHERE expires_at > ? GROUP BY reason", (time.time(),)
+            ).fetchall())
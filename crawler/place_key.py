@@ -0,0 +1,51 @@
+import re
+from typing import Dict, List, Optional
+
+# Fields that may carry a Naver Place link, depending on which writer created the document.
+PLACE_LINK_FIELDS = ["detail_url", "source_link", "플레이스링크"]
+
+# m.place.naver.com/place/123/home, map.naver.com/p/entry/place/123, m.place.naver.com/hairshop/123 ...
+PLACE_ID_REGEX = re.compile(r'/(?:place|hairshop|nailshop|beauty)/(\d+)')
+
+def extract_place_id(value) -> Optional[str]:
+    """Return the numeric Naver place ID embedded in a link (or a bare ID string)."""
+    if value is None:
+        return None
+    text = str(value).strip()
+    if not text:
+        return None
+    if text.isdigit():
+        return text
+    match = PLACE_ID_REGEX.search(text)
+    return match.group(1) if match else None
+
+def place_link_variants(pid: str) -> List[str]:
+    """Place links the crawlers write for a place ID (for exact-match lookups on link fields)."""
+    return [f"https://m.place.naver.com/place/{pid}", f"https://m.place.naver.com/place/{pid}/home"]
+
+def place_id_of(data: Dict) -> Optional[str]:
+    """Return the place ID of a shop dict, checking every known link field."""
+    pid = extract_place_id(data.get("place_id"))
+    if pid:
+        return pid
+    for field in PLACE_LINK_FIELDS:
+        pid = extract_place_id(data.get(field))
+        if pid:
+            return pid
+    return None
+
+def legacy_doc_id(key: str) -> str:
+    """Document ID scheme used before place-ID keys (URL with '/' and ':' replaced)."""
+    return key.replace("/", "_").replace(":", "_")
+
+def canonical_doc_id(data: Dict) -> Optional[str]:
+    """
+    Document ID for a shop: 'place_<naver place id>' whenever a place ID can be
+    derived, so the same shop from any crawler maps to one document.
+    Records without a place (e.g. blog leads) keep the URL-derived legacy ID.
+    """
+    pid = place_id_of(data)
+    if pid:
+        return f"place_{pid}"
+    key = data.get("detail_url") or data.get("source_link") or data.get("blog_url") or data.get("플레이스링크")
+    return legacy_doc_id(key) if key else None
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Optional
+
+try:
+    from .. import config
+except ImportError:
+    import sys
+    import os
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import config
+
+logger = logging.getLogger(__name__)
+
+def is_block_page(content: Optional[str]) -> bool:
+    return bool(content) and any(marker in content for marker in config.BLOCK_MARKERS)
+
+class RateController:
+    """
+    AIMD request pacing. The rate (requests/min) grows additively while responses
+    are healthy and is cut multiplicatively on 429s, block pages or slow responses.
+    It never exceeds the ceiling (60 / MIN_DELAY) nor drops below the floor (60 / MAX_DELAY).
+    """
+    def __init__(self, min_delay: float = None, max_delay: float = None, start_delay: float = None,
+                 name: str = "crawl"):
+        min_delay = min_delay or config.MIN_DELAY
+        max_delay = max_delay or config.MAX_DELAY
+        self.name = name
+        self.ceiling = 60.0 / min_delay
+        self.floor = 60.0 / max_delay
+        self.rate = 60.0 / (start_delay or (min_delay + max_delay) / 2)
+        self.consecutive_blocks = 0
+        self.stats = {"ok": 0, "slow": 0, "blocked": 0, "errors": 0}
+
+    # --- Signals ---
+    def record_success(self):
+        self.stats["ok"] += 1
+        self.consecutive_blocks = 0
+        self.rate = min(self.ceiling, self.rate + config.RATE_INCREASE_PER_MIN)
+
+    def record_slow(self):
+        self.stats["slow"] += 1
+        self._decrease()
+
+    def record_block(self):
+        self.stats["blocked"] += 1
+        self.consecutive_blocks += 1
+        self._decrease()
+
+    def record_error(self):
+        self.stats["errors"] += 1
+
+    def _decrease(self):
+        self.rate = max(self.floor, self.rate * config.RATE_DECREASE_FACTOR)
+        logger.warning(f"🐢 [{self.name}] Backing off: {self.rate:.2f} req/min (~{60 / self.rate:.0f}s per request)")
+
+    def observe(self, status: Optional[int] = None, latency: Optional[float] = None,
+                content: Optional[str] = None) -> str:
+        """Classify one response and feed the controller. Returns 'blocked', 'slow' or 'ok'."""
+        if status in (429, 503) or is_block_page(content):
+            self.record_block()
+            return "blocked"
+        if latency is not None and latency > config.RATE_SLOW_RESPONSE_SECONDS:
+            self.record_slow()
+            return "slow"
+        self.record_success()
+        return "ok"
+
+    # --- Pacing ---
+    @property
+    def exhausted(self) -> bool:
+        """Too many blocks in a row: the caller should stop instead of retrying."""
+        return self.consecutive_blocks >= config.RATE_MAX_CONSECUTIVE_BLOCKS
+
+    @property
+    def min_interval(self) -> float:
+        """Shortest gap between two requests allowed by the ceiling."""
+        return 60.0 / self.ceiling
+
+    def next_delay(self) -> float:
+        delay = 60.0 / self.rate * random.uniform(1 - config.RATE_JITTER, 1 + config.RATE_JITTER)
+        # Jitter may slow us down further, but never push us above the ceiling
+        return max(delay, self.min_interval)
+
+    def block_cooldown(self) -> float:
+        return config.RATE_BLOCK_COOLDOWN * max(self.consecutive_blocks, 1)
+
+    def wait(self) -> float:
+        delay = self.next_delay()
+        logger.info(f"⏳ Waiting {delay:.1f}s ({self.rate:.2f} req/min)...")
+        time.sleep(delay)
+        return delay
+
+    async def wait_async(self) -> float:
+        delay = self.next_delay()
+        logger.info(f"⏳ Waiting {delay:.1f}s before next request ({self.rate:.2f} req/min)...")
+        await asyncio.sleep(delay)
+        return delay
+
+    def summary(self) -> str:
+        return (f"{self.rate:.2f} req/min | ok {self.stats['ok']}, slow {self.stats['slow']}, "
+                f"blocked {self.stats['blocked']}, errors {self.stats['errors']}")
@@ -0,0 +1,118 @@
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import httpx
+import requests
+
+try:
+    from .. import config
+except ImportError:
+    import sys
+    import os
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import config
+
+logger = logging.getLogger(__name__)
+
+# Transport failures worth another attempt; anything else raised by a request is a bug or a bad URL
+RETRYABLE_EXCEPTIONS = (requests.ConnectionError, requests.Timeout, httpx.TransportError)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class CircuitBreaker:
+    """
+    Per-host breaker. After BREAKER_FAILURE_THRESHOLD retryable failures in a row the
+    host is 'open' and requests fail fast; once the cooldown passes one trial request
+    is let through ('half_open') and its outcome closes or re-opens the breaker.
+    """
+    def __init__(self, host: str):
+        self.host = host
+        self.state = "closed"
+        self.failures = 0
+        self.open_until = 0.0
+
+    def allow(self) -> bool:
+        if self.state == "open":
+            if time.time() < self.open_until:
+                return False
+            self.state = "half_open"
+            logger.info(f"🔌 [{self.host}] Cooldown over, sending a trial request")
+        return True
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= config.BREAKER_FAILURE_THRESHOLD:
+            self.trip(config.BREAKER_COOLDOWN)
+
+    def trip(self, seconds: float):
+        self.state = "open"
+        self.open_until = max(self.open_until, time.time() + seconds)
+        logger.warning(f"🔌 [{self.host}] Circuit open for {seconds:.0f}s after {self.failures} failures")
+
+class RetryPolicy:
+    """
+    Decides whether a failed attempt is retried and how long to wait first:
+    full-jitter exponential backoff, never shorter than the server's Retry-After
+    nor than the host's politeness interval. Counters cover the whole run.
+    """
+    def __init__(self, max_attempts: int = None):
+        self.max_attempts = max_attempts or config.MAX_RETRIES
+        self.stats = {"requests": 0, "attempts": 0, "retries": 0, "failed_attempts": 0,
+                      "gave_up": 0, "fatal": 0, "fast_failed": 0, "retry_after": 0, "wait_seconds": 0.0}
+
+    @staticmethod
+    def is_retryable(status: Optional[int] = None, exc: Optional[BaseException] = None) -> bool:
+        if exc is not None:
+            return isinstance(exc, RETRYABLE_EXCEPTIONS)
+        return status in config.RETRYABLE_STATUSES
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None, min_interval: float = 0.0) -> float:
+        """Wait before retry number `attempt` (1-based)."""
+        ceiling = min(config.RETRY_BACKOFF_MAX, config.RETRY_BACKOFF_BASE * 2 ** attempt)
+        delay = max(random.uniform(0, ceiling), min_interval)
+        if retry_after is not None:
+            self.stats["retry_after"] += 1
+            delay = max(delay, retry_after)
+        return delay
+
+    def next_wait(self, attempt: int, breaker: CircuitBreaker, retryable: bool,
+                  retry_after: Optional[float] = None, min_interval: float = 0.0) -> Optional[float]:
+        """Record failed attempt number `attempt`; returns the wait before the next one, or None to give up."""
+        self.stats["failed_attempts"] += 1
+        if not retryable:
+            self.stats["fatal"] += 1
+            return None
+        breaker.record_failure()
+        if retry_after is not None and retry_after > config.RETRY_AFTER_MAX:
+            # The server asked for a long pause: stop hitting the host for that long
+            breaker.trip(retry_after)
+        if breaker.state == "open" or attempt >= self.max_attempts:
+            self.stats["gave_up"] += 1
+            return None
+        delay = self.backoff(attempt, retry_after, min_interval)
+        self.stats["retries"] += 1
+        self.stats["wait_seconds"] += delay
+        return delay
+
+    def summary(self) -> str:
+        s = self.stats
+        return (f"{s['requests']} requests, {s['attempts']} attempts | failed attempts {s['failed_attempts']}, "
+                f"retries {s['retries']} ({s['wait_seconds']:.0f}s waited, {s['retry_after']} Retry-After), "
+                f"gave up {s['gave_up']}, fatal {s['fatal']}, fast-failed {s['fast_failed']}")
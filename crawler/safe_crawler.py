@@ -1,8 +1,10 @@
+import asyncio
 import time
 import random
-import requests
+import httpx
 import logging
 from typing import Optional, Dict
+from urllib.parse import urlsplit
 
 # Try to import config relative to the package, or fall back to absolute import if needed
 try:
@@ -13,58 +15,146 @@ except ImportError:
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     import config
 
+try:
+    from .rate_controller import RateController
+except ImportError:
+    from rate_controller import RateController
+
+try:
+    from .retry_policy import CircuitBreaker, RetryPolicy, parse_retry_after
+except ImportError:
+    from retry_policy import CircuitBreaker, RetryPolicy, parse_retry_after
+
+try:
+    from .http_cache import HttpCache
+except ImportError:
+    from http_cache import HttpCache
+
 logger = logging.getLogger(__name__)
 
-class SafeCrawler:
-    def __init__(self):
-        self.session = requests.Session()
-        
-    def random_delay(self):
-        """Sleep for a random amount of time between MIN_DELAY and MAX_DELAY."""
-        delay = random.uniform(config.MIN_DELAY, config.MAX_DELAY)
-        logger.info(f"Waiting for {delay:.2f} seconds...")
-        time.sleep(delay)
-        
-    def get_random_user_agent(self) -> str:
-        """Return a random user agent string."""
-        return random.choice(config.USER_AGENTS)
-        
-    def get_with_retry(self, url: str, params: Optional[Dict] = None) -> Optional[requests.Response]:
+BROWSER_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7"
+}
+
+class HostBudget:
+    """Politeness state for one host: its own AIMD pacing and one request in flight at a time."""
+    def __init__(self, host: str):
+        self.host = host
+        self.rate = RateController(name=host)
+        self.breaker = CircuitBreaker(host)
+        self.lock = asyncio.Lock()
+        self.next_at = 0.0  # Monotonic time before which the host must not be hit again
+
+    async def wait_turn(self):
+        delay = self.next_at - time.monotonic()
+        if delay > 0:
+            logger.info(f"⏳ [{self.host}] Waiting {delay:.1f}s ({self.rate.rate:.2f} req/min)...")
+            await asyncio.sleep(delay)
+
+    def schedule_next(self, delay: Optional[float] = None):
+        self.next_at = time.monotonic() + (self.rate.next_delay() if delay is None else delay)
+
+class AsyncSafeCrawler:
+    """
+    Polite HTTP client for the blog pipeline. Requests share one pooled HTTP client,
+    and pacing is per host: each host gets its own RateController and serial queue, so
+    Naver search, m.blog.naver.com posts and individual Tistory blogs proceed in
+    parallel while every single host stays within the MIN_DELAY budget.
+    """
+    def __init__(self, max_connections: int = None, cache: Optional[HttpCache] = None):
+        max_connections = max_connections or config.ASYNC_MAX_CONNECTIONS
+        self.client = httpx.AsyncClient(
+            headers=BROWSER_HEADERS,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            # Pool waits are bounded by per-host pacing, not by the request timeout
+            timeout=httpx.Timeout(config.REQUEST_TIMEOUT, pool=None),
+            follow_redirects=True,
+        )
+        self.hosts: Dict[str, HostBudget] = {}
+        self.retry = RetryPolicy()
+        self.cache = cache
+
+    async def __aenter__(self) -> "AsyncSafeCrawler":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    def budget(self, url: str) -> HostBudget:
+        host = urlsplit(url).hostname or ""
+        if host not in self.hosts:
+            self.hosts[host] = HostBudget(host)
+        return self.hosts[host]
+
+    async def get_with_retry(self, url: str, params: Optional[Dict] = None) -> Optional[httpx.Response]:
         """
-        Perform a GET request with retry logic and safe delays.
+        GET with retry logic; waits for the host's next slot before every attempt.
         """
-        headers = {
-            "User-Agent": self.get_random_user_agent(),
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7"
-        }
-        
-        for attempt in range(config.MAX_RETRIES):
-            try:
-                self.random_delay() # Always delay before request
-                
-                logger.info(f"Requesting URL: {url} (Attempt {attempt + 1}/{config.MAX_RETRIES})")
-                response = self.session.get(
-                    url, 
-                    headers=headers, 
-                    params=params, 
-                    timeout=config.REQUEST_TIMEOUT
-                )
-                
-                if response.status_code == 200:
-                    return response
-                elif response.status_code == 429:
-                    logger.warning("Rate limited (429). Waiting longer...")
-                    time.sleep(30) # Wait longer if rate limited
-                else:
-                    logger.warning(f"Request failed with status code: {response.status_code}")
-                    
-            except Exception as e:
-                logger.error(f"Error requesting {url}: {e}")
-                
-            # Wait a bit before retry if it wasn't the last attempt
-            if attempt < config.MAX_RETRIES - 1:
-                time.sleep(5)
-                
-        logger.error(f"Failed to fetch {url} after {config.MAX_RETRIES} attempts")
+        entry = self.cache.lookup(url, params) if self.cache else None
+        if entry and entry.fresh:
+            return entry.response()
+
+        budget = self.budget(url)
+        headers = {"User-Agent": random.choice(config.USER_AGENTS)}
+        if entry:
+            headers.update(entry.validators())
+        self.retry.stats["requests"] += 1
+
+        for attempt in range(1, self.retry.max_attempts + 1):
+            async with budget.lock:
+                await budget.wait_turn()
+                if not budget.breaker.allow():
+                    self.retry.stats["fast_failed"] += 1
+                    logger.warning(f"🔌 Skipping {url}: circuit for {budget.host} is open")
+                    return None
+
+                retry_after = None
+                try:
+                    logger.info(f"Requesting URL: {url} (Attempt {attempt}/{self.retry.max_attempts})")
+                    self.retry.stats["attempts"] += 1
+                    response = await self.client.get(url, headers=headers, params=params)
+
+                    signal = budget.rate.observe(
+                        status=response.status_code,
+                        latency=response.elapsed.total_seconds(),
+                        content=response.text if response.status_code == 200 else None
+                    )
+                    if response.status_code == 304 and entry:
+                        budget.breaker.record_success()
+                        budget.schedule_next()
+                        return self.cache.revalidated(entry, response)
+                    if signal != "blocked" and response.status_code == 200:
+                        budget.breaker.record_success()
+                        budget.schedule_next()
+                        if self.cache:
+                            self.cache.store(url, params, response)
+                        return response
+                    retryable = signal == "blocked" or self.retry.is_retryable(status=response.status_code)
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    reason = " (rate limited / block page)" if signal == "blocked" else ""
+                    logger.warning(f"Request failed with status code: {response.status_code}{reason}")
+                except Exception as e:
+                    budget.rate.record_error()
+                    retryable = self.retry.is_retryable(exc=e)
+                    logger.error(f"Error requesting {url}: {e}")
+
+                delay = self.retry.next_wait(attempt, budget.breaker, retryable, retry_after,
+                                             budget.rate.min_interval)
+                # A backoff holds the whole host (Retry-After is host-wide); other hosts keep going
+                budget.schedule_next(delay)
+                if delay is None:
+                    break
+
+        logger.error(f"Failed to fetch {url} after {attempt} attempt(s)")
         return None
+
+    def pacing_interval(self, url: str) -> float:
+        """Seconds of the host's request budget one fetch of `url` currently uses."""
+        return 60.0 / self.budget(url).rate.rate
+
+    def summary(self) -> Dict[str, str]:
+        return {host: f"{budget.rate.summary()} | circuit {budget.breaker.state}" for host, budget in self.hosts.items()}
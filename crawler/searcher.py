@@ -1,69 +1,116 @@
+import asyncio
 import urllib.parse
 from bs4 import BeautifulSoup
-from typing import List, Set
+from lxml import etree, html as lxml_html
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set
 import logging
 
 try:
-    from .safe_crawler import SafeCrawler
+    from .. import config
 except ImportError:
-    from safe_crawler import SafeCrawler
+    import sys
+    import os
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import config
+
+try:
+    from .safe_crawler import AsyncSafeCrawler
+except ImportError:
+    from safe_crawler import AsyncSafeCrawler
+
+try:
+    from .url_canon import canonical_post_url, dedup_ratio, dedupe_posts
+except ImportError:
+    from url_canon import canonical_post_url, dedup_ratio, dedupe_posts
 
 logger = logging.getLogger(__name__)
 
+def result_links(page_html: str, container_xpath: str, host_marker: str) -> List[str]:
+    """
+    hrefs containing host_marker inside the result container, parsed with lxml
+    (falls back to the whole page if the container is missing).
+    """
+    try:
+        root = lxml_html.fromstring(page_html)
+    except (etree.ParserError, ValueError):
+        return []
+    containers = root.xpath(container_xpath) or [root]
+    links = []
+    for container in containers:
+        links.extend(container.xpath(f".//a[contains(@href, '{host_marker}')]/@href"))
+    return links
+
 class Searcher:
-    def __init__(self, crawler: SafeCrawler):
+    def __init__(self, crawler: AsyncSafeCrawler):
         self.crawler = crawler
 
-    def search_naver_blogs(self, keyword: str, limit: int = 20) -> List[str]:
+    async def harvest_naver_blogs(self, keyword: str, target: int = None,
+                                  known: Optional[Set[str]] = None) -> AsyncIterator[str]:
         """
-        Search for Naver blogs.
-        Since we don't have API access, we'll try to scrape the search result page carefully.
-        Targeting 'VIEW' tab or Blog tab.
+        Walk Naver blog search result pages, yielding canonical post URLs as soon as
+        each page is parsed. Stops after `target` posts not in `known` (the caller may
+        keep adding to it while consuming), at the first page whose posts are all
+        known, or after NAVER_SEARCH_MAX_PAGES pages.
         """
+        target = target or config.NAVER_SEARCH_TARGET
+        known = known if known is not None else set()
         logger.info(f"Searching Naver blogs for: {keyword}")
-        blog_urls = []
         
         # Searching Naver View/Blog tab
         base_url = "https://search.naver.com/search.naver"
+        seen: Set[str] = set()
+        raw, fresh, pages = 0, 0, 0
         
-        # We might need to iterate pages if we want many results
-        # For now, let's grab the first page (usually ~30 results)
-        params = {
-            "where": "blog",
-            "query": keyword,
-            "sm": "tab_opt" 
-        }
-        
-        response = self.crawler.get_with_retry(base_url, params=params)
-        if not response:
-            return []
+        while pages < config.NAVER_SEARCH_MAX_PAGES and fresh < target:
+            params = {
+                "where": "blog",
+                "query": keyword,
+                "sm": "tab_opt",
+                "start": pages * config.NAVER_SEARCH_PAGE_SIZE + 1
+            }
+            response = await self.crawler.get_with_retry(base_url, params=params)
+            if not response:
+                break
+            pages += 1
             
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Select blog links
-        # Naver structure changes often, so we'll look for any link containing blog.naver.com
-        links = soup.select("a")
-        
-        for link in links:
-            url = link.get('href')
-            if url and "blog.naver.com" in url:
-                # Filter out some generic nav links if needed, but for now take them
-                # Naver often redirects, the link might be like https://blog.naver.com/ID/LogNo
-                if "PostView" in url or "/MyBlog" not in url: # basic filtering to avoid profile links if possible
-                    blog_urls.append(url)
-                    if len(blog_urls) >= limit:
-                        break
+            # The same post shows up as /ID/LogNo, PostView.naver?blogId=..&logNo=.., mobile and
+            # tracking variants; collapse them to one canonical URL (profile links are dropped)
+            links = result_links(response.text, config.NAVER_RESULT_CONTAINER_XPATH, "blog.naver.com")
+            posts = [post for post in map(canonical_post_url, links) if post]
+            raw += len(posts)
+            page_posts = [post for post in dict.fromkeys(posts) if post not in seen]
+            if not page_posts:
+                break  # Past the last page: Naver repeats it
+            
+            unknown = sum(1 for post in page_posts if post not in known)
+            for post in page_posts:
+                seen.add(post)
+                if post not in known:
+                    fresh += 1
+                yield post
+                if fresh >= target:
+                    break
+            if not unknown:
+                logger.info(f"Page {pages} for '{keyword}' had only known posts; stopping")
+                break
                     
-        logger.info(f"Found {len(blog_urls)} Naver blogs for '{keyword}'")
-        return blog_urls
+        logger.info(f"Found {len(seen)} Naver blogs for '{keyword}' ({fresh} new) over {pages} page(s) "
+                    f"({raw} post links, dedup ratio {dedup_ratio(len(seen), raw):.0%})")
 
-    def search_tistory_blogs(self, keyword: str, limit: int = 20) -> List[str]:
+    async def search_naver_blogs(self, keyword: str, limit: int = 20) -> List[str]:
+        """
+        Search for Naver blogs.
+        Since we don't have API access, we'll try to scrape the search result page carefully.
+        Targeting 'VIEW' tab or Blog tab.
+        """
+        return [url async for url in self.harvest_naver_blogs(keyword, target=limit)]
+
+    async def search_tistory_blogs(self, keyword: str, limit: int = 20) -> List[str]:
         """
         Search for Tistory blogs using Google or Daum search.
         Here we use a simulated Daum search or Google to find tistory sites.
         """
         logger.info(f"Searching Tistory blogs for: {keyword}")
-        blog_urls = []
         
         # Using Daum search (Daum is Tistory's parent)
         base_url = "https://search.daum.net/search"
@@ -74,7 +121,7 @@ class Searcher:
             "spacing": "0"
         }
         
-        response = self.crawler.get_with_retry(base_url, params=params)
+        response = await self.crawler.get_with_retry(base_url, params=params)
         if not response:
             return []
             
@@ -84,28 +131,38 @@ class Searcher:
         # Usually links are in 'a.f_link_b'
         links = soup.select("a.f_link_b")
         
-        for link in links:
-            url = link.get('href')
-            if url and "tistory.com" in url:
-                blog_urls.append(url)
-                if len(blog_urls) >= limit:
-                    break
+        urls = [link.get('href') for link in links if link.get('href') and "tistory.com" in link.get('href')]
+        blog_urls, raw = dedupe_posts(urls, limit)
                     
-        logger.info(f"Found {len(blog_urls)} Tistory blogs for '{keyword}'")
+        logger.info(f"Found {len(blog_urls)} Tistory blogs for '{keyword}' "
+                    f"({raw} post links, dedup ratio {dedup_ratio(len(blog_urls), raw):.0%})")
         return blog_urls
-        
-    def search_all(self, keywords: List[str]) -> Set[str]:
+
+    async def search_all(self, keywords: List[str], known: Optional[Set[str]] = None,
+                         on_result: Optional[Callable[[str, str], None]] = None) -> Dict[str, Set[str]]:
         """
-        Search across all platforms for the given keywords.
-        Returns a set of unique URLs.
+        Search every keyword on Naver and (with TISTORY_SEARCH_ENABLED) Tistory at the
+        same time. The crawler paces search.naver.com and search.daum.net as separate
+        hosts, so the two platforms do not wait on each other. Each post URL is passed
+        to on_result(keyword, url) as soon as it is found; returns keyword -> URLs.
         """
-        all_urls = set()
-        
-        for keyword in keywords:
-            naver_urls = self.search_naver_blogs(keyword)
-            all_urls.update(naver_urls)
-            
-            tistory_urls = self.search_tistory_blogs(keyword)
-            all_urls.update(tistory_urls)
-            
-        return all_urls
+        results: Dict[str, Set[str]] = {kw: set() for kw in keywords}
+
+        def found(keyword: str, url: str):
+            results[keyword].add(url)
+            if on_result:
+                on_result(keyword, url)
+
+        async def naver(keyword: str):
+            async for url in self.harvest_naver_blogs(keyword, known=known):
+                found(keyword, url)
+
+        async def tistory(keyword: str):
+            for url in await self.search_tistory_blogs(keyword, limit=config.TISTORY_SEARCH_LIMIT):
+                found(keyword, url)
+
+        searches = [naver(kw) for kw in keywords]
+        if config.TISTORY_SEARCH_ENABLED:
+            searches += [tistory(kw) for kw in keywords]
+        await asyncio.gather(*searches)
+        return results
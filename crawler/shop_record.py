@@ -0,0 +1,129 @@
+from typing import Any, Dict, Optional
+
+try:
+    from .place_key import place_id_of
+except ImportError:
+    from place_key import place_id_of
+
+# Legacy / dashboard keys -> canonical field names
+FIELD_ALIASES = {
+    "상호명": "name",
+    "주소": "address",
+    "번호": "phone",
+    "전화번호": "phone",
+    "대표자": "owner_name",
+    "이메일": "email",
+    "instagram": "instagram_handle",
+    "인스타": "instagram_handle",
+    "blog_id": "naver_blog_id",
+    "블로그ID": "naver_blog_id",
+    "talktalk": "talk_url",
+    "톡톡링크": "talk_url",
+    "source_link": "detail_url",
+    "플레이스링크": "detail_url",
+}
+
+FLOAT_FIELDS = ("latitude", "longitude")
+
+class ShopRecord:
+    """
+    Canonical shop/lead document shared by every writer (crawlers, Apify,
+    migrations) and reader (dashboard, competitor analysis).
+    Unknown keys (e.g. top_9_competitors) are carried in `extra`.
+    """
+    FIELDS = (
+        "place_id", "name", "address", "phone", "owner_name",
+        "latitude", "longitude", "detail_url", "email",
+        "instagram_handle", "naver_blog_id", "talk_url",
+        "keyword", "source", "description", "dong", "crawled_at",
+        "blog_url", "title",
+    )
+    __slots__ = FIELDS + ("extra",)
+
+    def __init__(self, **fields):
+        for field in self.FIELDS:
+            setattr(self, field, None)
+        self.extra = {}
+        for key, value in fields.items():
+            self.set(key, value)
+        self._derive_place_id()
+
+    def set(self, key: str, value: Any, overwrite: bool = True):
+        """Assign a value by canonical or alias key; unknown keys go to `extra`."""
+        field = FIELD_ALIASES.get(key, key)
+        if field not in self.FIELDS:
+            self.extra[key] = value
+            return
+        if field in FLOAT_FIELDS:
+            try:
+                value = float(value) if value not in (None, "") else None
+            except (TypeError, ValueError):
+                value = None
+        elif isinstance(value, str):
+            value = value.strip()
+        if overwrite or _is_empty(getattr(self, field)):
+            setattr(self, field, value)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ShopRecord":
+        """Build a record from any legacy document; canonical keys win over aliases."""
+        record = cls()
+        aliased = []
+        for key, value in data.items():
+            if key in FIELD_ALIASES:
+                aliased.append((key, value))
+            else:
+                record.set(key, value)
+        for key, value in aliased:
+            record.set(key, value, overwrite=False)
+        record._derive_place_id()
+        return record
+
+    def _derive_place_id(self):
+        if not self.place_id and self.detail_url:
+            self.place_id = place_id_of({"detail_url": self.detail_url})
+
+    def to_dict(self) -> Dict:
+        """Compact serialization: canonical keys only, empty values omitted."""
+        out = {}
+        for field in self.FIELDS:
+            value = getattr(self, field)
+            if field in FLOAT_FIELDS:
+                if value:
+                    out[field] = value
+            elif not _is_empty(value):
+                out[field] = value
+        for key, value in self.extra.items():
+            if key not in out:
+                out[key] = value
+        return out
+
+    def to_row(self, doc_id: Optional[str] = None) -> Dict:
+        """Flat row with every canonical column present, for DataFrame building."""
+        row = {field: getattr(self, field) for field in self.FIELDS}
+        for field in self.FIELDS:
+            if row[field] is None and field not in FLOAT_FIELDS:
+                row[field] = ""
+        row.update({k: v for k, v in self.extra.items() if k not in row})
+        if doc_id is not None:
+            row["ID"] = doc_id
+        return row
+
+    def get(self, key: str, default: Any = None) -> Any:
+        field = FIELD_ALIASES.get(key, key)
+        if field in self.FIELDS:
+            value = getattr(self, field)
+            return default if value is None else value
+        return self.extra.get(key, default)
+
+    def __repr__(self):
+        return f"ShopRecord(place_id={self.place_id!r}, name={self.name!r})"
+
+def _is_empty(value) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return not value
+    if isinstance(value, (list, dict)):
+        return len(value) == 0
+    return False
@@ -0,0 +1,81 @@
+import re
+from typing import Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+TRACKING_PARAMS = {"fbclid", "gclid", "fromrss", "trackingcode", "from", "ref", "sm", "nclick"}
+
+NAVER_BLOG_HOSTS = {"blog.naver.com", "m.blog.naver.com"}
+NAVER_POSTVIEW = re.compile(r"^/(?:PostView|PostList)\.(?:naver|nhn)$", re.IGNORECASE)
+NAVER_ID_LOGNO = re.compile(r"^/([A-Za-z0-9_-]+)/(\d+)/?$")
+NAVER_ID = re.compile(r"^/([A-Za-z0-9_-]+)/?$")
+TISTORY_POST = re.compile(r"^/(?:m/)?((?:entry/[^/]+)|\d+)/?$")
+
+def _query(parts) -> dict:
+    return {k.lower(): v for k, v in parse_qsl(parts.query, keep_blank_values=True)}
+
+def _naver_post(parts) -> Optional[str]:
+    query = _query(parts)
+    blog_id, log_no = None, None
+    match = NAVER_ID_LOGNO.match(parts.path)
+    if match:
+        blog_id, log_no = match.groups()
+    elif NAVER_POSTVIEW.match(parts.path):
+        blog_id, log_no = query.get("blogid"), query.get("logno")
+    else:
+        match = NAVER_ID.match(parts.path)
+        if match and query.get("logno"):  # blog.naver.com/ID?Redirect=Log&logNo=...
+            blog_id, log_no = match.group(1), query["logno"]
+    if blog_id and log_no and log_no.isdigit():
+        return f"https://blog.naver.com/{blog_id}/{log_no}"
+    return None
+
+def _tistory_post(parts) -> Optional[str]:
+    match = TISTORY_POST.match(parts.path)
+    if not match:
+        return None
+    return f"https://{parts.hostname}/{match.group(1)}"
+
+def canonical_post_url(url: str) -> Optional[str]:
+    """
+    Canonical form of a Naver or Tistory blog post URL, or None if `url` is not one.
+    blog.naver.com/ID/LogNo, PostView.naver?blogId=..&logNo=.., m.blog.naver.com and
+    tracking-parameter variants all become https://blog.naver.com/ID/LogNo;
+    Tistory /m/123 and /123?category=.. become https://<blog>.tistory.com/123.
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host in NAVER_BLOG_HOSTS:
+        return _naver_post(parts)
+    if host.endswith(".tistory.com"):
+        return _tistory_post(parts)
+    return None
+
+def canonical_url(url: str) -> str:
+    """Canonical post URL when recognised; otherwise https, lowercased host, no fragment or tracking params."""
+    post = canonical_post_url(url)
+    if post:
+        return post
+    parts = urlsplit(url.strip())
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if k.lower() not in TRACKING_PARAMS and not k.lower().startswith("utm_")]
+    scheme = "https" if parts.scheme in ("http", "https") else parts.scheme
+    return urlunsplit((scheme, parts.netloc.lower(), parts.path, urlencode(query), ""))
+
+def dedupe_posts(urls: Iterable[str], limit: Optional[int] = None) -> Tuple[List[str], int]:
+    """Canonical post URLs in first-seen order (non-posts dropped), plus the number of post links seen."""
+    seen, posts, raw = set(), [], 0
+    for url in urls:
+        post = canonical_post_url(url)
+        if not post:
+            continue
+        raw += 1
+        if post not in seen:
+            seen.add(post)
+            posts.append(post)
+            if limit and len(posts) >= limit:
+                break
+    return posts, raw
+
+def dedup_ratio(unique: int, raw: int) -> float:
+    """Share of collected links that were duplicates of another link's post."""
+    return 1 - unique / raw if raw else 0.0
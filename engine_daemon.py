@@ -0,0 +1,233 @@
+import asyncio
+import itertools
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+
+from playwright.async_api import async_playwright
+
+import config
+from crawler.engine_status import (configure_engine_logging, daemon_status_path, mark_status, start_heartbeat,
+                                   update_status)
+from step1_refined_crawler import get_db_handler, launch_browser, run_crawler
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+CRAWL_JOBS = ("region_crawl", "resume")
+MAX_FINISHED_JOBS = 50
+
+class EngineDaemon:
+    """
+    Resident crawl engine. Keeps one Playwright browser and the Firebase client warm
+    and executes jobs from a priority queue, one at a time.
+
+    Clients (dashboard, scheduler, recovery scripts) talk to it through
+    crawler.engine_client over a localhost JSON-lines socket:
+        {"op": "submit", "type": "region_crawl", "params": {...}, "priority": 2, "wait": false}
+        {"op": "status"} | {"op": "cancel"} | {"op": "ping"}
+    """
+    def __init__(self, host=config.ENGINE_DAEMON_HOST, port=config.ENGINE_DAEMON_PORT):
+        self.host = host
+        self.port = port
+        self.queue = asyncio.PriorityQueue()
+        self.seq = itertools.count(1)
+        self.jobs = OrderedDict()  # job id -> public job dict
+        self.waiters = {}          # job id -> [Future]
+        self.current = None
+        self.current_task = None
+        self.playwright = None
+        self.browser = None
+        self.blog_state = None     # Blog crawl state (crawler/crawl_state.py) kept between jobs
+        self.handlers = {
+            "region_crawl": self.job_region_crawl,
+            "resume": self.job_region_crawl,
+            "enrichment": self.job_enrichment,
+            "competitor_refresh": self.job_competitor_refresh,
+            "blog_crawl": self.job_blog_crawl,
+        }
+
+    # --- Warm resources ---
+    async def get_browser(self):
+        if self.browser is None or not self.browser.is_connected():
+            if self.playwright is None:
+                self.playwright = await async_playwright().start()
+            self.browser = await launch_browser(self.playwright)
+            logger.info("🌐 Engine daemon browser is warm")
+        return self.browser
+
+    async def close(self):
+        if self.browser:
+            await self.browser.close()
+        if self.playwright:
+            await self.playwright.stop()
+
+    # --- Queue ---
+    def submit(self, job_type, params=None, priority=None):
+        if job_type not in self.handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+        if priority is None:
+            priority = config.ENGINE_JOB_PRIORITIES.get(job_type, 5)
+        job_id = next(self.seq)
+        job = {
+            "id": job_id,
+            "type": job_type,
+            "params": params or {},
+            "priority": priority,
+            "state": "queued",
+            "submitted_at": time.time(),
+        }
+        self.jobs[job_id] = job
+        self.queue.put_nowait((priority, job_id))
+
+        # Let the dashboard show the queued crawl right away
+        if job_type in CRAWL_JOBS and not (self.current and self.current["type"] in CRAWL_JOBS):
+            update_status(state="starting", pid=os.getpid(), current=0, total=job["params"].get("count", 0),
+                          target=job["params"].get("target") or "", keyword="", heartbeat_at=time.time())
+        logger.info(f"📥 Job #{job_id} queued: {job_type} (priority {priority}) {job['params']}")
+        return job
+
+    async def worker(self):
+        while True:
+            _, job_id = await self.queue.get()
+            job = self.jobs.get(job_id)
+            if not job or job["state"] != "queued":
+                continue
+
+            self.current = job
+            job.update(state="running", started_at=time.time())
+            logger.info(f"▶️ Job #{job_id} started: {job['type']}")
+            self.current_task = asyncio.create_task(self.handlers[job["type"]](job["params"]))
+            try:
+                job["result"] = await self.current_task
+                job["state"] = "done"
+            except asyncio.CancelledError:
+                if not self.current_task.cancelled():
+                    raise  # The worker itself is shutting down
+                job["state"] = "cancelled"
+                mark_status("stopped")
+            except Exception as e:
+                logger.error(f"❌ Job #{job_id} failed: {e}")
+                job.update(state="failed", error=str(e))
+                if job["type"] in CRAWL_JOBS:
+                    mark_status("crashed", error=str(e))
+            finally:
+                job["finished_at"] = time.time()
+                logger.info(f"⏹️ Job #{job_id} {job['state']} in {job['finished_at'] - job['started_at']:.0f}s")
+                self.current = None
+                self.current_task = None
+                for fut in self.waiters.pop(job_id, []):
+                    if not fut.done():
+                        fut.set_result(job)
+                self._prune_finished()
+
+    def _prune_finished(self):
+        finished = [jid for jid, j in self.jobs.items() if j["state"] not in ("queued", "running")]
+        for jid in finished[:-MAX_FINISHED_JOBS]:
+            del self.jobs[jid]
+
+    # --- Job handlers ---
+    async def job_region_crawl(self, params):
+        state = await run_crawler(params.get("target"), int(params.get("count", 99999)),
+                                  resume=params.get("resume", False) or self.current["type"] == "resume",
+                                  browser=await self.get_browser())
+        mark_status("finalizing")
+        await self.job_competitor_refresh({})
+        mark_status(state or "finished")
+        return state
+
+    async def job_enrichment(self, params):
+        from research_single_shop import research_shop
+        shop_ids = [str(s) for s in params.get("shop_ids", [])]
+        failed = []
+        db = await asyncio.to_thread(get_db_handler)
+        for shop_id in shop_ids:
+            if not await research_shop(shop_id, browser=await self.get_browser(), db=db):
+                failed.append(shop_id)
+        if shop_ids and params.get("refresh_competitors", True):
+            await self.job_competitor_refresh({"target_ids": shop_ids})
+        return {"processed": len(shop_ids), "failed": failed}
+
+    async def job_competitor_refresh(self, params):
+        from extract_competitors import run_competitor_extraction
+        # Synchronous Firestore work; run off the event loop so the socket stays responsive
+        await asyncio.to_thread(run_competitor_extraction, params.get("target_ids") or None)
+        return True
+
+    async def job_blog_crawl(self, params):
+        import main as blog_crawler
+        # Own event loop in a worker thread; the crawl state stays warm between jobs
+        self.blog_state = await asyncio.to_thread(blog_crawler.main, self.blog_state)
+        return True
+
+    # --- Socket protocol ---
+    async def handle_client(self, reader, writer):
+        try:
+            line = await reader.readline()
+            try:
+                request = json.loads(line)
+            except ValueError:
+                request = {}
+            reply = await self.dispatch(request)
+        except Exception as e:
+            reply = {"ok": False, "error": str(e)}
+        writer.write((json.dumps(reply, ensure_ascii=False, default=str) + "\n").encode("utf-8"))
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def dispatch(self, request):
+        op = request.get("op")
+        if op == "ping":
+            return {"ok": True, "pid": os.getpid()}
+        if op == "submit":
+            try:
+                job = self.submit(request.get("type"), request.get("params"), request.get("priority"))
+            except ValueError as e:
+                return {"ok": False, "error": str(e)}
+            if request.get("wait"):
+                fut = asyncio.get_running_loop().create_future()
+                self.waiters.setdefault(job["id"], []).append(fut)
+                job = await fut
+            return {"ok": True, "job": job}
+        if op == "status":
+            queued = sorted((j for j in self.jobs.values() if j["state"] == "queued"),
+                            key=lambda j: (j["priority"], j["id"]))
+            recent = [j for j in self.jobs.values() if j["state"] not in ("queued", "running")][-10:]
+            return {"ok": True, "pid": os.getpid(), "current": self.current, "queued": queued, "recent": recent}
+        if op == "cancel":
+            if not self.current_task:
+                return {"ok": False, "error": "no running job"}
+            self.current_task.cancel()
+            return {"ok": True, "job": self.current}
+        return {"ok": False, "error": f"unknown op: {op}"}
+
+    async def serve(self):
+        server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        mark_status("idle", pid=os.getpid(), daemon=True)
+        start_heartbeat()
+        # Separate liveness file: clients must not fall back to a subprocess (or kill) while it is fresh
+        stop_daemon_beat = start_heartbeat(daemon_status_path(), state="running")
+        await asyncio.to_thread(get_db_handler)  # Warm the Firebase client before the first job
+        logger.info(f"🛰 Engine daemon listening on {self.host}:{self.port} (PID {os.getpid()})")
+        worker = asyncio.create_task(self.worker())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            worker.cancel()
+            stop_daemon_beat.set()
+            mark_status("stopped", daemon_status_path())
+            await self.close()
+
+if __name__ == "__main__":
+    configure_engine_logging(os.path.join(os.getcwd(), config.ENGINE_LOG_FILE))
+    try:
+        asyncio.run(EngineDaemon().serve())
+    except KeyboardInterrupt:
+        logger.info("👋 Engine daemon stopped")
+        mark_status("stopped")
@@ -4,6 +4,7 @@ import json
 import time
 from typing import Dict, List
 from crawler.db_handler import DBHandler
+from crawler.shop_record import ShopRecord
 import config
 
 # Setup logging
@@ -46,9 +47,9 @@ def run_competitor_extraction(target_ids: List[str] = None):
         docs = db.db_fs.collection(config.FIREBASE_COLLECTION).stream()
         all_shops = []
         for doc in docs:
-            data = doc.to_dict()
-            data['_fs_id'] = doc.id 
-            all_shops.append(data)
+            record = ShopRecord.from_dict(doc.to_dict())
+            record.extra['_fs_id'] = doc.id
+            all_shops.append(record)
     except Exception as e:
         logger.error(f"❌ Failed to fetch shops from Firebase: {e}")
         return
@@ -56,11 +57,11 @@ def run_competitor_extraction(target_ids: List[str] = None):
     logger.info(f"📊 Total reference shops loaded: {len(all_shops)}")
     
     # Filter shops with valid coordinates
-    valid_shops = [s for s in all_shops if s.get('latitude') and s.get('longitude') and s.get('latitude') != 0]
+    valid_shops = [s for s in all_shops if s.latitude and s.longitude]
     
     # 2. Identify target shops to update
     if target_ids:
-        shops_to_update = [s for s in valid_shops if s['_fs_id'] in target_ids]
+        shops_to_update = [s for s in valid_shops if s.get('_fs_id') in target_ids]
         if not shops_to_update:
             logger.warning("⚠️ None of the target IDs found with valid coordinates.")
             return
@@ -74,23 +75,22 @@ def run_competitor_extraction(target_ids: List[str] = None):
     # 3. Process each shop
     updated_count = 0
     for target in shops_to_update:
-        target_name = target.get('name') or target.get('상호명', 'Unknown')
-        t_lat = target.get('latitude')
-        t_lng = target.get('longitude')
+        target_name = target.name or 'Unknown'
+        t_lat = target.latitude
+        t_lng = target.longitude
         
         distances = []
         for other in valid_shops:
             if other.get('_fs_id') == target.get('_fs_id'):
                 continue
             
-            dist = haversine(t_lat, t_lng, other.get('latitude'), other.get('longitude'))
+            dist = haversine(t_lat, t_lng, other.latitude, other.longitude)
             
-            # Use original field names or mapped ones consistently
             comp_data = {
-                "name": other.get('name') or other.get('상호명'),
-                "address": other.get('address') or other.get('주소'),
-                "phone": other.get('phone') or other.get('번호'),
-                "detail_url": other.get('detail_url') or other.get('플레이스링크'),
+                "name": other.name,
+                "address": other.address,
+                "phone": other.phone,
+                "detail_url": other.detail_url,
                 "distance_m": round(dist)
             }
             distances.append(comp_data)
@@ -103,7 +103,7 @@ def run_competitor_extraction(target_ids: List[str] = None):
         
         # 4. Update Firebase
         try:
-            db.db_fs.collection(config.FIREBASE_COLLECTION).document(target['_fs_id']).update({
+            db.db_fs.collection(config.FIREBASE_COLLECTION).document(target.get('_fs_id')).update({
                 "top_9_competitors": top_9,
                 "competitors_updated_at": time.strftime('%Y-%m-%d %H:%M:%S')
             })
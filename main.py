@@ -1,8 +1,13 @@
+import asyncio
 import logging
 import time
-from typing import List
+from typing import Optional
 
-from crawler.safe_crawler import SafeCrawler
+from crawler.safe_crawler import AsyncSafeCrawler
+from crawler.http_cache import HttpCache
+from crawler.negative_store import NegativeStore
+from crawler.url_canon import canonical_url
+from crawler.crawl_state import CrawlState
 from crawler.searcher import Searcher
 from crawler.extractor import Extractor
 from crawler.db_handler import DBHandler
@@ -20,72 +25,123 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def main():
+async def run(state: Optional[CrawlState] = None) -> CrawlState:
+    """
+    One crawl cycle. `state` carries keyword result sets, due times and the known-URL
+    set between cycles (loaded from SCHEDULER_STATE_FILE when not given).
+    """
     logger.info("Starting Skin Shop Blog Crawler...")
+    started = time.time()
+    state = state or CrawlState.load()
     
     # Initialize components
-    crawler = SafeCrawler()
-    searcher = Searcher(crawler)
-    extractor = Extractor(crawler)
-    db = DBHandler()
-    csv_handler = CSVHandler()
-    
-    # Get all keywords
-    all_keywords = []
-    for category, keywords in config.KEYWORDS.items():
-        all_keywords.extend(keywords)
-        
-    logger.info(f"Loaded {len(all_keywords)} keywords across {len(config.KEYWORDS)} categories.")
-    
-    # Fetch existing URLs to avoid processing them again
-    existing_urls = set(db.fetch_existing_urls())
-    logger.info(f"Skipping {len(existing_urls)} already collected URLs.")
-    
-    # 1. Search Phase
-    found_urls = set()
-    for keyword in all_keywords:
-        # For demonstration/testing, maybe limit keywords or results per keyword
-        # In production, we iterate all.
-        urls = searcher.search_naver_blogs(keyword, limit=5) # Reduced limit for testing
+    cache = None
+    if config.HTTP_CACHE_ENABLED:
+        cache = HttpCache()
+        pruned = cache.prune()
+        if pruned:
+            logger.info(f"🧹 Pruned {pruned} expired cache entries")
+    async with AsyncSafeCrawler(cache=cache) as crawler:
+        searcher = Searcher(crawler)
+        extractor = Extractor(crawler)
+        db = DBHandler()
+        csv_handler = CSVHandler()
+        negatives = NegativeStore()
+        negatives.prune()
         
-        # Add Tistory search if needed
-        # tiso_urls = searcher.search_tistory_blogs(keyword, limit=5)
-        # urls.extend(tiso_urls)
-        
-        found_urls.update(urls)
+        # Get all keywords
+        all_keywords = []
+        for category, keywords in config.KEYWORDS.items():
+            all_keywords.extend(keywords)
+            
+        logger.info(f"Loaded {len(all_keywords)} keywords across {len(config.KEYWORDS)} categories.")
+        due_keywords = state.due_keywords(all_keywords)
+        logger.info(f"🗓️ {len(due_keywords)} keywords due this cycle "
+                    f"({len(all_keywords) - len(due_keywords)} unchanged recently, not due yet)")
         
-        # Random delay between keyword searches to be safe
-        time.sleep(3) 
+        # Fetch existing URLs to avoid processing them again (kept in memory between scheduled cycles)
+        if state.needs_url_refresh():
+            # Stored URLs may predate canonicalisation; compare in canonical form
+            state.set_known_urls(canonical_url(url) for url in db.fetch_existing_urls())
+        existing_urls = state.known_urls
+        logger.info(f"Skipping {len(existing_urls)} already collected URLs.")
         
-    logger.info(f"Total unique blogs found in search: {len(found_urls)}")
-    
-    # 2. Filter Phase
-    target_urls = [url for url in found_urls if url not in existing_urls]
-    logger.info(f"New blogs to crawl: {len(target_urls)}")
-    
-    # 3. Extraction Phase
-    success_count = 0
-    for i, url in enumerate(target_urls):
-        logger.info(f"Processing ({i+1}/{len(target_urls)}): {url}")
+        recently_empty = negatives.active()
+        known = existing_urls | set(recently_empty)  # Grows as posts are scheduled
+        skipped_empty = set()
+        extractions = []
+        success_count = 0
+        processed = 0
         
-        data = extractor.extract_blog_data(url)
-        
-        if data:
+        # Extraction (started per URL as search yields it): blogs on different hosts are fetched in parallel
+        async def process(url):
+            nonlocal success_count, processed
+            data, reason = await extractor.extract_blog_result(url)
+            processed += 1
+            logger.info(f"Processed ({processed}/{len(extractions)}): {url}")
+            
+            if not data:
+                # Cost of the visit = the host's pacing slot it used (not time spent queued behind other URLs)
+                negatives.record(url, reason, crawler.pacing_interval(extractor.fetch_url(url)))
+                return
+            negatives.clear(url)
+            
             # Save to CSV
             csv_handler.append_data(data)
             
-            # Save to DB
-            saved_to_db = db.insert_lead(data)
+            # Save to DB (blocking Firestore call; keep the other fetches moving)
+            saved_to_db = await asyncio.to_thread(db.insert_lead, data)
             
             if saved_to_db:
                 success_count += 1
+                existing_urls.add(url)
             else:
-                logger.warning(f"Failed to save to DB: {url}")
-                
-        # The extractor uses the crawler which already has random delays, 
-        # but we can add a small extra pause here if needed.
+                logger.warning(f"Failed to save to DB: {data['blog_url']}")
+        
+        # Filter: skip stored leads and blogs recently visited without one
+        def schedule(url):
+            if url in recently_empty:
+                skipped_empty.add(url)
+            if url in known:
+                return
+            known.add(url)
+            extractions.append(asyncio.create_task(process(url)))
         
+        # Search: Naver and Tistory at once, results streamed into extraction
+        results = await searcher.search_all(due_keywords, known=known, on_result=lambda kw, url: schedule(url))
+        changed = sum(state.record_results(kw, urls, started) for kw, urls in results.items())
+        logger.info(f"🗓️ {changed}/{len(due_keywords)} searched keywords returned posts not seen last cycle")
+        logger.info(f"New blogs to crawl: {len(extractions)}")
+        if skipped_empty:
+            saved_minutes = sum(recently_empty[url]["seconds"] for url in skipped_empty) / 60
+            logger.info(f"⏭️ Skipped {len(skipped_empty)} blogs visited recently without a lead "
+                        f"(~{saved_minutes:.0f} min of fetching saved)")
+        
+        await asyncio.gather(*extractions)
+        csv_handler.close()
+                    
+        for host, summary in crawler.summary().items():
+            logger.info(f"📊 [{host}] {summary}")
+        logger.info(f"📊 Retries: {crawler.retry.summary()}")
+        if cache:
+            logger.info(f"📊 Cache: {cache.summary()}")
+        logger.info(f"📊 Visited without a lead (active): {negatives.counts()}")
+        
+    state.record_cycle({
+        "started_at": started,
+        "duration_seconds": round(time.time() - started, 1),
+        "keywords_due": len(due_keywords),
+        "keywords_skipped": len(all_keywords) - len(due_keywords),
+        "keywords_changed": changed,
+        "new_blogs": len(extractions),
+        "leads_saved": success_count,
+    })
+    state.save()
     logger.info(f"Crawling finished. Successfully saved {success_count} new leads.")
+    return state
+
+def main(state: Optional[CrawlState] = None) -> CrawlState:
+    return asyncio.run(run(state))
 
 if __name__ == "__main__":
     main()
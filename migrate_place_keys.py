@@ -0,0 +1,100 @@
+import logging
+import sys
+from crawler.db_handler import DBHandler
+from crawler.place_key import place_id_of
+import config
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+WRITE_BATCH_SIZE = 400
+COORD_FIELDS = ("latitude", "longitude")
+
+def is_empty(field, value):
+    if value is None: return True
+    if isinstance(value, str): return not value.strip()
+    if isinstance(value, (list, dict)): return len(value) == 0
+    if field in COORD_FIELDS: return not value
+    return False
+
+def merge_documents(canonical_id, docs):
+    """
+    Merge duplicate documents of one place. The document already stored under the
+    canonical ID wins, then the most complete one; each field takes the first
+    non-empty value in that order.
+    """
+    def filled(d): return sum(1 for k, v in d.items() if not is_empty(k, v))
+    ordered = sorted(docs, key=lambda item: (item[0] != canonical_id, -filled(item[1])))
+
+    merged = {}
+    for _, data in ordered:
+        for field, value in data.items():
+            if field not in merged or (is_empty(field, merged[field]) and not is_empty(field, value)):
+                merged[field] = value
+    return merged
+
+def migrate_place_keys(apply=False):
+    """
+    Re-key shop documents as 'place_<naver place id>' and merge duplicates.
+    Runs as a dry run (report only) unless apply=True.
+    """
+    db = DBHandler()
+    if not db.db_fs:
+        logger.error("❌ Firebase fails to initialize. Aborting.")
+        return
+
+    collection_ref = db.db_fs.collection(config.FIREBASE_COLLECTION)
+
+    # 1. Group every document by place ID
+    groups = {}
+    total_docs = 0
+    without_place = 0
+    for doc in collection_ref.stream():
+        total_docs += 1
+        data = doc.to_dict() or {}
+        pid = place_id_of(data)
+        if not pid:
+            without_place += 1
+            continue
+        groups.setdefault(pid, []).append((doc.id, data))
+
+    place_docs = total_docs - without_place
+    duplicates = place_docs - len(groups)
+    ratio = (duplicates / place_docs) if place_docs else 0.0
+    logger.info(f"📊 Documents: {total_docs} (with place ID: {place_docs}, without: {without_place})")
+    logger.info(f"📊 Unique places: {len(groups)} | Duplicate docs: {duplicates} | Duplicate ratio: {ratio:.1%}")
+
+    # 2. Build the write plan
+    writes = []
+    deletes = []
+    for pid, docs in groups.items():
+        canonical_id = f"place_{pid}"
+        if len(docs) == 1 and docs[0][0] == canonical_id and docs[0][1].get("place_id") == pid:
+            continue
+        merged = merge_documents(canonical_id, docs)
+        merged["place_id"] = pid
+        writes.append((canonical_id, merged))
+        deletes.extend(doc_id for doc_id, _ in docs if doc_id != canonical_id)
+
+    logger.info(f"📝 Plan: write {len(writes)} canonical docs, delete {len(deletes)} superseded docs")
+    if not apply:
+        logger.info("ℹ️ Dry run only. Re-run with --apply to migrate.")
+        return
+
+    # 3. Write merged documents first, then remove the superseded ones
+    written = 0
+    for i in range(0, len(writes), WRITE_BATCH_SIZE):
+        batch = db.db_fs.batch()
+        for doc_id, data in writes[i:i + WRITE_BATCH_SIZE]:
+            batch.set(collection_ref.document(doc_id), data)
+        batch.commit()
+        written += len(writes[i:i + WRITE_BATCH_SIZE])
+        logger.info(f"Progress: {written}/{len(writes)} canonical docs written")
+
+    result = db.delete_documents(deletes)
+    logger.info(f"🎉 Migration complete. Written: {written}, Deleted: {len(result['deleted_ids'])}, "
+                f"Failed deletes: {result['failed']}, Collection size: {total_docs} -> {total_docs - len(result['deleted_ids'])}")
+
+if __name__ == "__main__":
+    migrate_place_keys(apply="--apply" in sys.argv)
@@ -8,6 +8,7 @@ import requests
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 import config
 from crawler.db_handler import DBHandler
+from crawler.shop_record import ShopRecord
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -36,8 +37,8 @@ def migrate():
     # 2. Upload to Firebase
     success_count = 0
     for item in data:
-        # We use the document-safe version of links or names as IDs
-        if db.insert_shop_fs(item):
+        # Supabase rows are normalized to the shared schema; the place ID becomes the doc key
+        if db.insert_shop_fs(ShopRecord.from_dict(item)):
             success_count += 1
             if success_count % 10 == 0:
                 logger.info(f"Progress: {success_count}/{len(data)}")
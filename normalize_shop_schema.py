@@ -0,0 +1,66 @@
+import json
+import logging
+import sys
+from crawler.db_handler import DBHandler
+from crawler.shop_record import ShopRecord
+import config
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+WRITE_BATCH_SIZE = 400
+
+def doc_size(data):
+    return len(json.dumps(data, ensure_ascii=False, default=str).encode("utf-8"))
+
+def normalize_shop_schema(apply=False):
+    """
+    One-time rewrite of legacy shop documents into the ShopRecord schema:
+    alias keys (상호명, talktalk, 톡톡링크, source_link, ...) are folded into
+    canonical fields and empty placeholders are dropped.
+    Runs as a dry run (report only) unless apply=True.
+    """
+    db = DBHandler()
+    if not db.db_fs:
+        logger.error("❌ Firebase fails to initialize. Aborting.")
+        return
+
+    collection_ref = db.db_fs.collection(config.FIREBASE_COLLECTION)
+
+    total = 0
+    pending = []
+    bytes_before = 0
+    bytes_after = 0
+    for doc in collection_ref.stream():
+        total += 1
+        data = doc.to_dict() or {}
+        normalized = ShopRecord.from_dict(data).to_dict()
+        if normalized != data:
+            pending.append((doc.id, normalized))
+            bytes_before += doc_size(data)
+            bytes_after += doc_size(normalized)
+
+    logger.info(f"📊 Documents: {total} | Need normalization: {len(pending)}")
+    if pending:
+        logger.info(f"📊 Payload of affected docs: {bytes_before:,} -> {bytes_after:,} bytes "
+                    f"({1 - bytes_after / bytes_before:.1%} smaller)")
+    if not apply:
+        logger.info("ℹ️ Dry run only. Re-run with --apply to rewrite documents.")
+        return
+
+    written = 0
+    for i in range(0, len(pending), WRITE_BATCH_SIZE):
+        batch = db.db_fs.batch()
+        chunk = pending[i:i + WRITE_BATCH_SIZE]
+        for doc_id, data in chunk:
+            # Full overwrite (no merge) so the redundant alias fields disappear
+            batch.set(collection_ref.document(doc_id), data)
+        batch.commit()
+        written += len(chunk)
+        logger.info(f"Progress: {written}/{len(pending)}")
+
+    logger.info(f"🎉 Normalization complete. Rewritten: {written}/{total}")
+
+if __name__ == "__main__":
+    normalize_shop_schema(apply="--apply" in sys.argv)
@@ -1,10 +1,12 @@
 import asyncio
 import os
 import sys
-from step1_refined_crawler import run_crawler
-from extract_competitors import run_competitor_extraction
+from crawler.engine_client import submit_job
+from crawler.engine_status import alive_daemon_pid
 
 async def main():
+    from step1_refined_crawler import run_crawler
+    from extract_competitors import run_competitor_extraction
     print("🚀 Starting manual recovery for Jung-gu and Jungnang-gu...")
     # These were the districts being processed when it crashed
     # We can just run a 'resume' of '서울' and it will check the checkpoint
@@ -21,4 +23,11 @@ async def main():
     print("✅ Recovery complete!")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # Run on the resident engine daemon when available (resume job includes competitor extraction)
+    job = submit_job("resume", {"target": "서울", "count": 99999}, wait=True)
+    if job:
+        print(f"✅ Recovery job #{job['id']} {job['state']} on engine daemon.")
+    elif alive_daemon_pid():
+        print("⚠️ Engine daemon is running but did not answer. Check its job list before retrying.")
+    else:
+        asyncio.run(main())
@@ -1,9 +1,9 @@
 import schedule
 import time
 import logging
-import subprocess
-import os
-from datetime import datetime
+import config
+from crawler.engine_client import submit_job
+from crawler.engine_status import alive_daemon_pid
 
 # Logging setup
 logging.basicConfig(
@@ -16,30 +16,52 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def run_crawler():
-    logger.info("Starting scheduled crawl job...")
-    try:
-        # Run main.py using the same python interpreter
-        result = subprocess.run(["py", "main.py"], capture_output=True, text=True)
+class IncrementalScheduler:
+    """
+    Runs the blog crawl in this process every SCHEDULER_INTERVAL_HOURS, keeping the
+    crawl state (keyword result sets, due times, known URLs) in memory so each cycle
+    only searches due keywords and skips re-reading Firestore.
+    """
+    def __init__(self):
+        self.state = None
+
+    def run_cycle(self):
+        logger.info("Starting scheduled crawl job...")
+        
+        # Hand the job to the resident engine daemon if it is running (it keeps its own state)
+        job = submit_job("blog_crawl")
+        if job:
+            logger.info(f"Crawl job queued on engine daemon as job #{job['id']}.")
+            return
+        if alive_daemon_pid():
+            logger.warning("Engine daemon is running but did not answer; skipping this cycle instead of crawling twice.")
+            return
+        
+        started = time.monotonic()
+        try:
+            import main as blog_crawler
+            self.state = blog_crawler.main(self.state)
+        except Exception as e:
+            logger.error(f"Crawl job failed: {e}", exc_info=True)
+            return
+        finally:
+            logger.info(f"⏱️ Cycle took {(time.monotonic() - started) / 60:.1f} min "
+                        f"(interval {config.SCHEDULER_INTERVAL_HOURS}h)")
         
-        if result.returncode == 0:
-            logger.info("Crawl job finished successfully.")
-            logger.info(f"Output: {result.stdout[-200:]}...") # Log last 200 chars
-        else:
-            logger.error(f"Crawl job failed with code {result.returncode}")
-            logger.error(f"Error: {result.stderr}")
-            
-    except Exception as e:
-        logger.error(f"Failed to run crawl job: {e}")
+        cycle = self.state.last_cycle
+        logger.info(f"Crawl job finished successfully: {cycle['keywords_due']} keywords searched, "
+                    f"{cycle['keywords_skipped']} not due, {cycle['new_blogs']} new blogs, "
+                    f"{cycle['leads_saved']} leads saved.")
 
 def main():
-    logger.info("Scheduler started. The crawler will run every 6 hours.")
+    logger.info(f"Scheduler started. The crawler will run every {config.SCHEDULER_INTERVAL_HOURS} hours.")
+    scheduler = IncrementalScheduler()
     
     # Run immediately on start
-    run_crawler()
+    scheduler.run_cycle()
     
-    # Schedule every 6 hours
-    schedule.every(6).hours.do(run_crawler)
+    # Schedule every interval
+    schedule.every(config.SCHEDULER_INTERVAL_HOURS).hours.do(scheduler.run_cycle)
     
     # Keep running
     while True:
@@ -6,6 +6,7 @@ import json
 from playwright.async_api import async_playwright
 import config
 from crawler.db_handler import DBHandler
+from crawler.shop_record import ShopRecord
 
 # Ensure output directory exists if needed (current working dir)
 OUTPUT_FILE = config.RAW_DATA_FILE
@@ -179,15 +180,15 @@ async def run_crawler():
                                         
                                         # Save to Firebase
                                         db = DBHandler()
-                                        db.insert_shop_fs({
-                                            "name": shop_data['Name'],
-                                            "address": shop_data['Address'],
-                                            "phone": shop_data['Phone'],
-                                            "source_link": shop_data['Detail_Url'],
-                                            "latitude": shop_data['Latitude'],
-                                            "longitude": shop_data['Longitude'],
-                                            "keyword": shop_data['Keyword']
-                                        })
+                                        db.insert_shop_fs(ShopRecord(
+                                            name=shop_data['Name'],
+                                            address=shop_data['Address'],
+                                            phone=shop_data['Phone'],
+                                            detail_url=shop_data['Detail_Url'],
+                                            latitude=shop_data['Latitude'],
+                                            longitude=shop_data['Longitude'],
+                                            keyword=shop_data['Keyword']
+                                        ))
                                         
                                         existing_urls.add(shop_url)
                                         
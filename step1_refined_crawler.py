@@ -11,6 +11,13 @@ from playwright.async_api import async_playwright
 from playwright_stealth import Stealth
 import config
 from crawler.db_handler import DBHandler
+from crawler.shop_record import ShopRecord
+from crawler.rate_controller import RateController
+from crawler.frontier import Frontier, worker_checkpoint_path, worker_status_path
+from crawler.keyword_stats import KeywordStats
+from crawler.map_grid import MapListClient, grid_list_rate, quadtree_search, region_bbox
+from crawler.contact_extractor import MIN_EMAIL_CONFIDENCE, extract_contacts
+from crawler.engine_status import EngineStatus, configure_engine_logging, mark_status, read_status, start_heartbeat
 import time
 
 # Setup Logging
@@ -20,18 +27,28 @@ logger = logging.getLogger(__name__)
 # Config
 TABLE_NAME = "t_crawled_shops"
 
+_db_handler = None
+
+def get_db_handler():
+    """Process-wide DBHandler, reused across saves (and across jobs in the engine daemon)."""
+    global _db_handler
+    if _db_handler is None or not _db_handler.db_fs:
+        _db_handler = DBHandler()
+    return _db_handler
+
 def save_to_db(shop_data):
     """
-    Saves a single shop dict to Firebase via DBHandler.
+    Saves a single shop dict to Firebase via DBHandler as a ShopRecord.
     Falls back to local JSON if Firebase fails.
     """
+    record = ShopRecord.from_dict(shop_data)
     try:
-        db = DBHandler()
-        if db.insert_shop_fs(shop_data):
-            logger.info(f"✅ Firebase Saved: {shop_data.get('name')}")
+        db = get_db_handler()
+        if db.insert_shop_fs(record):
+            logger.info(f"✅ Firebase Saved: {record.name}")
             return True
         else:
-            logger.error(f"❌ Firebase Save Failed: {shop_data.get('name')}")
+            logger.error(f"❌ Firebase Save Failed: {record.name}")
             return False
     except Exception as e:
         logger.warning(f"⚠️ Firebase connection error: {e}")
@@ -45,27 +62,38 @@ def save_to_db(shop_data):
                         data_list = json.load(f)
                     except: pass
             
-            data_list.append(shop_data)
+            data_list.append(record.to_dict())
             
             with open(local_file, "w", encoding="utf-8") as f:
                 json.dump(data_list, f, ensure_ascii=False, indent=2)
                 
-            logger.info(f"💾 Saved to local file instead: {shop_data.get('name')}")
+            logger.info(f"💾 Saved to local file instead: {record.name}")
             return True
         except Exception as local_e:
             logger.error(f"❌ Local save also failed: {local_e}")
             return False
 
-async def extract_detail_info(page, shop_data):
+async def extract_detail_info(page, shop_data, rate=None):
     """
     Visits the detail page and extracts rich information using Apollo State and DOM fallback.
+    When a RateController is given, the response (status, latency, block page) is fed to it.
     """
     try:
         url = shop_data['detail_url']
         logger.info(f"🔍 Visiting detail page: {shop_data['name']}")
-        await page.goto(url, wait_until="networkidle", timeout=60000)
+        started = time.monotonic()
+        response = await page.goto(url, wait_until="networkidle", timeout=60000)
+        latency = time.monotonic() - started
         await asyncio.sleep(random.uniform(3, 5))
         
+        content = await page.content()
+        if rate:
+            signal = rate.observe(status=response.status if response else None, latency=latency,
+                                  content=content)
+            if signal == "blocked":
+                logger.warning(f"🛑 Block page on detail visit: {shop_data['name']}")
+                return False
+        
         # 1. Extract via Apollo State (Most Accurate)
         state = await page.evaluate("window.__APOLLO_STATE__")
         if state:
@@ -113,98 +141,194 @@ async def extract_detail_info(page, shop_data):
                                 if handle:
                                     shop_data["email"] = f"{handle}@naver.com"
 
-        # 2. DOM Fallback & Advanced Extraction (Email from description)
-        content = await page.content()
+        # 2. Content Fallback: one scan of the rendered HTML for every contact field
+        # (mailto links, emails, 대표자, Instagram / blog / TalkTalk hrefs)
+        contacts = extract_contacts(content)
         
-        # [NEW] Explicit mailto link check (Strong signal)
-        if not shop_data.get("email"):
-             try:
-                mailto_link = page.locator("a[href^='mailto:']").first
-                if await mailto_link.count() > 0:
-                    href = await mailto_link.get_attribute("href")
-                    if href:
-                        shop_data["email"] = href.replace("mailto:", "").strip()
-                        logger.info(f"📧 Found email via mailto: {shop_data['email']}")
-             except: pass
-
-        # Email Extraction from Description if not found yet
         if not shop_data.get("email"):
-            emails = re.findall(r'[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+', content)
-            if emails:
-                # Filter out image-like extensions in emails
-                filtered_emails = [e for e in emails if not any(ext in e.lower() for ext in ['.png', '.jpg', '.jpeg', '.gif', '.webp'])]
-                if filtered_emails:
-                    shop_data["email"] = filtered_emails[0]
-                    logger.info(f"📧 Found email in page content: {shop_data['email']}")
+            # Blog-review links on the page only yield "<reviewer>@naver.com" guesses; require a real sighting
+            email = contacts.best("email", min_confidence=MIN_EMAIL_CONFIDENCE)
+            if email:
+                shop_data["email"] = email
+                logger.info(f"📧 Found email in page content: {email}")
 
         # Owner Name (Representative)
         if not shop_data.get("owner_name"):
-            owner_match = re.search(r'대표자\s*[:]\s*([가-힣]+)', content)
-            if owner_match:
-                shop_data["owner_name"] = owner_match.group(1)
+            owner = contacts.best("owner")
+            if owner:
+                shop_data["owner_name"] = owner
 
-        # 3. DOM Link Fallback (If Apollo failed)
-        if not shop_data.get("instagram_handle") or not shop_data.get("naver_blog_id") or not shop_data.get("talk_url"):
-            
-            # Instagram Logic Improvement
-            if not shop_data.get("instagram_handle"):
-                # Strategy A: Regex search in full content (Fast)
-                insta_match = re.search(r'href="(https://www\.instagram\.com/[^"]+)"', content)
-                if insta_match:
-                    candidate = insta_match.group(1).split("?")[0]
-                    if not any(x in candidate for x in ['/p/', '/reels/', '/explore/', '/stories/']):
-                         shop_data["instagram_handle"] = candidate
-                
-                # Strategy B: DOM Traversal (More robust for dynamic elements)
-                if not shop_data.get("instagram_handle"):
-                    try:
-                        insta_links = await page.locator("a[href*='instagram.com']").all()
-                        for link in insta_links:
-                            href = await link.get_attribute("href")
-                            if href:
-                                clean_href = href.split("?")[0].strip()
-                                if not any(x in clean_href for x in ['/p/', '/reels/', '/explore/', '/stories/']):
-                                    shop_data["instagram_handle"] = clean_href
-                                    break
-                    except: pass
-            
-            # Naver Blog
-            if not shop_data.get("naver_blog_id"):
-                blog_match = re.search(r'href="(https://blog\.naver\.com/[^"]+)"', content)
-                if blog_match:
-                    shop_data["naver_blog_id"] = blog_match.group(1).split("?")[0]
-                    # Also try to extract email from blog url
-                    if not shop_data.get("email"):
-                        handle = shop_data["naver_blog_id"].strip("/").split("/")[-1]
-                        if handle: shop_data["email"] = f"{handle}@naver.com"
-
-            # TalkTalk
-            if not shop_data.get("talk_url"):
-                talk_match = re.search(r'href="(https://talk\.naver\.com/[^"]+)"', content)
-                if talk_match:
-                    shop_data["talk_url"] = talk_match.group(1)
+        # 3. Link Fallback (If Apollo failed)
+        for field, kind in (("instagram_handle", "instagram"), ("naver_blog_id", "blog"), ("talk_url", "talk")):
+            if not shop_data.get(field):
+                value = contacts.best(kind)
+                if value:
+                    shop_data[field] = value
 
         return True
     except Exception as e:
         logger.warning(f"Failed to extract details for {shop_data.get('name')}: {e}")
+        if rate:
+            rate.record_error()
+        return False
+
+PLAYWRIGHT_MARKER_FILE = os.path.join(os.getcwd(), ".playwright_ready.json")
+SYSTEM_CHROMIUM_PATH = "/usr/bin/chromium"
+
+def _playwright_version():
+    try:
+        from importlib.metadata import version
+        return version("playwright")
+    except Exception:
+        return None
+
+def _provisioning_cached(pw_version):
+    """True if the marker matches this Playwright version and its browser binary still exists."""
+    try:
+        with open(PLAYWRIGHT_MARKER_FILE, "r", encoding="utf-8") as f:
+            marker = json.load(f)
+    except (OSError, ValueError):
         return False
+    return marker.get("playwright_version") == pw_version and os.path.exists(marker.get("executable_path") or "")
 
 async def install_playwright_browsers():
     """
-    Attempts to install playwright browsers if they are missing.
-    Useful for Streamlit Cloud environments.
+    Make sure a Chromium binary is available (Streamlit Cloud environments).
+    The result is cached in a marker keyed on the Playwright version and browser path,
+    so `playwright install` only runs when the binary is actually missing.
     """
     import subprocess
+    # launch_browser() prefers the system chromium; nothing to provision then
+    if os.path.exists(SYSTEM_CHROMIUM_PATH):
+        return
+    pw_version = _playwright_version()
+    if _provisioning_cached(pw_version):
+        logger.info("✅ Playwright browsers are ready (cached).")
+        return
+    
     try:
         logger.info("📦 Checking Playwright browsers...")
-        # Check if chromium is already available via playwright
-        # We try a simple command to see if it works
-        subprocess.run([sys.executable, "-m", "playwright", "install", "chromium"], capture_output=True, check=True)
+        async with async_playwright() as p:
+            executable_path = p.chromium.executable_path
+        if not os.path.exists(executable_path):
+            logger.info("📦 Chromium binary missing. Installing...")
+            subprocess.run([sys.executable, "-m", "playwright", "install", "chromium"], capture_output=True, check=True)
+        if os.path.exists(executable_path):
+            with open(PLAYWRIGHT_MARKER_FILE, "w", encoding="utf-8") as f:
+                json.dump({"playwright_version": pw_version, "executable_path": executable_path,
+                           "checked_at": time.strftime('%Y-%m-%d %H:%M:%S')}, f, ensure_ascii=False)
         logger.info("✅ Playwright browsers are ready.")
     except Exception as e:
         logger.warning(f"⚠️ Playwright install failed or already handled: {e}")
 
-async def run_crawler(target_area=None, target_count=10, resume=False):
+async def launch_browser(p, headless=False):
+    """Cloud-compatible Chromium launch: system chromium first, then Playwright's bundled build."""
+    browser = None
+    launch_args = [
+        "--disable-blink-features=AutomationControlled", 
+        "--no-sandbox", 
+        "--disable-setuid-sandbox", 
+        "--disable-dev-shm-usage",
+        "--disable-gpu"
+    ]
+    
+    # Strategy 1: Try system chromium (for Streamlit Cloud / Linux)
+    if os.path.exists(SYSTEM_CHROMIUM_PATH):
+        try:
+            logger.info(f"🌐 Using system chromium at {SYSTEM_CHROMIUM_PATH}")
+            browser = await p.chromium.launch(
+                executable_path=SYSTEM_CHROMIUM_PATH,
+                headless=headless,
+                args=launch_args
+            )
+        except Exception as e:
+            logger.warning(f"System chromium failed: {e}")
+    
+    # Strategy 2: Fallback to Playwright's bundled browser
+    if not browser:
+        try:
+            logger.info("🌐 Using Playwright bundled browser")
+            browser = await p.chromium.launch(
+                headless=headless,
+                args=launch_args
+            )
+        except Exception as e:
+            logger.error(f"Failed to launch browser: {e}")
+            raise
+    return browser
+
+def load_known_place_ids():
+    """Place IDs already in the store (one projected scan), so listed shops we have are not revisited."""
+    try:
+        index, scanned = get_db_handler().build_place_index()
+    except Exception as e:
+        logger.warning(f"⚠️ Could not load known place IDs: {e}")
+        return set()
+    logger.info(f"📚 Known places: {len(index)} (scanned {scanned} docs)")
+    return set(index)
+
+async def collect_listed_place_ids(page):
+    """Place IDs of every result link currently rendered in the list (one evaluate call)."""
+    hrefs = await page.evaluate(
+        "() => Array.from(document.querySelectorAll(\"a[href*='/place/']\"), a => a.getAttribute('href'))"
+    )
+    return {m.group(1) for m in (re.search(r'/place/(\d+)', h or "") for h in hrefs) if m}
+
+def prioritize_keywords(keywords, keyword_stats):
+    ordered, skipped = keyword_stats.prioritize(keywords)
+    if skipped:
+        logger.info(f"⏩ Skipping {len(skipped)} saturated keywords (yield < {config.KEYWORD_SATURATED_YIELD:.0%}, "
+                    f"crawled within {config.KEYWORD_RECHECK_DAYS} days)")
+    if ordered[:1] != keywords[:1] or skipped:
+        logger.info(f"📈 Keywords ordered by predicted yield. First: {ordered[:3]}")
+    return ordered
+
+async def new_stealth_page(browser):
+    """Fresh mobile-like context (rotated User-Agent) with a stealth-patched page."""
+    # User-Agent Rotation
+    user_agent = random.choice(config.USER_AGENTS)
+    logger.info(f"🎭 Using User-Agent: {user_agent}")
+    
+    context = await browser.new_context(
+        user_agent=user_agent,
+        viewport={"width": random.randint(375, 414), "height": random.randint(667, 915)},
+        locale="ko-KR",
+        timezone_id="Asia/Seoul",
+        permissions=["geolocation"]
+    )
+    
+    # Disable webdriver flag proactively
+    # await context.add_init_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    
+    page = await context.new_page()
+    
+    # 🕵️ ACTIVATE STEALTH MODE
+    logger.info("🕵️ Activating Playwright Stealth Mode...")
+    await Stealth().apply_stealth_async(page)
+    return context, page
+
+def build_keywords(target_area=None):
+    """Dong-level keywords for a city (or several, comma-separated), else a single query."""
+    if target_area and "," in target_area:
+        keywords = []
+        for area in target_area.split(","):
+            keywords.extend(build_keywords(area.strip()))
+        return keywords
+    if target_area in config.CITY_MAP:
+        logger.info(f"🔍 Deep Scan Mode: Expanding '{target_area}' to Dong-level keywords...")
+        return config.get_deep_keywords(target_area)
+    if target_area:
+        return [f"{target_area} 피부관리샵"]
+    return ["서울 강남구 피부관리샵"]
+
+async def run_crawler(target_area=None, target_count=10, resume=False, browser=None, worker_id=None):
+    """
+    Crawl Naver Place for target_area. When `browser` is given (engine daemon),
+    it is reused and left open; otherwise a browser is launched and closed here.
+    With `worker_id` (sharded mode) keywords are claimed from the shared frontier,
+    and checkpoint/status files are namespaced per worker.
+    Returns the final state: "finished" or "blocked".
+    """
     # Proactively try to install browsers in Cloud environments
     is_cloud = os.environ.get("STREAMLIT_RUNTIME_ENV") or "/home/appuser" in os.getcwd() or os.environ.get("STREAMLIT_SERVER_BASE_URL")
     if is_cloud:
@@ -212,22 +336,26 @@ async def run_crawler(target_area=None, target_count=10, resume=False):
         await install_playwright_browsers()
     
     # Target Keywords (Deep Scan Support)
-    if target_area in config.CITY_MAP:
-        logger.info(f"🔍 Deep Scan Mode: Expanding '{target_area}' to Dong-level keywords...")
-        keywords = config.get_deep_keywords(target_area)
-        logger.info(f"📂 Total sub-keywords to crawl: {len(keywords)}")
-    elif target_area:
-        keywords = [f"{target_area} 피부관리샵"]
-    else:
-        keywords = ["서울 강남구 피부관리샵"] 
+    keywords = build_keywords(target_area)
+    logger.info(f"📂 Total sub-keywords to crawl: {len(keywords)}")
 
-    checkpoint_file = os.path.join(os.getcwd(), "crawler_checkpoint.json")
+    frontier = Frontier() if worker_id else None
+    keyword_stats = KeywordStats()
+    run_id = target_area or ""
+    checkpoint_file = worker_checkpoint_path(worker_id) if worker_id else os.path.join(os.getcwd(), "crawler_checkpoint.json")
     start_index = 0
     
-    if resume and os.path.exists(checkpoint_file):
+    if not resume and not frontier:
+        keywords = prioritize_keywords(keywords, keyword_stats)
+    
+    # Sharded workers resume through the frontier, not the checkpoint file
+    if resume and not frontier and os.path.exists(checkpoint_file):
         try:
             with open(checkpoint_file, "r", encoding="utf-8") as f:
                 checkpoint_data = json.load(f)
+                # Resume in the (yield-ordered) plan of the interrupted run
+                if isinstance(checkpoint_data.get("plan"), list):
+                    keywords = checkpoint_data["plan"]
                 last_keyword = checkpoint_data.get("last_keyword")
                 if last_keyword in keywords:
                     start_index = keywords.index(last_keyword) + 1
@@ -238,82 +366,64 @@ async def run_crawler(target_area=None, target_count=10, resume=False):
             logger.error(f"⚠️ Error loading checkpoint: {e}")
 
     total_saved = 0
-    keywords_to_run = keywords[start_index:]
+    if frontier:
+        keywords_to_run = frontier.claims(run_id, worker_id)
+        keyword_total = frontier.progress(run_id)["total"]
+        status = EngineStatus(path=worker_status_path(worker_id), total=target_count, target=run_id,
+                              keyword_total=keyword_total, worker=worker_id)
+    else:
+        keywords_to_run = keywords[start_index:]
+        status = EngineStatus(total=target_count, target=target_area or "", keyword_total=len(keywords_to_run))
+    rate = RateController(name="naver-place")
+    # Blocking Firestore calls run off the event loop so the engine daemon's socket stays responsive
+    seen_places = await asyncio.to_thread(load_known_place_ids)
+    crawled_keywords = []
     
-    async with async_playwright() as p:
-        # Cloud-Compatible Browser Launch Logic
-        browser = None
-        launch_args = [
-            "--disable-blink-features=AutomationControlled", 
-            "--no-sandbox", 
-            "--disable-setuid-sandbox", 
-            "--disable-dev-shm-usage",
-            "--disable-gpu"
-        ]
-        
-        # Strategy 1: Try system chromium (for Streamlit Cloud / Linux)
-        if os.path.exists("/usr/bin/chromium"):
-            try:
-                logger.info("🌐 Using system chromium at /usr/bin/chromium")
-                browser = await p.chromium.launch(
-                    executable_path="/usr/bin/chromium",
-                    headless=False,
-                    args=launch_args
-                )
-            except Exception as e:
-                logger.warning(f"System chromium failed: {e}")
-        
-        # Strategy 2: Fallback to Playwright's bundled browser
-        if not browser:
-            try:
-                logger.info("🌐 Using Playwright bundled browser")
-                browser = await p.chromium.launch(
-                    headless=False,
-                    args=launch_args
-                )
-            except Exception as e:
-                logger.error(f"Failed to launch browser: {e}")
-                raise
-        
-        # User-Agent Rotation
-        user_agent = random.choice(config.USER_AGENTS)
-        logger.info(f"🎭 Using User-Agent: {user_agent}")
-        
-        context = await browser.new_context(
-            user_agent=user_agent,
-            viewport={"width": random.randint(375, 414), "height": random.randint(667, 915)},
-            locale="ko-KR",
-            timezone_id="Asia/Seoul",
-            permissions=["geolocation"]
-        )
-        
-        # Disable webdriver flag proactively
-        # await context.add_init_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        
-        page = await context.new_page()
-        
-        # 🕵️ ACTIVATE STEALTH MODE
-        logger.info("🕵️ Activating Playwright Stealth Mode...")
-        await Stealth().apply_stealth_async(page)
-
+    own_playwright = None
+    if browser is None:
+        own_playwright = await async_playwright().start()
+        browser = await launch_browser(own_playwright)
+    context = None
+    
+    try:
+        context, page = await new_stealth_page(browser)
         
-        for keyword in keywords_to_run:
-            if total_saved >= target_count: break
+        for kw_idx, keyword in enumerate(keywords_to_run):
+            if total_saved >= target_count:
+                if frontier: frontier.release(run_id, keyword)
+                break
+            saved_before = total_saved
+            kw_started = time.monotonic()
+            listed_ids = set()
+            overlap = 0
+            spillover = 0
+            city = keyword.split()[0]
             
             logger.info(f"🔍 Searching: {keyword}")
+            status.publish(keyword=keyword, keyword_index=kw_idx)
             url = f"https://m.place.naver.com/place/list?query={keyword}"
             
             try:
-                await page.goto(url, wait_until="networkidle")
-                await asyncio.sleep(random.uniform(5, 8))
-                
-                # Block Detection
-                content = await page.content()
-                if "서비스 이용이 제한되었습니다" in content or "과도한 접근 요청" in content:
-                    logger.error("🛑 IP Blocked by Naver. Stopping crawler to prevent further damage.")
-                    print("🛑 CRITICAL: IP BLOCK DETECTED. PLEASE STOP AND WAIT.", flush=True)
-                    await browser.close()
-                    return
+                while True:
+                    started = time.monotonic()
+                    response = await page.goto(url, wait_until="networkidle")
+                    latency = time.monotonic() - started
+                    await asyncio.sleep(random.uniform(5, 8))
+                    
+                    # Block Detection: back off and retry; stop only after repeated blocks
+                    content = await page.content()
+                    signal = rate.observe(status=response.status if response else None, latency=latency, content=content)
+                    if signal != "blocked":
+                        break
+                    if rate.exhausted:
+                        logger.error("🛑 IP Blocked by Naver repeatedly. Stopping crawler to prevent further damage.")
+                        print("🛑 CRITICAL: IP BLOCK DETECTED. PLEASE STOP AND WAIT.", flush=True)
+                        if frontier: frontier.release(run_id, keyword)
+                        status.finish("blocked", keyword=keyword)
+                        return "blocked"
+                    cooldown = rate.block_cooldown()
+                    logger.warning(f"🛑 Block page detected ({rate.consecutive_blocks}/{config.RATE_MAX_CONSECUTIVE_BLOCKS}). Cooling down {cooldown:.0f}s...")
+                    await asyncio.sleep(cooldown)
                 
                 # Check for Map View and switch to list if necessary (Stronger detection)
                 # Naver often shows map first on mobile
@@ -331,12 +441,32 @@ async def run_crawler(target_area=None, target_count=10, resume=False):
                         await asyncio.sleep(random.uniform(3, 5))
                         break
 
-                # Scroll to load more (Deep crawling)
+                # Scroll to load more (Deep crawling), checking freshly loaded results
+                # against the known places so saturated lists are cut off early
                 logger.info("🖱️ Scrolling to load all items...")
                 last_height = 0
-                for i in range(40): 
+                loaded_ids = set()
+                window_total = window_new = 0
+                scrolls = 0
+                scroll_started = time.monotonic()
+                for i in range(config.LIST_MAX_SCROLLS): 
                      await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
                      await asyncio.sleep(random.uniform(1.2, 1.8))
+                     scrolls = i + 1
+                     
+                     if config.LIST_CUTOFF_NEW_RATIO > 0:
+                         fresh = await collect_listed_place_ids(page) - loaded_ids
+                         loaded_ids |= fresh
+                         window_total += len(fresh)
+                         window_new += sum(1 for pid in fresh if pid not in seen_places)
+                         if window_total >= config.LIST_CUTOFF_WINDOW:
+                             if window_new / window_total < config.LIST_CUTOFF_NEW_RATIO:
+                                 per_scroll = (time.monotonic() - scroll_started) / scrolls
+                                 avoided = config.LIST_MAX_SCROLLS - scrolls
+                                 logger.info(f"✂️ List cutoff after {scrolls} scrolls: only {window_new}/{window_total} "
+                                             f"recent results are new. Saved up to {avoided} scroll loads (~{avoided * per_scroll:.0f}s)")
+                                 break
+                             window_total = window_new = 0
                      
                      new_height = await page.evaluate("document.body.scrollHeight")
                      if new_height == last_height: 
@@ -373,10 +503,9 @@ async def run_crawler(target_area=None, target_count=10, resume=False):
 
                 logger.info(f"🔍 Found {len(list_items)} potential shops. Starting detail extraction...")
                 
+                # Every listed ID counts toward the keyword's yield stats; only the visit list is capped
                 shops_to_visit = []
                 for li in list_items:
-                    if len(shops_to_visit) >= (target_count - total_saved): break
-                    
                     try:
                         # 1. Detect if li is the link itself or a container
                         link_node = None
@@ -396,6 +525,12 @@ async def run_crawler(target_area=None, target_count=10, resume=False):
                             match = re.search(r'/place/(\d+)', href)
                             if not match: continue
                             place_id = match.group(1)
+                            if place_id in listed_ids: continue
+                            listed_ids.add(place_id)
+                            if place_id in seen_places:
+                                overlap += 1
+                                if config.SKIP_KNOWN_PLACES: continue
+                            if len(shops_to_visit) >= (target_count - total_saved): continue
                             detail_url = f"https://m.place.naver.com/place/{place_id}/home"
                             
                             # Clean Name extraction
@@ -419,17 +554,21 @@ async def run_crawler(target_area=None, target_count=10, resume=False):
                             # Deduplicate in the current batch
                             if not any(s['detail_url'] == detail_url for s in shops_to_visit):
                                 shops_to_visit.append({
+                                    "place_id": place_id,
                                     "name": name if name else f"Shop_{place_id}",
                                     "phone": phone,
                                     "detail_url": detail_url,
-                                    "source_link": detail_url,
                                     "keyword": keyword
                                 })
                     except Exception as e: 
                         logger.debug(f"Error parsing list item: {e}")
                         continue
 
-                logger.info(f"📍 Scheduled {len(shops_to_visit)} shops for detail extraction.")
+                logger.info(f"📍 Scheduled {len(shops_to_visit)} shops for detail extraction "
+                            f"({overlap}/{len(listed_ids)} listed are already known).")
+                if overlap and config.SKIP_KNOWN_PLACES:
+                    # Each skipped detail visit costs one page load plus the paced delay
+                    logger.info(f"✂️ Skipped {overlap} known detail pages (~{overlap * (60 / rate.rate + 5):.0f}s)")
 
                 # Visit each shop's detail page
                 for shop_data in shops_to_visit:
@@ -446,37 +585,221 @@ async def run_crawler(target_area=None, target_count=10, resume=False):
                         "talk_url": ""
                     })
 
-                    if await extract_detail_info(page, shop_data):
+                    if await extract_detail_info(page, shop_data, rate=rate):
                         if shop_data.get("name") and shop_data.get("address"):
-                            if save_to_db(shop_data):
+                            if await asyncio.to_thread(save_to_db, shop_data):
                                 total_saved += 1
-                                # Standardized progress output for dashboard
+                                seen_places.add(shop_data["place_id"])
+                                if not shop_data["address"].startswith(city):
+                                    spillover += 1
+                                status.publish(current=total_saved)
                                 print(f"Progress: {total_saved}/{target_count}", flush=True)
                                 logger.info(f"✅ Saved ({total_saved}/{target_count}): {shop_data.get('name')}")
                         else:
                             logger.warning(f"⏩ Skipping shop {shop_data.get('name')} due to missing critical info (Address).")
                     
-                    # Random delay between detail pages to avoid detection
-                    # Increased delay with more variance
-                    sleep_time = random.uniform(20, 70)
-                    logger.info(f"⏳ Waiting {sleep_time:.1f}s before next shop...")
-                    await asyncio.sleep(sleep_time)
+                    if rate.exhausted:
+                        logger.error("🛑 IP Blocked by Naver repeatedly. Stopping crawler to prevent further damage.")
+                        print("🛑 CRITICAL: IP BLOCK DETECTED. PLEASE STOP AND WAIT.", flush=True)
+                        if frontier: frontier.release(run_id, keyword)
+                        status.finish("blocked", keyword=keyword, current=total_saved)
+                        return "blocked"
+                    
+                    # Adaptive delay between detail pages (AIMD within MIN_DELAY..MAX_DELAY)
+                    if rate.consecutive_blocks:
+                        await asyncio.sleep(rate.block_cooldown())
+                    else:
+                        await rate.wait_async()
 
                 # ✅ Save checkpoint after each successful keyword (Dong)
+                checkpoint = {"last_keyword": keyword, "timestamp": time.strftime('%Y-%m-%d %H:%M:%S')}
+                if not frontier:
+                    checkpoint["plan"] = keywords  # Yield order of this run, reused on --resume
                 with open(checkpoint_file, "w", encoding="utf-8") as f:
-                    json.dump({"last_keyword": keyword, "timestamp": time.strftime('%Y-%m-%d %H:%M:%S')}, f, ensure_ascii=False)
+                    json.dump(checkpoint, f, ensure_ascii=False)
                 logger.info(f"💾 Checkpoint saved: {keyword}")
+                if frontier: frontier.complete(run_id, keyword, saved=total_saved - saved_before)
+                keyword_stats.record(keyword, listed=len(listed_ids), new=len(listed_ids) - overlap, overlap=overlap,
+                                     saved=total_saved - saved_before, spillover=spillover,
+                                     seconds=time.monotonic() - kw_started)
+                crawled_keywords.append(keyword)
+                logger.info(f"📈 Yield '{keyword}': {len(listed_ids) - overlap}/{len(listed_ids)} new, "
+                            f"{total_saved - saved_before} saved, {spillover} outside {city}")
+                status.publish(keyword_index=kw_idx + 1)
 
             except Exception as e:
                  logger.error(f"Error processing keyword {keyword}: {e}")
+                 if frontier: frontier.fail(run_id, keyword, str(e))
 
-        await browser.close()
         logger.info(f"✅ Finished. Total saved: {total_saved}")
+        logger.info(f"📈 Pacing: {rate.summary()}")
+        if crawled_keywords:
+            logger.info(f"📈 Yield summary: {keyword_stats.summary(crawled_keywords)}")
+        status.finish("finished", current=total_saved)
         
         # Save final checkpoint as finished
-        if keywords_to_run:
+        if not frontier and keywords_to_run:
             with open(checkpoint_file, "w", encoding="utf-8") as f:
-                json.dump({"last_keyword": keywords_to_run[-1], "timestamp": time.strftime('%Y-%m-%d %H:%M:%S')}, f, ensure_ascii=False)
+                json.dump({"last_keyword": keywords_to_run[-1], "timestamp": time.strftime('%Y-%m-%d %H:%M:%S'),
+                           "plan": keywords}, f, ensure_ascii=False)
+        return "finished"
+    finally:
+        if context:
+            await context.close()
+        if own_playwright:
+            await browser.close()
+            await own_playwright.stop()
+
+async def run_grid_crawler(target_area, target_count=10, browser=None):
+    """
+    Map-grid mode: cover the region's bounding box with bounds list queries
+    (adaptive quadtree, plain HTTP), then visit detail pages of places not yet stored.
+    Returns the final state: "finished" or "blocked".
+    """
+    db = await asyncio.to_thread(get_db_handler)
+    root = region_bbox(target_area, await asyncio.to_thread(db.fetch_shop_coordinates))
+    logger.info(f"🗺️ Grid crawl '{target_area}': bbox {root.bounds_param}")
+    status = EngineStatus(total=target_count, target=target_area, keyword="map grid")
+
+    client = MapListClient(rate=grid_list_rate())
+    places, stats = await asyncio.to_thread(quadtree_search, root, client.fetch,
+                                            should_stop=lambda: client.rate.exhausted)
+    logger.info(f"🗺️ Grid listing done: {stats['unique']} places from {stats['queries']} queries "
+                f"({stats['subdivided']} subdivisions, depth {stats['max_depth']}, "
+                f"redundant listings {stats['redundant_ratio']:.0%}) vs {len(build_keywords(target_area))} dong keywords")
+    if stats["failed"]:
+        logger.warning(f"⚠️ {stats['failed']} grid cells failed after retries; their areas are not covered")
+    if stats["stopped"]:
+        logger.error("🛑 IP Blocked by Naver repeatedly during grid listing. Stopping crawler to prevent further damage.")
+        status.finish("blocked")
+        return "blocked"
+
+    seen_places = await asyncio.to_thread(load_known_place_ids)
+    to_visit = [p for pid, p in places.items() if pid not in seen_places][:target_count]
+    logger.info(f"📍 Scheduled {len(to_visit)} new places for detail extraction ({len(places) - len(to_visit)} known or over target).")
+    status.publish(keyword_total=len(to_visit))
+
+    rate = RateController(name="naver-place")
+    total_saved = 0
+    own_playwright = None
+    if browser is None:
+        own_playwright = await async_playwright().start()
+        browser = await launch_browser(own_playwright)
+    context = None
+    try:
+        context, page = await new_stealth_page(browser)
+        for idx, place in enumerate(to_visit):
+            shop_data = dict(place, detail_url=f"https://m.place.naver.com/place/{place['place_id']}/home",
+                             keyword=f"{target_area} map grid")
+            if await extract_detail_info(page, shop_data, rate=rate):
+                if shop_data.get("name") and shop_data.get("address") and await asyncio.to_thread(save_to_db, shop_data):
+                    total_saved += 1
+                    print(f"Progress: {total_saved}/{target_count}", flush=True)
+            status.publish(current=total_saved, keyword_index=idx + 1)
+            if rate.exhausted:
+                logger.error("🛑 IP Blocked by Naver repeatedly. Stopping crawler to prevent further damage.")
+                status.finish("blocked", current=total_saved)
+                return "blocked"
+            if rate.consecutive_blocks:
+                await asyncio.sleep(rate.block_cooldown())
+            else:
+                await rate.wait_async()
+    finally:
+        if context:
+            await context.close()
+        if own_playwright:
+            await browser.close()
+            await own_playwright.stop()
+
+    logger.info(f"✅ Grid crawl finished. Total saved: {total_saved} | Pacing: {rate.summary()}")
+    status.finish("finished", current=total_saved)
+    return "finished"
+
+def run_sharded(target_area, target_count, workers, resume=False):
+    """
+    Sharded crawl: seed the shared frontier with target_area's dong keywords and run
+    `workers` worker processes that claim keywords from it. The launcher aggregates
+    the per-worker status files into the main engine status for the dashboard.
+    """
+    import signal
+    import subprocess
+    frontier = Frontier()
+    run_id = target_area or ""
+    keywords = build_keywords(target_area)
+    if not resume:
+        keywords = prioritize_keywords(keywords, KeywordStats())
+    if resume:
+        requeued = frontier.requeue_claimed(run_id)
+        added = frontier.seed(run_id, keywords)
+        logger.info(f"⏭️ Resuming sharded run '{run_id}': requeued {requeued}, added {added} keywords")
+    else:
+        frontier.seed(run_id, keywords, reset=True)
+    progress = frontier.progress(run_id)
+    logger.info(f"🧩 Sharded crawl '{run_id}': {progress['pending']}/{progress['total']} keywords pending, {workers} workers")
+
+    per_worker = max(1, -(-target_count // workers))
+    worker_ids = [f"w{i + 1}" for i in range(workers)]
+    procs = {}
+    for wid in worker_ids:
+        env = os.environ.copy()
+        # Each worker owns its log and status file; only the launcher writes the main ones
+        env["ENGINE_LOG_FILE"] = os.path.join(os.getcwd(), f"engine.{wid}.log")
+        env["ENGINE_STATUS_FILE"] = worker_status_path(wid)
+        procs[wid] = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), run_id, str(per_worker), "--worker", wid], env=env
+        )
+
+    def _terminate_workers(*_):
+        for proc in procs.values():
+            if proc.poll() is None:
+                proc.terminate()
+        raise SystemExit(1)
+    if os.name != "nt":
+        signal.signal(signal.SIGTERM, _terminate_workers)
+
+    status = EngineStatus(total=target_count, target=run_id, keyword_total=progress["total"], shard_workers=workers)
+    last_keywords = {}
+    try:
+        while True:
+            alive = [wid for wid, proc in procs.items() if proc.poll() is None]
+            worker_states = {wid: read_status(worker_status_path(wid)) or {} for wid in worker_ids}
+            for wid, ws in worker_states.items():
+                if ws.get("keyword") and ws["keyword"] != last_keywords.get(wid):
+                    last_keywords[wid] = ws["keyword"]
+                    logger.info(f"🔍 [{wid}] {ws['keyword']} (saved {ws.get('current', 0)})")
+            progress = frontier.progress(run_id)
+            status.publish(
+                current=sum(ws.get("current", 0) for ws in worker_states.values()),
+                keyword_index=progress["done"] + progress["failed"],
+                keyword=", ".join(ws["keyword"] for wid, ws in worker_states.items() if wid in alive and ws.get("keyword")),
+                workers=[{"id": wid, "state": ws.get("state", "starting"), "current": ws.get("current", 0),
+                          "keyword": ws.get("keyword", "")} for wid, ws in worker_states.items()],
+            )
+            if not alive:
+                break
+            time.sleep(config.SHARD_STATUS_INTERVAL)
+    finally:
+        for proc in procs.values():
+            if proc.poll() is None:
+                proc.terminate()
+
+    worker_final = [ws.get("state") for ws in worker_states.values()]
+    if "blocked" in worker_final:
+        final_state = "blocked"
+    elif all(state == "crashed" for state in worker_final):
+        final_state = "crashed"
+    else:
+        final_state = "finished"
+    logger.info(f"✅ Sharded crawl {final_state}. Saved: {status.data['current']} | Keywords: {progress}")
+    status.finish(final_state)
+    return final_state
+
+def _flag_value(name, default=None):
+    if name in sys.argv:
+        i = sys.argv.index(name)
+        if i + 1 < len(sys.argv):
+            return sys.argv[i + 1]
+    return default
 
 if __name__ == "__main__":
     # Move immediate progress signaling to the ABSOLUTE START of execution
@@ -484,11 +807,21 @@ if __name__ == "__main__":
     target = sys.argv[1] if len(sys.argv) > 1 else None
     count = int(sys.argv[2]) if len(sys.argv) > 2 else 10
     resume_mode = "--resume" in sys.argv
+    grid_mode = "--grid" in sys.argv
+    shard_workers = int(_flag_value("--shard-workers", 0))
+    worker_id = _flag_value("--worker")
     
     # Clean up '--resume' from sys.argv[1] or [2] if it accidentally slipped in (common via CLI)
     if target == "--resume": target = None
     
-    # 📢 THIS IS THE MOST CRITICAL LINE FOR DASHBOARD FEEDBACK
+    # When launched by the dashboard, log to the size-bounded rotating engine log
+    if os.environ.get("ENGINE_LOG_FILE"):
+        configure_engine_logging(os.environ["ENGINE_LOG_FILE"])
+    
+    # Liveness for the dashboard: pid + heartbeat_at refreshed on an interval
+    start_heartbeat()
+    
+    # CLI feedback; the dashboard reads the structured status file instead
     print(f"Progress: 0/{count}", flush=True)
     
     # Check Environment
@@ -496,11 +829,27 @@ if __name__ == "__main__":
     if is_cloud:
         print(f"DEBUG: Running on Cloud Environment. Python: {sys.executable}", flush=True)
     
+    # Sharded worker: crawl claimed keywords only; the launcher does the finalization
+    if worker_id:
+        try:
+            asyncio.run(run_crawler(target, count, worker_id=worker_id))
+        except Exception as e:
+            logger.error(f"Worker {worker_id} crashed: {e}")
+            mark_status("crashed", error=str(e))
+            sys.exit(1)
+        sys.exit(0)
+    
     try:
-        asyncio.run(run_crawler(target, count, resume=resume_mode))
+        if grid_mode:
+            final_state = asyncio.run(run_grid_crawler(target, count))
+        elif shard_workers > 1:
+            final_state = run_sharded(target, count, shard_workers, resume=resume_mode)
+        else:
+            final_state = asyncio.run(run_crawler(target, count, resume=resume_mode))
         
         # 🎯 AUTOMATIC COMPETITOR EXTRACTION AFTER CRAWLING
         print("Progress: Finalizing...", flush=True)
+        mark_status("finalizing")
         logger.info("🎯 Crawling complete. Starting automatic competitor extraction...")
         try:
             from extract_competitors import run_competitor_extraction
@@ -508,8 +857,10 @@ if __name__ == "__main__":
             logger.info("✅ All tasks (Crawl + Competitor Analysis) finished successfully!")
         except Exception as ce:
             logger.error(f"⚠️ Competitor extraction failed: {ce}")
+        mark_status(final_state or "finished")
             
     except Exception as e:
         print(f"CRITICAL ERROR: {e}", flush=True)
         logger.error(f"Engine crashed: {e}")
+        mark_status("crashed", error=str(e))
         sys.exit(1)
@@ -12,6 +12,7 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__))))
 import config
 from crawler.db_handler import DBHandler
+from crawler.shop_record import ShopRecord
 
 # Setup Logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -24,14 +25,14 @@ TABLE_NAME = "t_crawled_shops"
 
 def save_to_db(shop_data):
     """
-    Saves a single shop dict to Firebase via DBHandler.
+    Saves a single ShopRecord to Firebase via DBHandler.
     """
     db = DBHandler()
     if db.insert_shop_fs(shop_data):
-        logger.info(f"✅ Firebase Saved: {shop_data.get('name')}")
+        logger.info(f"✅ Firebase Saved: {shop_data.name}")
         return True
     else:
-        logger.error(f"❌ Firebase Save Failed: {shop_data.get('name')}")
+        logger.error(f"❌ Firebase Save Failed: {shop_data.name}")
         return False
 
 async def run_target_crawl():
@@ -244,19 +245,18 @@ async def run_target_crawl():
                     if await tel_link.count() > 0:
                         phone = (await tel_link.get_attribute("href")).replace("tel:", "")
 
-                    shop_data = {
-                        "name": name,
-                        "address": full_address or "주소 확인 불가",
-                        "phone": phone,
-                        "owner_name": "",
-                        "latitude": 0.0,
-                        "longitude": 0.0,
-                        "source_link": detail_url,
-                        "email": email,
-                        "instagram_handle": instagram,
-                        "naver_blog_id": blog_id,
-                        "talk_url": talk_url
-                    }
+                    shop_data = ShopRecord(
+                        place_id=place_id,
+                        name=name,
+                        address=full_address or "주소 확인 불가",
+                        phone=phone,
+                        detail_url=detail_url,
+                        email=email,
+                        instagram_handle=instagram,
+                        naver_blog_id=blog_id,
+                        talk_url=talk_url,
+                        keyword=keyword
+                    )
                     
                     if save_to_db(shop_data):
                         total_saved += 1
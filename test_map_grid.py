@@ -0,0 +1,80 @@
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import config
+from crawler.map_grid import Cell, MapListClient, quadtree_search
+
+# Setup logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+RECORDED_FILE = "crawled_shops_full.json"  # Recorded list data (JSON lines with coordinates)
+TEST_CAP = 10                              # Small per-query cap to force subdivision
+
+def load_recorded_places(path=RECORDED_FILE):
+    places = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            shop = json.loads(line)
+            if shop.get("id") and shop.get("latitude") and shop.get("longitude"):
+                places[str(shop["id"])] = shop
+    return list(places.values())
+
+def make_handler(places, cap):
+    class StandInListHandler(BaseHTTPRequestHandler):
+        """Serves /place/list like the map-bounds list endpoint: places inside bounds, capped."""
+        queries = 0
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != "/place/list":
+                self.send_error(404)
+                return
+            StandInListHandler.queries += 1
+            cell = Cell.from_bounds_param(parse_qs(url.query)["bounds"][0])
+            hits = [p for p in places if cell.contains(p["longitude"], p["latitude"])][:cap]
+            state = {f"PlaceSummary:{p['id']}": {"id": p["id"], "name": p["name"], "phone": p.get("phone", ""),
+                                                  "address": p.get("address", ""),
+                                                  "x": str(p["longitude"]), "y": str(p["latitude"])}
+                     for p in hits}
+            body = f"<html><script>window.__APOLLO_STATE__ = {json.dumps(state, ensure_ascii=False)};</script></html>"
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+    return StandInListHandler
+
+def test_map_grid():
+    places = load_recorded_places()
+    pad = config.MAP_GRID_PADDING_DEG
+    root = Cell(min(p["longitude"] for p in places) - pad, min(p["latitude"] for p in places) - pad,
+                max(p["longitude"] for p in places) + pad, max(p["latitude"] for p in places) + pad)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(places, TEST_CAP))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        client = MapListClient(base_url=f"http://127.0.0.1:{server.server_port}")
+        found, stats = quadtree_search(root, client.fetch, cap=TEST_CAP)
+    finally:
+        server.shutdown()
+
+    missing = {str(p["id"]) for p in places} - set(found)
+    logger.info(f"📊 Recorded places: {len(places)} | Found: {len(found)} | Missing: {len(missing)}")
+    logger.info(f"📊 Stats: {stats}")
+    logger.info(f"📊 Queries: {stats['queries']} (cap {TEST_CAP}) vs {len(config.get_deep_keywords('서울'))} dong keywords for 서울")
+    assert not missing, f"Incomplete coverage: {sorted(missing)[:10]}"
+    assert not stats["truncated_leaves"]
+    logger.info("✅ Complete coverage")
+
+if __name__ == "__main__":
+    test_map_grid()